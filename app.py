@@ -1,18 +1,27 @@
 """
 JingleTube - Entrypoint for Hugging Face Spaces
 """
+import logging
+import os
 import sys
 from pathlib import Path
 
+# Bind the port first; prepare data and indexes in the background
+os.environ.setdefault("JINGLETUBE_FAST_START", "1")
+
 # Add src to Python path
 src_path = Path(__file__).parent / "src"
 sys.path.insert(0, str(src_path))
 
-# Import and launch the main app
-from app import app
-
 if __name__ == "__main__":
-    app.launch(
+    # Startup timings and handler errors go through the logging module
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    # Imported here, not at module level: spawned scoring workers re-run this
+    # script as __mp_main__ and must not import Gradio and build the UI
+    from app import launch
+
+    launch(
         server_name="0.0.0.0",
         server_port=7860,
         share=False,
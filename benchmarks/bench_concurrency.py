@@ -0,0 +1,140 @@
+"""
+Benchmark de vazão com usuários simultâneos
+
+Simula usuários navegando na biblioteca, no ranking e no perfil, curtindo,
+comentando e salvando gravações, e despacha as requisições como a fila do
+Gradio faz:
+
+- antes: handlers síncronos, uma requisição por evento de cada vez (padrão
+  do Gradio) e o pool de 40 threads do anyio;
+- agora: handlers async com o I/O no executor do store e até
+  JINGLETUBE_HANDLER_CONCURRENCY requisições por evento.
+
+Roda num diretório temporário, sem tocar em data/.
+
+Uso:
+    python benchmarks/bench_concurrency.py [--users 200] [--rounds 5]
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+import wave
+from pathlib import Path
+
+import anyio
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+sys.path.insert(0, str(SRC))
+
+
+def percentile(values, p):
+    """Percentil p (0-100) de uma lista já ordenada"""
+    return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))]
+
+
+def write_wav(path):
+    """Grava meio segundo de silêncio"""
+    with wave.open(path, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(16000)
+        f.writeframes(b"\0\0" * 8000)
+
+
+def seed(app, users, songs, recordings, wav):
+    """Cria usuários, músicas e gravações iniciais"""
+    for i in range(users):
+        app.register_user(f"user{i}", "pw", f"user{i}@example.com")
+    for i in range(songs):
+        app.add_song_to_library(f"Song {i}", f"Artist {i % 50}", "Pop", "la la la", None)
+    song_ids = list(app.load_json(app.SONGS_FILE))
+    for i in range(recordings):
+        app.save_recording(f"user{i % users}", song_ids[i % len(song_ids)], wav)
+    app.like_counter.flush()
+    return song_ids, list(app.load_json(app.RECORDINGS_FILE))
+
+
+def workload(app, rng, user, song_ids, recording_ids, wav):
+    """Sequência de (evento, handler síncrono, handler async, argumentos) de um usuário"""
+    recording_id = rng.choice(recording_ids)
+    steps = [
+        ("song_page", app.get_song_page, app.async_handler(app.get_song_page), ("All",)),
+        ("search", app.search_songs, app.async_handler(app.search_songs), (rng.choice(["song", "artist 1", "la"]), "All")),
+        ("rankings", app.get_rankings_page, app.async_handler(app.get_rankings_page), ("likes",)),
+        ("like", app.like_recording, app.async_handler(app.like_recording), (recording_id,)),
+        ("comment", app.add_comment, app.handle_comment, (recording_id, user, "nice!")),
+        ("comments", app.show_comments, app.async_handler(app.show_comments), (recording_id,)),
+        ("stats", app.get_user_stats, app.async_handler(app.get_user_stats), (user,)),
+    ]
+    if rng.random() < 0.2:
+        steps.append(("save", app.save_recording, app.handle_save_recording, (user, rng.choice(song_ids), wav, None)))
+    return steps
+
+
+async def simulate(app, mode, users, rounds, song_ids, recording_ids, wav):
+    """Roda todos os usuários ao mesmo tempo e devolve (latências, segundos)"""
+    limit = 1 if mode == "sync" else app.HANDLER_CONCURRENCY
+    events = {}
+    threads = anyio.CapacityLimiter(40)
+    latencies = []
+
+    async def request(event, sync_fn, async_fn, args):
+        semaphore = events.setdefault(event, asyncio.Semaphore(limit))
+        start = time.perf_counter()
+        async with semaphore:
+            if mode == "sync":
+                await anyio.to_thread.run_sync(lambda: sync_fn(*args), limiter=threads)
+            else:
+                await async_fn(*args)
+        latencies.append(time.perf_counter() - start)
+
+    async def user(index):
+        rng = random.Random(index)
+        name = f"user{index}"
+        for _ in range(rounds):
+            for event, sync_fn, async_fn, args in workload(app, rng, name, song_ids, recording_ids, wav):
+                await request(event, sync_fn, async_fn, args)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(user(i) for i in range(users)))
+    return sorted(latencies), time.perf_counter() - start
+
+
+def run(args):
+    """Popula o diretório atual e mede os dois modos"""
+    import app
+
+    wav = os.path.abspath("take.wav")
+    write_wav(wav)
+    song_ids, recording_ids = seed(app, args.users, args.songs, args.recordings, wav)
+
+    results = {}
+    for mode, label in (("sync", "antes (sync, 1 por evento)"), ("async", f"agora (async, {app.HANDLER_CONCURRENCY} por evento)")):
+        latencies, seconds = asyncio.run(simulate(app, mode, args.users, args.rounds, song_ids, recording_ids, wav))
+        results[mode] = len(latencies) / seconds
+        print(f"{label:<32} {len(latencies)} requisições em {seconds:6.2f} s   {results[mode]:8.1f} req/s   "
+              f"p50 {percentile(latencies, 50) * 1000:7.1f} ms   p95 {percentile(latencies, 95) * 1000:7.1f} ms")
+    print(f"Ganho de vazão: {results['async'] / results['sync']:.2f}x")
+    app.like_counter.close()
+    app.aio.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de vazão com usuários simultâneos")
+    parser.add_argument("--users", type=int, default=200, help="Usuários simultâneos")
+    parser.add_argument("--rounds", type=int, default=5, help="Rodadas de requisições por usuário")
+    parser.add_argument("--songs", type=int, default=500, help="Músicas na biblioteca")
+    parser.add_argument("--recordings", type=int, default=500, help="Gravações iniciais")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="jingletube-bench-") as temp_dir:
+        os.chdir(temp_dir)
+        run(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Benchmark da tabela colunar de pontuações (análises)
+
+Compara a memória por pontuação com a lista de dicionários do scores_store e
+mede a latência das consultas vetorizadas.
+
+Uso:
+    python benchmarks/bench_score_table.py [--scores 1000000] [--songs 2000] [--players 50000]
+"""
+import argparse
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from functools import partial
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from store.score_table import ScoreTable
+
+
+def synth_scores(count, songs, players, seed=0):
+    """Gera pontuações no formato do scores.json, espalhadas por um ano"""
+    rng = random.Random(seed)
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    for i in range(count):
+        yield {
+            "id": f"score-{i}",
+            "songId": f"song_{rng.randrange(songs)}",
+            "playerName": f"player_{rng.randrange(players)}",
+            "score": rng.randint(0, 100),
+            "accuracy": round(rng.uniform(0, 100), 1),
+            "criadoEm": (start + timedelta(seconds=rng.randrange(365 * 86400))).isoformat().replace("+00:00", "Z")
+        }
+
+
+def percentile(values, p):
+    """Percentil p (0-100) de uma lista já ordenada"""
+    return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))]
+
+
+def measure(name, runs, make_query):
+    """Roda a consulta `runs` vezes e imprime p50/p95"""
+    timings = []
+    for _ in range(runs):
+        query = make_query()
+        start = time.perf_counter()
+        query()
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    print(f"{name:<30} p50 {percentile(timings, 50):8.3f} ms   p95 {percentile(timings, 95):8.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da tabela colunar de pontuações")
+    parser.add_argument("--scores", type=int, default=1000000, help="Quantidade de pontuações")
+    parser.add_argument("--songs", type=int, default=2000, help="Músicas distintas")
+    parser.add_argument("--players", type=int, default=50000, help="Jogadores distintos")
+    parser.add_argument("--runs", type=int, default=50, help="Execuções por consulta")
+    args = parser.parse_args()
+
+    # Memória da representação atual: lista de dicionários
+    sample = min(args.scores, 100000)
+    tracemalloc.start()
+    dicts = list(synth_scores(sample, args.songs, args.players))
+    dict_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del dicts
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    table = ScoreTable.build(synth_scores(args.scores, args.songs, args.players))
+    build_seconds = time.perf_counter() - start
+    table_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    print(f"{args.scores} pontuações carregadas em {build_seconds:.2f} s")
+    print(f"Lista de dicionários: {dict_bytes / sample:7.1f} bytes por pontuação (amostra de {sample})")
+    print(f"Tabela colunar:       {table_bytes / args.scores:7.1f} bytes por pontuação "
+          f"(colunas: {table.memory_bytes() / args.scores:.1f})")
+
+    rng = random.Random(1)
+    song = lambda: f"song_{rng.randrange(args.songs)}"
+    player = lambda: f"player_{rng.randrange(args.players)}"
+    measure("percentis (música)", args.runs, lambda: partial(table.percentiles, song()))
+    measure("percentis (todas)", args.runs, lambda: table.percentiles)
+    measure("histograma (música)", args.runs, lambda: partial(table.histogram, song()))
+    measure("histograma (todas)", args.runs, lambda: table.histogram)
+    measure("posição do jogador (música)", args.runs, lambda: partial(table.player_rank, player(), song()))
+    measure("posição do jogador (todas)", args.runs, lambda: partial(table.player_rank, player()))
+    measure("distribuição por dia (música)", args.runs, lambda: partial(table.distribution_over_time, song()))
+    measure("distribuição por dia (todas)", max(1, args.runs // 5), lambda: table.distribution_over_time)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Micro-benchmark da busca de músicas (índice invertido)
+
+Uso:
+    python benchmarks/bench_search.py [--songs 100000] [--queries 200] [--budget-ms 5]
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from store.song_library import SongLibrary
+
+WORDS = (
+    "amor coração canção saudade noite lua mar estrela céu sertão viola paixão "
+    "você não são então vida sonho luz tempo caminho janela cidade menina "
+    "estrada lágrima sorriso alegria samba forró baião rio chuva sol terra "
+    "fogo ventania flor jardim beijo abraço destino segredo promessa festa"
+).split()
+ARTISTS = ["João", "Maria", "José", "Antônio", "Luíza", "Gonçalo", "Inês", "Conceição", "Sebastião", "Márcia"]
+GENRES = ["Pop", "Rock", "Jazz", "Country", "R&B", "Hip-Hop", "Classical"]
+
+
+SYLLABLES = "ba be bi bo bu ca ce ci co cu da de di do du fa fe fi fo lu ma me mi mo na ne ni no pa pe po ra re ri ro sa se si so ta te ti to va ve vi ção são lã".split()
+
+
+def synth_vocabulary(size, seed=0):
+    """Vocabulário: palavras comuns mais palavras sintéticas de 2 a 4 sílabas"""
+    rng = random.Random(seed)
+    words = list(WORDS)
+    seen = set(words)
+    while len(words) < size:
+        word = "".join(rng.choices(SYLLABLES, k=rng.randint(2, 4)))
+        if word not in seen:
+            seen.add(word)
+            words.append(word)
+    return words
+
+
+def synth_songs(count, vocabulary, seed=0):
+    """
+    Gera uma biblioteca sintética com títulos, artistas e letras em português
+
+    As palavras seguem uma distribuição de Zipf: as primeiras do vocabulário
+    aparecem em boa parte das letras, como na língua real.
+    """
+    rng = random.Random(seed)
+    weights = [1.0 / (rank + 1) for rank in range(len(vocabulary))]
+    cumulative = []
+    total = 0.0
+    for weight in weights:
+        total += weight
+        cumulative.append(total)
+    songs = {}
+    for i in range(count):
+        songs[f"song_{i}"] = {
+            "title": " ".join(rng.choices(vocabulary, cum_weights=cumulative, k=rng.randint(2, 5))).title(),
+            "artist": f"{rng.choice(ARTISTS)} {rng.choice(ARTISTS)}",
+            "genre": rng.choice(GENRES),
+            "lyrics": " ".join(rng.choices(vocabulary, cum_weights=cumulative, k=rng.randint(30, 80)))
+        }
+    return songs
+
+
+def percentile(values, p):
+    """Percentil p (0-100) de uma lista já ordenada"""
+    return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da busca de músicas")
+    parser.add_argument("--songs", type=int, default=100000, help="Tamanho da biblioteca")
+    parser.add_argument("--vocabulary", type=int, default=20000, help="Palavras distintas no vocabulário")
+    parser.add_argument("--queries", type=int, default=200, help="Consultas por tipo")
+    parser.add_argument("--budget-ms", type=float, default=5.0, help="Orçamento de p95 por consulta (ms)")
+    args = parser.parse_args()
+
+    vocabulary = synth_vocabulary(args.vocabulary)
+    songs = synth_songs(args.songs, vocabulary)
+    start = time.perf_counter()
+    library = SongLibrary.build(songs)
+    print(f"Índice de {args.songs} músicas construído em {time.perf_counter() - start:.2f} s")
+
+    rng = random.Random(1)
+    # Consultas sorteadas no vocabulário inteiro (mais palavras raras que comuns)
+    kinds = {
+        "termo exato": lambda: rng.choice(vocabulary),
+        "dois termos": lambda: f"{rng.choice(vocabulary)} {rng.choice(vocabulary)}",
+        "prefixo (2 letras)": lambda: rng.choice(vocabulary)[:2],
+        "termo comum": lambda: rng.choice(WORDS),
+        "termo + prefixo": lambda: f"{rng.choice(WORDS)} {rng.choice(vocabulary)[:3]}",
+        "sem acento": lambda: rng.choice(["coracao", "cancao", "sertao", "conceicao", "lagrima"]),
+    }
+
+    worst_p95 = 0.0
+    for name, make_query in kinds.items():
+        timings = []
+        for _ in range(args.queries):
+            query = make_query()
+            start = time.perf_counter()
+            library.search(query, limit=20)
+            timings.append((time.perf_counter() - start) * 1000)
+        timings.sort()
+        p95 = percentile(timings, 95)
+        worst_p95 = max(worst_p95, p95)
+        print(f"{name:<20} p50 {percentile(timings, 50):7.3f} ms   p95 {p95:7.3f} ms   máx {timings[-1]:7.3f} ms")
+
+    status = "OK" if worst_p95 <= args.budget_ms else "ACIMA DO ORÇAMENTO"
+    print(f"Pior p95: {worst_p95:.3f} ms (orçamento {args.budget_ms} ms) - {status}")
+
+
+if __name__ == "__main__":
+    main()
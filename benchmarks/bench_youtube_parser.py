@@ -0,0 +1,110 @@
+"""
+Benchmark da extração de IDs de vídeos do YouTube
+
+Compara a implementação anterior (quatro re.search com padrões não
+compilados mais urlparse) com extract_video_ids numa playlist sintética.
+
+Uso:
+    python benchmarks/bench_youtube_parser.py [--urls 10000] [--distinct 2000]
+"""
+import argparse
+import random
+import re
+import string
+import sys
+import time
+from pathlib import Path
+from urllib.parse import urlparse, parse_qs
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from youtube import parser as youtube_parser
+
+FORMATS = [
+    "https://www.youtube.com/watch?v={}",
+    "https://www.youtube.com/watch?v={}&list=PLrAXtmErZgOeiKm4sgNOknGvNjby9efdf&index=3",
+    "https://youtu.be/{}?t=42",
+    "https://m.youtube.com/watch?v={}",
+    "https://www.youtube.com/embed/{}",
+    "https://www.youtube.com/shorts/{}",
+    "https://music.youtube.com/watch?v={}",
+]
+
+
+def legacy_extract_video_id(url):
+    """extract_video_id como era antes do padrão único"""
+    if not url:
+        return None
+    patterns = [
+        r'(?:youtube\.com\/watch\?v=)([\w-]+)',
+        r'(?:youtu\.be\/)([\w-]+)',
+        r'(?:youtube\.com\/embed\/)([\w-]+)',
+        r'(?:youtube\.com\/v\/)([\w-]+)'
+    ]
+    for pattern in patterns:
+        match = re.search(pattern, url)
+        if match:
+            return match.group(1)
+    try:
+        parsed = urlparse(url)
+        if parsed.hostname in ['www.youtube.com', 'youtube.com']:
+            query_params = parse_qs(parsed.query)
+            if 'v' in query_params:
+                return query_params['v'][0]
+    except:
+        pass
+    return None
+
+
+def synth_urls(count, distinct, seed=0):
+    """Playlist com `distinct` vídeos distintos, repetidos até `count` links"""
+    rng = random.Random(seed)
+    alphabet = string.ascii_letters + string.digits + "-_"
+    videos = [
+        rng.choice(FORMATS).format("".join(rng.choices(alphabet, k=11)))
+        for _ in range(distinct)
+    ]
+    return [rng.choice(videos) for _ in range(count)]
+
+
+def timed(fn, *args):
+    """Tempo de uma chamada em milissegundos"""
+    start = time.perf_counter()
+    fn(*args)
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da extração de IDs do YouTube")
+    parser.add_argument("--urls", type=int, default=10000, help="Links na playlist")
+    parser.add_argument("--distinct", type=int, default=2000, help="Vídeos distintos")
+    parser.add_argument("--rounds", type=int, default=5, help="Repetições de cada medição")
+    args = parser.parse_args()
+
+    urls = synth_urls(args.urls, args.distinct)
+    unique = synth_urls(args.urls, args.urls, seed=1)
+
+    def legacy(batch):
+        return [legacy_extract_video_id(url) for url in batch]
+
+    def batch_cold(batch):
+        youtube_parser._match_video_id.cache_clear()
+        return youtube_parser.extract_video_ids(batch)
+
+    cases = [
+        ("anterior (um a um)", legacy, urls),
+        ("extract_video_ids, cache vazio", batch_cold, urls),
+        ("extract_video_ids, cache cheio", youtube_parser.extract_video_ids, urls),
+        ("anterior, links únicos", legacy, unique),
+        ("extract_video_ids, links únicos", batch_cold, unique),
+    ]
+    for name, fn, batch in cases:
+        best = min(timed(fn, batch) for _ in range(args.rounds))
+        print(f"{name:<34} {best:8.2f} ms   {best * 1000 / len(batch):6.2f} µs/link")
+
+    missing = sum(1 for url in urls if legacy_extract_video_id(url) is None)
+    print(f"Links sem ID na implementação anterior: {missing} de {len(urls)} (shorts/)")
+
+
+if __name__ == "__main__":
+    main()
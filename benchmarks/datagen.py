@@ -0,0 +1,135 @@
+"""
+Geradores de dados sintéticos para os benchmarks
+
+Escrevem os arquivos diretamente no formato de cada store (sem passar pelas
+APIs, que reescreveriam o arquivo a cada item), de 10³ a 10⁶ registros.
+"""
+import hashlib
+import json
+import os
+import random
+import string
+from datetime import datetime, timedelta, timezone
+
+ALPHABET = string.ascii_letters + string.digits + "-_"
+GENRES = ["Pop", "Rock", "Jazz", "Country", "R&B", "Hip-Hop", "Classical"]
+WORDS = ("amor coração canção saudade noite lua mar estrela céu sertão viola paixão vida sonho luz "
+         "tempo caminho janela cidade menina estrada lágrima sorriso alegria samba forró rio chuva sol").split()
+URL_FORMATS = [
+    "https://www.youtube.com/watch?v={}",
+    "https://www.youtube.com/watch?v={}&list=PLrAXtmErZgOeiKm4sgNOknGvNjby9efdf&index=3",
+    "https://youtu.be/{}?t=42",
+    "https://m.youtube.com/watch?v={}",
+    "https://www.youtube.com/embed/{}",
+    "https://www.youtube.com/shorts/{}",
+]
+START = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def video_id(rng):
+    """ID de vídeo do YouTube (11 caracteres)"""
+    return "".join(rng.choices(ALPHABET, k=11))
+
+
+def youtube_urls(count, distinct=None, seed=0):
+    """Links em formatos variados; com `distinct`, vídeos se repetem"""
+    rng = random.Random(seed)
+    pool = [rng.choice(URL_FORMATS).format(video_id(rng)) for _ in range(distinct or count)]
+    if distinct is None:
+        return pool
+    return [rng.choice(pool) for _ in range(count)]
+
+
+def store_songs(count, seed=0):
+    """Músicas no formato do songs_store (lista)"""
+    rng = random.Random(seed)
+    return [
+        {"id": f"song-{i}", "youtubeId": video_id(rng), "titulo": f"Música {i}",
+         "criadoEm": (START + timedelta(seconds=i)).isoformat().replace("+00:00", "Z")}
+        for i in range(count)
+    ]
+
+
+def store_scores(count, songs, players, seed=0):
+    """Pontuações no formato do scores_store (lista)"""
+    rng = random.Random(seed)
+    return [
+        {"id": f"score-{i}", "songId": f"song-{rng.randrange(songs)}", "playerName": f"user{rng.randrange(players)}",
+         "score": rng.randint(0, 100), "accuracy": round(rng.uniform(0, 100), 1),
+         "criadoEm": (START + timedelta(seconds=rng.randrange(365 * 86400))).isoformat().replace("+00:00", "Z")}
+        for i in range(count)
+    ]
+
+
+def write_json(path, data):
+    """Grava um arquivo JSON compacto, criando o diretório"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+
+
+def write_app_data(data_dir, songs, users, recordings, comments, seed=0):
+    """
+    Popula um diretório data/ do app
+
+    Args:
+        data_dir (str): Diretório de destino
+        songs (int): Músicas na biblioteca
+        users (int): Usuários cadastrados
+        recordings (int): Gravações
+        comments (int): Comentários, espalhados pelas primeiras 1000 gravações
+
+    Returns:
+        dict: song_ids, usernames e recording_ids gerados
+    """
+    rng = random.Random(seed)
+    song_ids = [f"song_{i + 1}_1735689600.0" for i in range(songs)]
+    usernames = [f"user{i}" for i in range(users)]
+    now = datetime(2025, 1, 1)
+
+    library = {
+        song_id: {"title": " ".join(rng.choices(WORDS, k=3)).title(), "artist": f"Artist {i % 500}",
+                  "genre": rng.choice(GENRES), "lyrics": " ".join(rng.choices(WORDS, k=20)),
+                  "audio_path": None, "audio_blob": None, "added_at": str(now + timedelta(seconds=i)),
+                  "play_count": 0}
+        for i, song_id in enumerate(song_ids)
+    }
+    accounts = {
+        name: {"password": "pw", "email": f"{name}@example.com", "created_at": str(now), "recordings": [],
+               "favorites": []}
+        for name in usernames
+    }
+    takes = {}
+    for i in range(recordings):
+        username = usernames[i % users]
+        recording_id = f"rec_{username}_{i}"
+        song_id = song_ids[rng.randrange(songs)]
+        takes[recording_id] = {
+            "username": username, "song_id": song_id, "recording_path": "data/audio/blobs/00/take",
+            "recording_blob": "take", "timestamp": str(now + timedelta(seconds=i)), "rating": None,
+            "score": None, "accuracy": None, "likes": rng.randrange(100), "comment_count": 0
+        }
+        accounts[username]["recordings"].append(recording_id)
+        library[song_id]["play_count"] += 1
+
+    recording_ids = list(takes)
+    commented = recording_ids[:1000]
+    comments_dir = os.path.join(data_dir, "comments")
+    if commented and comments:
+        os.makedirs(comments_dir, exist_ok=True)
+        per_recording = {}
+        for i in range(comments):
+            per_recording.setdefault(commented[i % len(commented)], []).append(
+                {"username": usernames[i % users], "comment": f"comentário {i}", "timestamp": str(now)})
+        for recording_id, items in per_recording.items():
+            name = hashlib.sha1(recording_id.encode("utf-8")).hexdigest()
+            with open(os.path.join(comments_dir, f"{name}.jsonl"), "w", encoding="utf-8") as f:
+                for item in items:
+                    f.write(json.dumps(item, ensure_ascii=False) + "\n")
+            takes[recording_id]["comment_count"] = len(items)
+
+    write_json(os.path.join(data_dir, "songs.json"), library)
+    write_json(os.path.join(data_dir, "users.json"), accounts)
+    write_json(os.path.join(data_dir, "recordings.json"), takes)
+    write_json(os.path.join(data_dir, "rankings.json"), {})
+    return {"song_ids": song_ids, "usernames": usernames, "recording_ids": recording_ids}
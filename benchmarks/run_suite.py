@@ -0,0 +1,296 @@
+"""
+Suíte de benchmarks dos caminhos críticos: songs_store, scores_store,
+youtube.parser e os handlers do app
+
+Cada grupo roda num processo separado, num diretório temporário com dados
+sintéticos do tamanho pedido. Para cada caso são registrados os percentis de
+latência, a primeira chamada (fria), o pico de memória alocada durante a
+operação (tracemalloc) e o pico de memória do processo. O resultado vai
+para um JSON em benchmarks/results/ para comparar commits.
+
+Uso:
+    python benchmarks/run_suite.py [--sizes 1000 10000 100000] [--groups songs scores parser app]
+    python benchmarks/run_suite.py --sizes 1000000 --budget 10
+    python benchmarks/run_suite.py --compare benchmarks/results/antes.json benchmarks/results/depois.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+ROOT = BENCH_DIR.parent
+sys.path.insert(0, str(ROOT / "src"))
+sys.path.insert(0, str(BENCH_DIR))
+
+import datagen
+
+GROUPS = ("songs", "scores", "parser", "app")
+DEFAULT_SIZES = (1000, 10000, 100000)
+RESULTS_DIR = BENCH_DIR / "results"
+
+
+def percentile(values, p):
+    """Percentil p (0-100) de uma lista já ordenada"""
+    return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))]
+
+
+class Runner:
+    """Mede casos e acumula os resultados de um grupo"""
+
+    def __init__(self, group, size, budget):
+        self.group = group
+        self.size = size
+        self.budget = budget
+        self.results = []
+
+    def case(self, name, make_call, min_iterations=3, max_iterations=200, per_item=None):
+        """
+        Mede um caso
+
+        Args:
+            name (str): Nome do caso
+            make_call (callable): Retorna a função a medir (chamado antes de cada
+                execução, fora da medição, para sortear argumentos)
+            min_iterations (int): Execuções mínimas, mesmo acima do orçamento
+            max_iterations (int): Execuções máximas
+            per_item (int): Itens processados por execução, para reportar µs por item
+        """
+        call = make_call()
+        start = time.perf_counter()
+        call()
+        cold = time.perf_counter() - start
+
+        latencies = []
+        deadline = time.perf_counter() + self.budget
+        while len(latencies) < max_iterations and (len(latencies) < min_iterations or time.perf_counter() < deadline):
+            call = make_call()
+            start = time.perf_counter()
+            call()
+            latencies.append(time.perf_counter() - start)
+
+        tracemalloc.start()
+        make_call()()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        latencies.sort()
+        result = {
+            "group": self.group,
+            "case": name,
+            "size": self.size,
+            "iterations": len(latencies),
+            "cold_ms": cold * 1000,
+            "mean_ms": sum(latencies) / len(latencies) * 1000,
+            "p50_ms": percentile(latencies, 50) * 1000,
+            "p95_ms": percentile(latencies, 95) * 1000,
+            "p99_ms": percentile(latencies, 99) * 1000,
+            "max_ms": latencies[-1] * 1000,
+            "peak_alloc_kb": peak // 1024,
+        }
+        if per_item:
+            result["per_item_us"] = result["p50_ms"] * 1000 / per_item
+        self.results.append(result)
+        print(f"  {self.group:<7} {name:<40} n={self.size:<8} p50 {result['p50_ms']:9.3f} ms   "
+              f"p95 {result['p95_ms']:9.3f} ms   pico {result['peak_alloc_kb']:8d} KB", file=sys.stderr)
+
+
+def bench_songs(runner, size, rng):
+    """songs_store: buscas por índice, leitura completa e inserções"""
+    from store import songs_store
+
+    songs = datagen.store_songs(size)
+    datagen.write_json(songs_store.SONGS_FILE, songs)
+    youtube_ids = [song["youtubeId"] for song in songs]
+    del songs
+
+    runner.case("get_song_by_youtube_id", lambda: (lambda y=rng.choice(youtube_ids): songs_store.get_song_by_youtube_id(y)),
+                max_iterations=1000)
+    runner.case("get_song_by_id", lambda: (lambda i=rng.randrange(size): songs_store.get_song_by_id(f"song-{i}")),
+                max_iterations=1000)
+    runner.case("get_all_songs", lambda: songs_store.get_all_songs)
+    runner.case("add_song", lambda: (lambda y=datagen.video_id(rng): songs_store.add_song(y, "Nova")))
+    runner.case("add_songs (lote de 100)",
+                lambda: (lambda batch=[{"youtube_id": datagen.video_id(rng)} for _ in range(100)]: songs_store.add_songs(batch)),
+                per_item=100)
+
+
+def bench_scores(runner, size, rng):
+    """scores_store: inserção, top-K e consultas por música"""
+    from store import scores_store
+
+    songs = max(10, size // 100)
+    players = max(10, size // 10)
+    datagen.write_json(scores_store.SCORES_FILE, datagen.store_scores(size, songs, players))
+    song = lambda: f"song-{rng.randrange(songs)}"
+
+    runner.case("get_top_scores (música, top 10)", lambda: (lambda s=song(): scores_store.get_top_scores(s, 10)),
+                max_iterations=1000)
+    runner.case("get_top_scores (música, top 50)", lambda: (lambda s=song(): scores_store.get_top_scores(s, 50)))
+    runner.case("get_scores_by_song", lambda: (lambda s=song(): scores_store.get_scores_by_song(s)))
+    runner.case("add_score", lambda: (lambda s=song(): scores_store.add_score(s, f"user{rng.randrange(players)}", rng.randint(0, 100))))
+    runner.case("query_score_table (percentis)",
+                lambda: (lambda s=song(): scores_store.query_score_table(lambda table: table.percentiles(s))))
+
+
+def bench_parser(runner, size, rng):
+    """youtube.parser: lista inteira, um link por vez e em lote"""
+    from youtube import parser
+
+    urls = datagen.youtube_urls(size, distinct=max(1, size // 2))
+
+    def one_by_one():
+        parser._match_video_id.cache_clear()
+        for url in urls:
+            parser.extract_video_id(url)
+
+    def batch():
+        parser._match_video_id.cache_clear()
+        parser.extract_video_ids(urls)
+
+    runner.case("extract_video_id (lista, cache frio)", lambda: one_by_one, per_item=size)
+    runner.case("extract_video_ids (lista, cache frio)", lambda: batch, per_item=size)
+    runner.case("extract_video_ids (lista, cache quente)", lambda: (lambda: parser.extract_video_ids(urls)), per_item=size)
+
+
+def bench_app(runner, size, rng):
+    """Handlers do app: biblioteca, ranking, perfil e salvar gravação"""
+    users = max(10, size // 10)
+    generated = datagen.write_app_data("data", songs=size, users=users, recordings=size, comments=size)
+    take = os.path.abspath("take.wav")
+    with open(take, "wb") as f:
+        f.write(os.urandom(4096))
+
+    start = time.perf_counter()
+    import app
+    startup = time.perf_counter() - start
+    runner.results.append({"group": "app", "case": "import (inicialização)", "size": size, "iterations": 1,
+                           "cold_ms": startup * 1000, "mean_ms": startup * 1000, "p50_ms": startup * 1000,
+                           "p95_ms": startup * 1000, "p99_ms": startup * 1000, "max_ms": startup * 1000,
+                           "peak_alloc_kb": None})
+
+    usernames, song_ids = generated["usernames"], generated["song_ids"]
+    runner.case("get_song_list (All)", lambda: (lambda: app.get_song_list("All")))
+    runner.case("get_song_list (gênero)", lambda: (lambda g=rng.choice(datagen.GENRES): app.get_song_list(g)))
+    runner.case("get_song_page", lambda: (lambda: app.get_song_page("All")), max_iterations=1000)
+    runner.case("get_rankings (likes)", lambda: (lambda: app.get_rankings("likes")))
+    runner.case("get_rankings_page (recent)", lambda: (lambda: app.get_rankings_page("recent")), max_iterations=1000)
+    runner.case("get_user_stats", lambda: (lambda u=rng.choice(usernames): app.get_user_stats(u)), max_iterations=1000)
+    runner.case("save_recording",
+                lambda: (lambda u=rng.choice(usernames), s=rng.choice(song_ids): app.save_recording(u, s, take)))
+    app.like_counter.close()
+    app.aio.shutdown()
+
+
+BENCHES = {"songs": bench_songs, "scores": bench_scores, "parser": bench_parser, "app": bench_app}
+
+
+def worker(group, size, budget):
+    """Roda um grupo no diretório atual e imprime os resultados em JSON"""
+    runner = Runner(group, size, budget)
+    BENCHES[group](runner, size, random.Random(0))
+    rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    for result in runner.results:
+        result["process_peak_rss_kb"] = rss_kb
+    json.dump(runner.results, sys.stdout)
+
+
+def git_commit():
+    """Commit atual do repositório (None fora de um checkout git)"""
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(groups, sizes, budget):
+    """Roda cada grupo e tamanho num processo isolado"""
+    results = []
+    for size in sizes:
+        for group in groups:
+            print(f"{group} com {size} registros...", file=sys.stderr)
+            with tempfile.TemporaryDirectory(prefix="jingletube-bench-") as temp_dir:
+                completed = subprocess.run(
+                    [sys.executable, "-W", "ignore", str(Path(__file__).resolve()), "--worker", group, str(size),
+                     "--budget", str(budget)],
+                    cwd=temp_dir, stdout=subprocess.PIPE, check=True, text=True
+                )
+            results.extend(json.loads(completed.stdout))
+    return results
+
+
+def compare(before_path, after_path, threshold):
+    """
+    Compara dois arquivos de resultados pelo p50 de cada caso
+
+    Returns:
+        int: Quantidade de regressões acima do limite
+    """
+    def load(path):
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return data["meta"], {(r["group"], r["case"], r["size"]): r for r in data["results"]}
+
+    before_meta, before = load(before_path)
+    after_meta, after = load(after_path)
+    print(f"{before_meta.get('commit')} -> {after_meta.get('commit')} (regressão: p50 {threshold:.2f}x pior)")
+    regressions = 0
+    for key in sorted(before.keys() & after.keys()):
+        old, new = before[key]["p50_ms"], after[key]["p50_ms"]
+        ratio = new / old if old else float("inf")
+        flag = ""
+        if ratio > threshold:
+            flag = "  REGRESSÃO"
+            regressions += 1
+        print(f"{key[0]:<7} {key[1]:<40} n={key[2]:<8} {old:9.3f} -> {new:9.3f} ms  {ratio:5.2f}x{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Suíte de benchmarks do JingleTube")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES),
+                        help="Tamanhos dos dados (10³ a 10⁶)")
+    parser.add_argument("--groups", nargs="+", choices=GROUPS, default=list(GROUPS), help="Grupos a medir")
+    parser.add_argument("--budget", type=float, default=2.0, help="Segundos por caso (mínimo de 3 execuções)")
+    parser.add_argument("--output", help="Arquivo de resultados (padrão: benchmarks/results/<data>-<commit>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("ANTES", "DEPOIS"), help="Compara dois arquivos de resultados")
+    parser.add_argument("--threshold", type=float, default=1.2, help="Razão de p50 considerada regressão")
+    parser.add_argument("--worker", nargs=2, metavar=("GRUPO", "TAMANHO"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args.worker[0], int(args.worker[1]), args.budget)
+        return
+    if args.compare:
+        sys.exit(1 if compare(args.compare[0], args.compare[1], args.threshold) else 0)
+
+    commit = git_commit()
+    results = run_suite(args.groups, args.sizes, args.budget)
+    meta = {
+        "commit": commit,
+        "date": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "sizes": args.sizes,
+        "budget_s": args.budget,
+    }
+    output = Path(args.output) if args.output else RESULTS_DIR / f"{datetime.now():%Y%m%d-%H%M%S}-{commit or 'local'}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump({"meta": meta, "results": results}, f, indent=2, ensure_ascii=False)
+    print(f"Resultados em {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,6 @@
+import time
+_IMPORT_START = time.perf_counter()
+
 import gradio as gr
 import os
 import json
@@ -5,55 +8,136 @@ import datetime
 from pathlib import Path
 import tempfile
 import shutil
+import threading
+import atexit
+import functools
+import contextlib
+import asyncio
+import logging
+import signal
+import sys
+import base64
+import binascii
+
+from store import aio, blob_store, comments_store, metrics, scores_store, song_import, transactions, user_stats
+from store.like_counter import LikeCounter
+from store.rankings import RankingsCache
+from store.song_library import SongLibraryCache
+
+# Seconds spent in each startup phase, in order (see startup_report)
+STARTUP_TIMES = {"imports": time.perf_counter() - _IMPORT_START}
+
+# With JINGLETUBE_FAST_START=1 (set by the Spaces entry point) the data directory
+# is prepared in the background once the server is listening; handlers wait for it
+FAST_START = os.getenv("JINGLETUBE_FAST_START", "0") == "1"
+# Set by scoring.jobs in the processes it spawns to score recordings
+SCORING_WORKER = os.getenv("JINGLETUBE_SCORING_WORKER", "0") == "1"
+startup_ready = threading.Event()
+# Exception raised while preparing the data in the background (handlers report it)
+startup_error = None
+# How often handlers waiting for the deferred startup check on it
+STARTUP_POLL_SECONDS = 0.05
+
+logger = logging.getLogger(__name__)
 
-# Initialize data directory
 DATA_DIR = Path("data")
-DATA_DIR.mkdir(exist_ok=True)
 
 USERS_FILE = DATA_DIR / "users.json"
 SONGS_FILE = DATA_DIR / "songs.json"
 RECORDINGS_FILE = DATA_DIR / "recordings.json"
 RANKINGS_FILE = DATA_DIR / "rankings.json"
 
-# Initialize data files if they don't exist
-for file_path in [USERS_FILE, SONGS_FILE, RECORDINGS_FILE, RANKINGS_FILE]:
-    if not file_path.exists():
-        with open(file_path, 'w') as f:
-            json.dump({}, f)
+# Background scoring jobs by recording ID
+SCORING_JOBS = {}
+
+# Serializes writes to recordings.json; shared by the rankings index and the like counter
+RECORDINGS_LOCK = threading.RLock()
+
+# Writes to users/songs/recordings.json go through one transaction per batch of requests
+store_writer = transactions.GroupCommit(lock=RECORDINGS_LOCK)
+
+# Likes are kept in memory and written in batches (see flush_likes)
+like_counter = LikeCounter(lambda deltas: flush_likes(deltas), lock=RECORDINGS_LOCK)
+atexit.register(like_counter.close)
+
+# Recordings kept sorted by likes and by date for the Rankings tab
+rankings = RankingsCache(RECORDINGS_FILE, SONGS_FILE, pending_likes=like_counter.pending, lock=RECORDINGS_LOCK)
+# Songs in insertion order, per genre, for the Song Library tab
+song_library = SongLibraryCache(SONGS_FILE)
 
+# Rows per page in the Song Library and Rankings tables
+PAGE_SIZE = int(os.getenv("JINGLETUBE_PAGE_SIZE", "20"))
+
+# Requests of the same event handled at once (Gradio's default is one at a time)
+HANDLER_CONCURRENCY = int(os.getenv("JINGLETUBE_HANDLER_CONCURRENCY", "64"))
+
+# With JINGLETUBE_METRICS=1: Prometheus endpoint, and the Admin tab for these users (comma-separated)
+METRICS_PATH = "/metrics"
+ADMIN_USERS = {name.strip() for name in os.getenv("JINGLETUBE_ADMIN_USERS", "").split(",") if name.strip()}
+
+@contextlib.contextmanager
+def startup_phase(name):
+    """Time a startup phase into STARTUP_TIMES (and the metrics, when enabled)"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        STARTUP_TIMES[name] = STARTUP_TIMES.get(name, 0) + seconds
+        metrics.observe("startup", name, seconds)
+
+def startup_report():
+    """One-line breakdown of the startup phases"""
+    phases = ", ".join(f"{name} {seconds:.2f}s" for name, seconds in STARTUP_TIMES.items())
+    report = f"Startup: {phases} (total {sum(STARTUP_TIMES.values()):.2f}s"
+    names = list(STARTUP_TIMES)
+    if "launch" in names:
+        listening = sum(STARTUP_TIMES[name] for name in names[:names.index("launch") + 1])
+        report += f", listening after {listening:.2f}s"
+    return report + ")"
+
+@metrics.instrument("io")
 def load_json(file_path):
     """Load JSON data from file"""
     try:
         with open(file_path, 'r') as f:
-            return json.load(f)
+            data = json.load(f)
+            metrics.record_read(file_path, f)
+            return data
     except:
         return {}
 
+@metrics.instrument("io")
 def save_json(file_path, data):
-    """Save JSON data to file"""
-    with open(file_path, 'w') as f:
-        json.dump(data, f, indent=2)
+    """Save JSON data to file (temp file + atomic rename)"""
+    tx = transactions.Transaction()
+    tx.save(file_path, data)
+    tx.commit()
 
 def register_user(username, password, email):
     """Register a new user"""
     if not username or not password:
         return "Username and password are required!"
     
-    users = load_json(USERS_FILE)
-    
-    if username in users:
-        return "Username already exists!"
-    
-    users[username] = {
-        "password": password,  # In production, use proper password hashing!
-        "email": email,
-        "created_at": str(datetime.datetime.now()),
-        "recordings": [],
-        "favorites": []
-    }
+    def apply(tx):
+        users = tx.load(USERS_FILE)
+        
+        if username in users:
+            return "Username already exists!"
+        
+        users[username] = {
+            "password": password,  # In production, use proper password hashing!
+            "email": email,
+            "created_at": str(datetime.datetime.now()),
+            "recordings": [],
+            "favorites": []
+        }
+        
+        tx.save(USERS_FILE, users)
+        tx.after_commit(lambda: user_stats.record_user(username, users[username]["created_at"]))
+        return f"User {username} registered successfully!"
     
-    save_json(USERS_FILE, users)
-    return f"User {username} registered successfully!"
+    return store_writer.run(apply)
 
 def login_user(username, password):
     """Authenticate user"""
@@ -72,175 +156,508 @@ def add_song_to_library(title, artist, genre, lyrics, audio_file):
     if not title or not artist:
         return "Title and artist are required!"
     
-    songs = load_json(SONGS_FILE)
-    song_id = f"song_{len(songs) + 1}_{datetime.datetime.now().timestamp()}"
-    
     # Handle audio file upload
     audio_path = None
+    audio_blob = None
     if audio_file:
-        audio_dir = DATA_DIR / "audio" / "songs"
-        audio_dir.mkdir(parents=True, exist_ok=True)
-        audio_path = f"data/audio/songs/{song_id}.mp3"
-        shutil.copy(audio_file, audio_path)
-    
-    songs[song_id] = {
-        "title": title,
-        "artist": artist,
-        "genre": genre,
-        "lyrics": lyrics,
-        "audio_path": audio_path,
-        "added_at": str(datetime.datetime.now()),
-        "play_count": 0
-    }
-    
-    save_json(SONGS_FILE, songs)
+        # Identical uploads share one content-addressed file
+        blob = blob_store.put_file(audio_file)
+        audio_path = blob["path"]
+        audio_blob = blob["hash"]
+        
+        # Analyse the reference track once, in the background; if the queue is
+        # full the features are computed the first time the song is scored
+        from scoring.features import precompute_features
+        from scoring.jobs import QueueFullError, analysis_queue
+        try:
+            analysis_queue.submit(precompute_features, audio_path)
+        except QueueFullError:
+            pass
+    
+    def apply(tx):
+        ranking_index = rankings.begin()
+        library_index = song_library.begin()
+        songs = tx.load(SONGS_FILE)
+        song_id = f"song_{len(songs) + 1}_{datetime.datetime.now().timestamp()}"
+        songs[song_id] = {
+            "title": title,
+            "artist": artist,
+            "genre": genre,
+            "lyrics": lyrics,
+            "audio_path": audio_path,
+            "audio_blob": audio_blob,
+            "added_at": str(datetime.datetime.now()),
+            "play_count": 0
+        }
+        
+        tx.save(SONGS_FILE, songs)
+        tx.after_commit(lambda: rankings.commit(ranking_index))
+        tx.after_commit(lambda: song_library.commit(library_index, lambda index: index.add(song_id, songs[song_id])))
+    
+    try:
+        store_writer.run(apply)
+    except Exception:
+        # The song was not saved: drop the reference taken by the upload
+        if audio_blob:
+            blob_store.release(audio_blob)
+        raise
     return f"Song '{title}' by {artist} added successfully!"
 
+def import_song_links(file_path, progress=None):
+    """Import a text/CSV file of YouTube links into the library, in batches"""
+    if not file_path:
+        return "No file provided!"
+    
+    def add_batch(batch):
+        def apply(tx):
+            ranking_index = rankings.begin()
+            library_index = song_library.begin()
+            created = song_import.add_to_library(tx, SONGS_FILE, batch)
+            
+            def update(index):
+                for song_id, song in created:
+                    index.add(song_id, song)
+            
+            tx.after_commit(lambda: rankings.commit(ranking_index))
+            tx.after_commit(lambda: song_library.commit(library_index, update))
+            return len(created)
+        
+        return store_writer.run(apply)
+    
+    known_ids = song_import.library_youtube_ids(load_json(SONGS_FILE))
+    stats = song_import.import_file(file_path, add_batch, known_ids, progress=progress)
+    return (f"Imported {stats['imported']} songs from {stats['read']} lines "
+            f"({stats['duplicates']} already in the library, {stats['invalid']} without a YouTube link)")
+
 def get_song_list(genre_filter="All"):
     """Get list of songs, optionally filtered by genre"""
-    songs = load_json(SONGS_FILE)
-    
-    if not songs:
+    if not song_library.count():
         return [["No songs available", "", "", ""]]
     
-    song_list = []
-    for song_id, song_data in songs.items():
-        if genre_filter == "All" or song_data.get("genre") == genre_filter:
-            song_list.append([
-                song_data["title"],
-                song_data["artist"],
-                song_data.get("genre", "Unknown"),
-                song_id
-            ])
-    
+    song_list = song_library.rows(genre_filter)
     return song_list if song_list else [["No songs found", "", "", ""]]
 
+def page_info(page):
+    """Describe which rows of the total a page shows"""
+    if not page["rows"]:
+        return f"0 of {page['total']}"
+    return f"{page['start'] + 1}-{page['start'] + len(page['rows'])} of {page['total']}"
+
+def get_song_page(genre_filter="All", cursor=None):
+    """Get one page of the song list; returns rows, page info and the prev/next cursors"""
+    try:
+        page = song_library.paginate(genre_filter, cursor, PAGE_SIZE)
+    except ValueError:
+        page = song_library.paginate(genre_filter, None, PAGE_SIZE)
+    
+    rows = page["rows"]
+    if not rows:
+        rows = [["No songs available", "", "", ""]] if not song_library.count() else [["No songs found", "", "", ""]]
+    return rows, page_info(page), page["prev_cursor"], page["next_cursor"]
+
+def search_songs(query, genre_filter="All"):
+    """Search songs by title, artist and lyrics (accent-insensitive, last word as prefix)"""
+    if not query or not query.strip():
+        return get_song_page(genre_filter)
+    
+    rows = song_library.search(query, genre_filter, PAGE_SIZE)
+    if not rows:
+        return [["No songs found", "", "", ""]], "0 matches", None, None
+    return rows, f"Top {len(rows)} matches", None, None
+
 def save_recording(username, song_id, recording_file, rating=None):
     """Save a user's recording"""
     if not recording_file:
         return "No recording file provided!"
     
-    recordings = load_json(RECORDINGS_FILE)
     recording_id = f"rec_{username}_{song_id}_{datetime.datetime.now().timestamp()}"
     
-    # Save recording file
-    rec_dir = DATA_DIR / "audio" / "recordings"
-    rec_dir.mkdir(parents=True, exist_ok=True)
-    rec_path = f"data/audio/recordings/{recording_id}.mp3"
-    shutil.copy(recording_file, rec_path)
-    
-    recordings[recording_id] = {
-        "username": username,
-        "song_id": song_id,
-        "recording_path": rec_path,
-        "timestamp": str(datetime.datetime.now()),
-        "rating": rating,
-        "likes": 0,
-        "comments": []
-    }
-    
-    save_json(RECORDINGS_FILE, recordings)
-    
-    # Update user's recordings
-    users = load_json(USERS_FILE)
-    if username in users:
-        users[username]["recordings"].append(recording_id)
-        save_json(USERS_FILE, users)
+    # Save recording file (deduplicated by content)
+    blob = blob_store.put_file(recording_file)
+    rec_path = blob["path"]
     
-    # Update song play count
-    songs = load_json(SONGS_FILE)
-    if song_id in songs:
-        songs[song_id]["play_count"] = songs[song_id].get("play_count", 0) + 1
-        save_json(SONGS_FILE, songs)
+    # recordings, users and songs are each written once, in a single transaction
+    def apply(tx):
+        ranking_index = rankings.begin()
+        library_index = song_library.begin()
+        recordings = tx.load(RECORDINGS_FILE)
+        recording = recordings[recording_id] = {
+            "username": username,
+            "song_id": song_id,
+            "recording_path": rec_path,
+            "recording_blob": blob["hash"],
+            "timestamp": str(datetime.datetime.now()),
+            "rating": rating,
+            "score": None,
+            "accuracy": None,
+            "likes": 0,
+            "comment_count": 0
+        }
+        tx.save(RECORDINGS_FILE, recordings)
+        
+        # Update user's recordings
+        users = tx.load(USERS_FILE)
+        if username in users:
+            users[username]["recordings"].append(recording_id)
+            tx.save(USERS_FILE, users)
+        
+        # Update song play count
+        songs = tx.load(SONGS_FILE)
+        song = songs.get(song_id, {})
+        if song_id in songs:
+            song["play_count"] = song.get("play_count", 0) + 1
+            tx.save(SONGS_FILE, songs)
+        
+        song_title = song.get("title", "Unknown")
+        tx.after_commit(lambda: user_stats.record_recording(username, song_id, recording["timestamp"]))
+        tx.after_commit(lambda: rankings.commit(ranking_index, lambda index: index.add(recording_id, recording, song_title)))
+        tx.after_commit(lambda: song_library.commit(library_index))
+        return song.get("audio_path")
     
+    # Score the performance against the song's instrumental track in the background
+    try:
+        reference_path = store_writer.run(apply)
+    except Exception:
+        # The recording was not saved: drop the reference taken by the upload
+        blob_store.release(blob["hash"])
+        raise
+    if reference_path:
+        from scoring.features import score_recording
+        from scoring.jobs import QueueFullError, analysis_queue
+        try:
+            # The score is written on the I/O executor, not on the pool's result thread
+            SCORING_JOBS[recording_id] = analysis_queue.submit(
+                score_recording, rec_path, reference_path,
+                on_done=lambda result: record_score(recording_id, result),
+                callback_executor=aio.executor(),
+                on_evict=lambda: SCORING_JOBS.pop(recording_id, None)
+            )
+        except QueueFullError:
+            return f"Recording saved successfully! ID: {recording_id} - The scoring queue is full right now, so this recording was not scored."
+        return f"Recording saved successfully! ID: {recording_id} - Scoring in progress, use Check Score with this ID."
     return f"Recording saved successfully! ID: {recording_id}"
 
-def get_rankings(sort_by="likes"):
-    """Get rankings of recordings"""
-    recordings = load_json(RECORDINGS_FILE)
+def record_score(recording_id, result):
+    """Store a finished audio score on the recording and in the leaderboard"""
+    def apply(tx):
+        ranking_index = rankings.begin()
+        recordings = tx.load(RECORDINGS_FILE)
+        if recording_id not in recordings:
+            return None
+        
+        recording = recordings[recording_id]
+        recording["score"] = result["score"]
+        recording["accuracy"] = result["accuracy"]
+        tx.save(RECORDINGS_FILE, recordings)
+        tx.after_commit(lambda: rankings.commit(ranking_index))
+        return recording
+    
+    recording = store_writer.run(apply)
+    if recording is None:
+        return
+    
+    scores_store.add_score(recording["song_id"], recording["username"], result["score"], result["accuracy"])
+
+def get_recording_score(recording_id):
+    """Report the audio score of a recording, or the state of its scoring job"""
+    recording = load_json(RECORDINGS_FILE).get(recording_id)
+    if not recording:
+        return "Recording not found!"
+    
+    if recording.get("score") is not None:
+        return f"Score: {recording['score']} (accuracy {recording['accuracy']}%)"
+    
+    from scoring.jobs import analysis_queue
+    job = analysis_queue.status(SCORING_JOBS.get(recording_id))
+    if job is None:
+        return "This recording has not been scored."
+    if job["state"] == "failed":
+        return f"Scoring failed: {job['error']}"
+    if job["state"] == "done":
+        return f"Score: {job['result']['score']} (accuracy {job['result']['accuracy']}%)"
+    return f"Scoring in progress... ({analysis_queue.stats()['pending']} recordings in the queue)"
+
+def start_live_scoring(song_id):
+    """Create a streaming scorer for the selected song's reference track"""
     songs = load_json(SONGS_FILE)
+    reference_path = songs.get(song_id, {}).get("audio_path")
+    if not reference_path:
+        return None
     
-    if not recordings:
-        return [["No recordings yet", "", "", "0"]]
+    import numpy as np
+    from scoring.features import get_reference_features
+    from scoring.streaming import StreamingScorer
     
-    ranking_list = []
-    for rec_id, rec_data in recordings.items():
-        song_id = rec_data.get("song_id")
-        song_title = songs.get(song_id, {}).get("title", "Unknown") if song_id in songs else "Unknown"
-        
-        ranking_list.append([
-            rec_data["username"],
-            song_title,
-            rec_data.get("timestamp", "Unknown"),
-            str(rec_data.get("likes", 0)),
-            rec_id
-        ])
-    
-    # Sort by likes (descending)
-    if sort_by == "likes":
-        ranking_list.sort(key=lambda x: int(x[3]), reverse=True)
+    reference = get_reference_features(reference_path)
+    return StreamingScorer(np.asarray(reference["pitch"], dtype=np.float64), reference["hop_seconds"])
+
+def get_rankings(sort_by="likes", limit=None):
+    """Get rankings of recordings, by likes or most recent first"""
+    ranking_list = rankings.page(sort_by, limit)
+    
+    if not ranking_list:
+        return [["No recordings yet", "", "", "0"]]
     
     return ranking_list
 
+def get_rankings_page(sort_by="likes", cursor=None):
+    """Get one page of the rankings; returns rows, page info and the prev/next cursors"""
+    try:
+        page = rankings.paginate(sort_by, cursor, PAGE_SIZE)
+    except ValueError:
+        page = rankings.paginate(sort_by, None, PAGE_SIZE)
+    
+    rows = page["rows"] or [["No recordings yet", "", "", "0"]]
+    return rows, page_info(page), page["prev_cursor"], page["next_cursor"]
+
 def like_recording(recording_id):
-    """Add a like to a recording"""
-    recordings = load_json(RECORDINGS_FILE)
+    """Add a like to a recording (written to recordings.json in batches)"""
+    def apply(index):
+        if recording_id not in index:
+            return None
+        like_counter.add(recording_id, owner=index.username(recording_id))
+        return index.add_likes(recording_id, 1)
     
-    if recording_id not in recordings:
+    likes = rankings.read(apply)
+    if likes is None:
         return "Recording not found!"
     
-    recordings[recording_id]["likes"] = recordings[recording_id].get("likes", 0) + 1
-    save_json(RECORDINGS_FILE, recordings)
-    
-    return f"Liked! Total likes: {recordings[recording_id]['likes']}"
+    return f"Liked! Total likes: {likes}"
+
+def flush_likes(deltas):
+    """Write a batch of pending likes to recordings.json"""
+    # Runs with RECORDINGS_LOCK already held by the like counter, so it commits
+    # its own transaction instead of joining a store_writer batch
+    with RECORDINGS_LOCK:
+        ranking_index = rankings.begin()
+        tx = transactions.Transaction()
+        recordings = tx.load(RECORDINGS_FILE)
+        likes_by_user = {}
+        for recording_id, delta in deltas.items():
+            if recording_id in recordings:
+                recording = recordings[recording_id]
+                recording["likes"] = recording.get("likes", 0) + delta
+                likes_by_user[recording["username"]] = likes_by_user.get(recording["username"], 0) + delta
+        tx.save(RECORDINGS_FILE, recordings)
+        tx.commit()
+        user_stats.record_likes(likes_by_user)
+        rankings.commit(ranking_index)
 
 def add_comment(recording_id, username, comment):
     """Add a comment to a recording"""
     if not comment:
         return "Comment cannot be empty!"
-    
-    recordings = load_json(RECORDINGS_FILE)
-    
-    if recording_id not in recordings:
+    if not rankings.read(lambda index: recording_id in index):
         return "Recording not found!"
     
-    comment_data = {
-        "username": username,
-        "comment": comment,
-        "timestamp": str(datetime.datetime.now())
-    }
+    # The text goes to the recording's own comments file before the count is bumped:
+    # a failed write reaches the caller instead of leaving a count without a comment
+    comments_store.add_comment(recording_id, username, comment)
     
-    if "comments" not in recordings[recording_id]:
-        recordings[recording_id]["comments"] = []
+    def apply(tx):
+        ranking_index = rankings.begin()
+        recordings = tx.load(RECORDINGS_FILE)
+        
+        if recording_id not in recordings:
+            return "Recording not found!"
+        
+        recording = recordings[recording_id]
+        recording["comment_count"] = recording.get("comment_count", 0) + 1
+        tx.save(RECORDINGS_FILE, recordings)
+        tx.after_commit(lambda: rankings.commit(ranking_index))
+        return "Comment added successfully!"
     
-    recordings[recording_id]["comments"].append(comment_data)
-    save_json(RECORDINGS_FILE, recordings)
+    return store_writer.run(apply)
+
+def get_comments(recording_id, cursor=None, limit=20):
+    """Get a page of a recording's comments, oldest first; returns the comments and the next cursor"""
+    return comments_store.get_comments(recording_id, cursor, limit)
+
+def show_comments(recording_id, cursor=None):
+    """List a page of comments for the Rankings tab"""
+    try:
+        page = get_comments(recording_id, cursor, PAGE_SIZE)
+    except ValueError:
+        page = get_comments(recording_id, None, PAGE_SIZE)
     
-    return "Comment added successfully!"
+    rows = [[c["username"], c["comment"], c["timestamp"]] for c in page["comments"]]
+    return rows or [["No comments yet", "", ""]], page["next_cursor"]
+
+def migrate_embedded_comments():
+    """Move comments stored inside recordings.json to the comments store (once)"""
+    with RECORDINGS_LOCK:
+        recordings = load_json(RECORDINGS_FILE)
+        changed = False
+        for recording_id, recording in recordings.items():
+            if "comments" not in recording:
+                continue
+            comments = recording.pop("comments") or []
+            comments_store.append_comments(recording_id, comments)
+            recording["comment_count"] = recording.get("comment_count", 0) + len(comments)
+            changed = True
+        if changed:
+            save_json(RECORDINGS_FILE, recordings)
 
 def get_user_stats(username):
-    """Get statistics for a user"""
-    users = load_json(USERS_FILE)
-    recordings = load_json(RECORDINGS_FILE)
+    """Get statistics for a user (from the materialized per-user aggregates)"""
+    with RECORDINGS_LOCK:
+        user = user_stats.get_user_stats(username)
+        pending_likes = like_counter.pending_for_owner(username)
     
-    if username not in users:
+    if not user or not user["registered"]:
         return "User not found!"
     
-    user_recordings = users[username].get("recordings", [])
-    total_likes = sum(recordings.get(rec_id, {}).get("likes", 0) for rec_id in user_recordings)
+    if user["last_activity"] is None:
+        last_activity = "Never"
+    else:
+        last_activity = str(datetime.datetime.fromtimestamp(user["last_activity"]))
+    best_scores = ", ".join(f"{song_id}: {score}" for song_id, score in user["best_scores"].items()) or "None"
     
     stats = f"""
     📊 Statistics for {username}
     
-    Total Recordings: {len(user_recordings)}
-    Total Likes Received: {total_likes}
-    Member Since: {users[username].get('created_at', 'Unknown')}
-    Favorite Songs: {len(users[username].get('favorites', []))}
+    Total Recordings: {user['recordings']}
+    Total Likes Received: {user['likes'] + pending_likes}
+    Best Scores: {best_scores}
+    Last Activity: {last_activity}
+    Member Since: {user['member_since'] or 'Unknown'}
+    Favorite Songs: {user['favorites']}
     """
     
     return stats
 
+def event_handler(fn):
+    """Instrument an async Gradio handler; while a deferred startup runs, wait for the data first"""
+    @functools.wraps(fn)
+    async def handler(*args, **kwargs):
+        await wait_for_startup()
+        return await fn(*args, **kwargs)
+    return metrics.instrument("handler")(handler)
+
+async def wait_for_startup():
+    """Wait for the deferred startup without holding a thread; fail if it failed"""
+    while not startup_ready.is_set():
+        await asyncio.sleep(STARTUP_POLL_SECONDS)
+    if startup_error is not None:
+        raise gr.Error(f"JingleTube failed to start: {startup_error}")
+
+def async_handler(fn):
+    """Wrap a blocking app function as an async Gradio handler that runs on the store I/O executor"""
+    @functools.wraps(fn)
+    async def handler(*args, **kwargs):
+        return await aio.run(fn, *args, **kwargs)
+    return event_handler(handler)
+
+def get_metrics_tables():
+    """Per-function and per-file rows for the Admin tab"""
+    return metrics.registry.snapshot()
+
+def metrics_authorized(authorization):
+    """Check an HTTP Basic Authorization header against ADMIN_USERS and their passwords"""
+    scheme, _, credentials = (authorization or "").partition(" ")
+    if scheme.lower() != "basic":
+        return False
+    try:
+        username, _, password = base64.b64decode(credentials, validate=True).decode("utf-8").partition(":")
+    except (binascii.Error, UnicodeDecodeError):
+        return False
+    return username in ADMIN_USERS and login_user(username, password)[0]
+
+def metrics_endpoint(request):
+    """Serve the metrics in Prometheus text format (HTTP Basic auth, ADMIN_USERS only)"""
+    from starlette.responses import Response
+    if not metrics_authorized(request.headers.get("authorization")):
+        return Response("Unauthorized", status_code=401, headers={"WWW-Authenticate": 'Basic realm="metrics"'})
+    return Response(metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
+
+def prepare_data():
+    """Create the data files, finish an interrupted transaction and migrate old data"""
+    with startup_phase("data"):
+        DATA_DIR.mkdir(exist_ok=True)
+        
+        # Finish the file swaps of a transaction interrupted by a crash
+        transactions.recover()
+        
+        for file_path in [USERS_FILE, SONGS_FILE, RECORDINGS_FILE, RANKINGS_FILE]:
+            if not file_path.exists():
+                with open(file_path, 'w') as f:
+                    json.dump({}, f)
+    
+    with startup_phase("migrations"):
+        # Comments used to live inside recordings.json
+        migrate_embedded_comments()
+        
+        # Per-user stats are kept current from here on; build them once if missing
+        if not os.path.exists(user_stats.STATS_FILE):
+            user_stats.rebuild(load_json(USERS_FILE), load_json(RECORDINGS_FILE), scores_store.get_all_scores())
+
+def warm_up():
+    """Build the song library and rankings indexes before the first visitor needs them"""
+    with startup_phase("warm-up"):
+        get_song_page("All")
+        get_rankings_page("likes")
+
+def finish_startup():
+    """Deferred startup work, run in the background once the server is listening"""
+    global startup_error
+    try:
+        prepare_data()
+    except Exception as error:
+        startup_error = error
+        logger.exception("Preparing the data directory failed")
+    finally:
+        startup_ready.set()
+    
+    if startup_error is None:
+        try:
+            warm_up()
+        except Exception:
+            # The indexes are built on first use anyway
+            logger.exception("Warming up the indexes failed")
+    logger.info(startup_report())
+
+def handle_sigterm(signum, frame):
+    """Write the pending likes, then exit (running the atexit hooks too)"""
+    try:
+        like_counter.close()
+    except Exception:
+        logger.exception("Writing the pending likes on shutdown failed")
+    sys.exit(0)
+
+def launch(**kwargs):
+    """
+    Start the server (blocking unless prevent_thread_lock=True); with FAST_START,
+    the data preparation runs after the port is bound; with metrics enabled,
+    METRICS_PATH is served too, to ADMIN_USERS only
+    """
+    if metrics.ENABLED:
+        from starlette.routing import Route
+        app_kwargs = kwargs.setdefault("app_kwargs", {})
+        app_kwargs["routes"] = [Route(METRICS_PATH, metrics_endpoint)] + list(app_kwargs.get("routes", []))
+    
+    # Spaces and containers stop the app with SIGTERM, which skips atexit
+    if threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGTERM, handle_sigterm)
+    
+    block = not kwargs.pop("prevent_thread_lock", False)
+    with startup_phase("launch"):
+        result = app.launch(prevent_thread_lock=True, **kwargs)
+    if FAST_START:
+        threading.Thread(target=finish_startup, name="jingletube-startup", daemon=True).start()
+    else:
+        logger.info(startup_report())
+    if block:
+        app.block_thread()
+    return result
+
+scores_store.add_listener(user_stats.record_scores)
+# Spawned scoring workers import this module too; only the server prepares the data
+if not FAST_START and not SCORING_WORKER:
+    prepare_data()
+    startup_ready.set()
+
 # Create Gradio Interface
+_ui_start = time.perf_counter()
 with gr.Blocks(title="🎵 JingleTube - Karaoke Social Platform", theme=gr.themes.Soft()) as app:
     gr.Markdown("""
     # 🎵 JingleTube - Your Karaoke Social Platform
@@ -278,6 +695,7 @@ with gr.Blocks(title="🎵 JingleTube - Karaoke Social Platform", theme=gr.theme
             with gr.Row():
                 with gr.Column(scale=2):
                     gr.Markdown("### Available Songs")
+                    song_search = gr.Textbox(label="Search", placeholder="Title, artist or lyrics")
                     genre_filter = gr.Dropdown(
                         choices=["All", "Pop", "Rock", "Jazz", "Country", "R&B", "Hip-Hop", "Classical"],
                         value="All",
@@ -288,6 +706,12 @@ with gr.Blocks(title="🎵 JingleTube - Karaoke Social Platform", theme=gr.theme
                         label="Song Library",
                         interactive=False
                     )
+                    with gr.Row():
+                        songs_prev_btn = gr.Button("◀ Previous")
+                        songs_page_info = gr.Markdown()
+                        songs_next_btn = gr.Button("Next ▶")
+                    songs_prev_cursor = gr.State(None)
+                    songs_next_cursor = gr.State(None)
                     refresh_songs_btn = gr.Button("🔄 Refresh List")
                 
                 with gr.Column(scale=1):
@@ -302,6 +726,11 @@ with gr.Blocks(title="🎵 JingleTube - Karaoke Social Platform", theme=gr.theme
                     new_song_audio = gr.Audio(label="Upload Instrumental Track", type="filepath")
                     add_song_btn = gr.Button("➕ Add Song", variant="primary")
                     add_song_output = gr.Textbox(label="Status", interactive=False)
+                    
+                    gr.Markdown("### Import Playlist")
+                    import_file_input = gr.File(label="Text/CSV file: link,title,artist per line", file_types=[".txt", ".csv"], type="filepath")
+                    import_btn = gr.Button("📥 Import Links")
+                    import_output = gr.Textbox(label="Import Status", interactive=False)
         
         # Singing Interface Tab
         with gr.Tab("🎤 Sing!"):
@@ -315,6 +744,15 @@ with gr.Blocks(title="🎵 JingleTube - Karaoke Social Platform", theme=gr.theme
                     self_rating = gr.Slider(minimum=1, maximum=10, step=1, label="Rate Your Performance", value=5)
                     save_recording_btn = gr.Button("💾 Save Recording", variant="primary")
                     recording_output = gr.Textbox(label="Status", interactive=False)
+                    
+                    score_recording_id = gr.Textbox(label="Recording ID", placeholder="Copy from the status above")
+                    check_score_btn = gr.Button("🎯 Check Score")
+                    score_output = gr.Textbox(label="Score", interactive=False)
+                    
+                    gr.Markdown("### 🎯 Live Scoring")
+                    live_input = gr.Audio(label="Sing Live", sources=["microphone"], type="numpy", streaming=True)
+                    live_score_output = gr.Textbox(label="Live Score", interactive=False)
+                    live_scorer = gr.State(None)
                 
                 with gr.Column():
                     gr.Markdown("### 📝 Song Lyrics")
@@ -336,6 +774,13 @@ with gr.Blocks(title="🎵 JingleTube - Karaoke Social Platform", theme=gr.theme
                 interactive=False
             )
             
+            with gr.Row():
+                rankings_prev_btn = gr.Button("◀ Previous")
+                rankings_page_info = gr.Markdown()
+                rankings_next_btn = gr.Button("Next ▶")
+            rankings_prev_cursor = gr.State(None)
+            rankings_next_cursor = gr.State(None)
+            
             refresh_rankings_btn = gr.Button("🔄 Refresh Rankings")
             
             with gr.Row():
@@ -349,6 +794,14 @@ with gr.Blocks(title="🎵 JingleTube - Karaoke Social Platform", theme=gr.theme
                     comment_text = gr.Textbox(label="Your Comment")
                     comment_btn = gr.Button("💬 Add Comment", variant="primary")
                     comment_output = gr.Textbox(label="Status", interactive=False)
+                    show_comments_btn = gr.Button("📜 Show Comments")
+                    comments_table = gr.Dataframe(
+                        headers=["User", "Comment", "Date"],
+                        label="Comments",
+                        interactive=False
+                    )
+                    more_comments_btn = gr.Button("More Comments")
+                    comments_next_cursor = gr.State(None)
         
         # Profile Tab
         with gr.Tab("👤 Profile"):
@@ -357,46 +810,103 @@ with gr.Blocks(title="🎵 JingleTube - Karaoke Social Platform", theme=gr.theme
             stats_username = gr.Textbox(label="Username", placeholder="Enter username to view stats")
             get_stats_btn = gr.Button("📊 Get Statistics", variant="primary")
             stats_output = gr.TextArea(label="User Statistics", interactive=False, lines=10)
+        
+        # Admin Tab (only with metrics enabled, shown to ADMIN_USERS after login)
+        admin_tab = None
+        if metrics.ENABLED:
+            with gr.Tab("🛠️ Admin", visible=False) as admin_tab:
+                gr.Markdown(f"## Metrics\nPrometheus format at `{METRICS_PATH}`")
+                metrics_calls_table = gr.Dataframe(
+                    headers=["Kind", "Name", "Calls", "Errors", "Mean (ms)", "p95 ≤ (ms)"],
+                    label="Handlers and I/O",
+                    interactive=False
+                )
+                metrics_files_table = gr.Dataframe(
+                    headers=["File", "Reads", "Bytes Read", "Writes", "Bytes Written", "Size"],
+                    label="Files",
+                    interactive=False
+                )
+                refresh_metrics_btn = gr.Button("🔄 Refresh Metrics")
     
     # Event Handlers
-    def handle_login(username, password):
-        success, message = login_user(username, password)
-        return message, username if success else None
+    @event_handler
+    async def handle_login(username, password):
+        success, message = await aio.run(login_user, username, password)
+        user = username if success else None
+        if admin_tab is None:
+            return message, user
+        return message, user, gr.update(visible=user in ADMIN_USERS)
     
     login_btn.click(
         fn=handle_login,
         inputs=[login_username, login_password],
-        outputs=[login_output, current_user]
+        outputs=[login_output, current_user] + ([admin_tab] if admin_tab is not None else [])
     )
     
     register_btn.click(
-        fn=register_user,
+        fn=async_handler(register_user),
         inputs=[reg_username, reg_password, reg_email],
         outputs=register_output
     )
     
     add_song_btn.click(
-        fn=add_song_to_library,
+        fn=async_handler(add_song_to_library),
         inputs=[new_song_title, new_song_artist, new_song_genre, new_song_lyrics, new_song_audio],
         outputs=add_song_output
     )
     
+    song_page_outputs = [song_table, songs_page_info, songs_prev_cursor, songs_next_cursor]
+    
+    @event_handler
+    async def handle_import(file_path, query, genre, progress=gr.Progress()):
+        def report(stats):
+            progress(stats["fraction"], desc=f"{stats['imported']} songs imported")
+        
+        status = await aio.run(import_song_links, file_path, report)
+        return (status, *await aio.run(search_songs, query, genre))
+    
+    import_btn.click(
+        fn=handle_import,
+        inputs=[import_file_input, song_search, genre_filter],
+        outputs=[import_output] + song_page_outputs
+    )
+    
     refresh_songs_btn.click(
-        fn=get_song_list,
-        inputs=[genre_filter],
-        outputs=song_table
+        fn=async_handler(search_songs),
+        inputs=[song_search, genre_filter],
+        outputs=song_page_outputs
     )
     
     genre_filter.change(
-        fn=get_song_list,
-        inputs=[genre_filter],
-        outputs=song_table
+        fn=async_handler(search_songs),
+        inputs=[song_search, genre_filter],
+        outputs=song_page_outputs
+    )
+    
+    song_search.change(
+        fn=async_handler(search_songs),
+        inputs=[song_search, genre_filter],
+        outputs=song_page_outputs,
+        trigger_mode="always_last"
+    )
+    
+    songs_prev_btn.click(
+        fn=async_handler(get_song_page),
+        inputs=[genre_filter, songs_prev_cursor],
+        outputs=song_page_outputs
+    )
+    
+    songs_next_btn.click(
+        fn=async_handler(get_song_page),
+        inputs=[genre_filter, songs_next_cursor],
+        outputs=song_page_outputs
     )
     
-    def handle_save_recording(username, song_id, recording, rating):
+    @event_handler
+    async def handle_save_recording(username, song_id, recording, rating):
         if not username:
             return "Please login first!"
-        return save_recording(username, song_id, recording, rating)
+        return await aio.run(save_recording, username, song_id, recording, rating)
     
     save_recording_btn.click(
         fn=handle_save_recording,
@@ -404,22 +914,78 @@ with gr.Blocks(title="🎵 JingleTube - Karaoke Social Platform", theme=gr.theme
         outputs=recording_output
     )
     
+    check_score_btn.click(
+        fn=async_handler(get_recording_score),
+        inputs=[score_recording_id],
+        outputs=score_output
+    )
+    
+    @event_handler
+    async def handle_live_chunk(chunk, scorer, song_id):
+        if chunk is None:
+            return scorer, gr.update()
+        if scorer is None:
+            scorer = await aio.run(start_live_scoring, song_id)
+            if scorer is None:
+                return None, "This song has no instrumental track to score against."
+        sr, samples = chunk
+        result = await aio.run(scorer.feed, samples, sr)
+        return scorer, f"🎯 Live score: {result['score']} (accuracy {result['accuracy']}%)"
+    
+    # A new take starts a new scorer
+    @metrics.instrument("handler")
+    def handle_live_start():
+        return None, ""
+    
+    live_input.start_recording(
+        fn=handle_live_start,
+        inputs=None,
+        outputs=[live_scorer, live_score_output]
+    )
+    
+    live_input.stream(
+        fn=handle_live_chunk,
+        inputs=[live_input, live_scorer, selected_song_id],
+        outputs=[live_scorer, live_score_output]
+    )
+    
+    rankings_page_outputs = [rankings_table, rankings_page_info, rankings_prev_cursor, rankings_next_cursor]
+    
     refresh_rankings_btn.click(
-        fn=get_rankings,
+        fn=async_handler(get_rankings_page),
         inputs=[sort_option],
-        outputs=rankings_table
+        outputs=rankings_page_outputs
+    )
+    
+    sort_option.change(
+        fn=async_handler(get_rankings_page),
+        inputs=[sort_option],
+        outputs=rankings_page_outputs
+    )
+    
+    rankings_prev_btn.click(
+        fn=async_handler(get_rankings_page),
+        inputs=[sort_option, rankings_prev_cursor],
+        outputs=rankings_page_outputs
+    )
+    
+    rankings_next_btn.click(
+        fn=async_handler(get_rankings_page),
+        inputs=[sort_option, rankings_next_cursor],
+        outputs=rankings_page_outputs
     )
     
     like_btn.click(
-        fn=like_recording,
+        fn=async_handler(like_recording),
         inputs=[like_recording_id],
         outputs=like_output
     )
     
-    def handle_comment(rec_id, username, comment):
+    @event_handler
+    async def handle_comment(rec_id, username, comment):
         if not username:
             return "Please login first!"
-        return add_comment(rec_id, username, comment)
+        return await aio.run(add_comment, rec_id, username, comment)
     
     comment_btn.click(
         fn=handle_comment,
@@ -427,24 +993,52 @@ with gr.Blocks(title="🎵 JingleTube - Karaoke Social Platform", theme=gr.theme
         outputs=comment_output
     )
     
+    show_comments_btn.click(
+        fn=async_handler(show_comments),
+        inputs=[comment_recording_id],
+        outputs=[comments_table, comments_next_cursor]
+    )
+    
+    @event_handler
+    async def handle_more_comments(rec_id, cursor):
+        if not cursor:
+            return gr.update(), None
+        return await aio.run(show_comments, rec_id, cursor)
+    
+    more_comments_btn.click(
+        fn=handle_more_comments,
+        inputs=[comment_recording_id, comments_next_cursor],
+        outputs=[comments_table, comments_next_cursor]
+    )
+    
     get_stats_btn.click(
-        fn=get_user_stats,
+        fn=async_handler(get_user_stats),
         inputs=[stats_username],
         outputs=stats_output
     )
     
+    if admin_tab is not None:
+        refresh_metrics_btn.click(
+            fn=async_handler(get_metrics_tables),
+            inputs=None,
+            outputs=[metrics_calls_table, metrics_files_table]
+        )
+    
     # Load initial data
     app.load(
-        fn=get_song_list,
+        fn=async_handler(get_song_page),
         inputs=[genre_filter],
-        outputs=song_table
+        outputs=song_page_outputs
     )
     
     app.load(
-        fn=get_rankings,
+        fn=async_handler(get_rankings_page),
         inputs=[sort_option],
-        outputs=rankings_table
+        outputs=rankings_page_outputs
     )
 
+app.queue(default_concurrency_limit=HANDLER_CONCURRENCY)
+STARTUP_TIMES["ui"] = time.perf_counter() - _ui_start
+
 if __name__ == "__main__":
-    app.launch(server_name="0.0.0.0", server_port=7860, share=False)
+    launch(server_name="0.0.0.0", server_port=7860, share=False)
@@ -0,0 +1 @@
+# Scoring module
\ No newline at end of file
@@ -0,0 +1,344 @@
+"""
+Pontuação de gravações por áudio
+Compara o contorno de pitch da gravação com o da faixa de referência
+
+Todo o processamento é vetorizado com NumPy: o áudio é dividido em quadros
+(uma matriz quadros x amostras) e o pitch de cada quadro sai de uma
+autocorrelação via FFT, processando blocos de quadros por vez.
+"""
+import os
+import wave
+
+import numpy as np
+
+# O áudio é decimado por um fator inteiro até ficar próximo desta taxa
+ANALYSIS_RATE = 8000
+FRAME_SECONDS = 0.048
+HOP_SECONDS = 0.016
+MIN_FREQ = 70.0
+MAX_FREQ = 1000.0
+# Autocorrelação normalizada mínima para o quadro ser considerado vozeado
+VOICING_THRESHOLD = 0.5
+# RMS mínimo (escala -1..1) para o quadro não ser tratado como silêncio
+SILENCE_RMS = 0.01
+# Erro de afinação (cents) com crédito total, e a partir do qual o crédito é zero
+TOLERANCE_CENTS = 50.0
+MAX_ERROR_CENTS = 300.0
+# Quadros analisados por bloco, para limitar a memória das FFTs
+BLOCK_FRAMES = 2048
+# Os créditos por quadro são somados como inteiros (em milionésimos) para que o
+# total não dependa da ordem de soma: a pontuação em streaming, acumulada aos
+# pedaços, fica idêntica à de uma passada única sobre o mesmo áudio.
+CREDIT_SCALE = 1000000
+
+
+def load_audio(path):
+    """
+    Carrega um arquivo de áudio como mono em ponto flutuante
+
+    WAV é lido com a biblioteca padrão; outros formatos (como os .mp3 das
+    faixas de referência) usam pydub, que chama o ffmpeg.
+
+    Args:
+        path (str): Caminho do arquivo
+
+    Returns:
+        tuple: (amostras float64 entre -1 e 1, taxa de amostragem)
+    """
+    try:
+        with wave.open(str(path), 'rb') as wav:
+            width = wav.getsampwidth()
+            channels = wav.getnchannels()
+            sr = wav.getframerate()
+            raw = wav.readframes(wav.getnframes())
+    except (wave.Error, EOFError):
+        return _load_with_pydub(path)
+
+    if width == 1:
+        samples = (np.frombuffer(raw, dtype=np.uint8).astype(np.float64) - 128.0) / 128.0
+    elif width in (2, 4):
+        dtype = np.int16 if width == 2 else np.int32
+        samples = np.frombuffer(raw, dtype=dtype) / float(2 ** (8 * width - 1))
+    else:
+        return _load_with_pydub(path)
+
+    return to_mono(samples, channels), sr
+
+
+def _load_with_pydub(path):
+    """Carrega formatos comprimidos (mp3, ogg...) via pydub e ffmpeg"""
+    try:
+        from pydub import AudioSegment
+    except ImportError:
+        raise ValueError(f"Formato de áudio não suportado sem pydub (pip install -r requirements.txt): {path}")
+
+    try:
+        segment = AudioSegment.from_file(str(path))
+    except FileNotFoundError as error:
+        if os.path.exists(path):
+            raise ValueError(f"ffmpeg não encontrado para decodificar {path}: instale o ffmpeg") from error
+        raise
+    samples = np.array(segment.get_array_of_samples(), dtype=np.float64)
+    samples /= float(2 ** (8 * segment.sample_width - 1))
+    return to_mono(samples, segment.channels), segment.frame_rate
+
+
+def to_mono(samples, channels):
+    """
+    Converte amostras intercaladas em mono pela média dos canais
+
+    Args:
+        samples (np.ndarray): Amostras intercaladas
+        channels (int): Número de canais
+
+    Returns:
+        np.ndarray: Amostras mono
+    """
+    samples = np.asarray(samples, dtype=np.float64)
+    if samples.ndim == 2:
+        return samples.mean(axis=1)
+    if channels > 1:
+        samples = samples[:len(samples) - len(samples) % channels]
+        return samples.reshape(-1, channels).mean(axis=1)
+    return samples
+
+
+def analysis_params(sr):
+    """
+    Parâmetros de análise para uma taxa de amostragem
+
+    Args:
+        sr (int): Taxa de amostragem original
+
+    Returns:
+        tuple: (fator de decimação, taxa de análise, tamanho do quadro, hop)
+    """
+    factor = max(1, int(sr // ANALYSIS_RATE))
+    rate = sr / factor
+    frame_len = int(round(FRAME_SECONDS * rate))
+    hop = int(round(HOP_SECONDS * rate))
+    return factor, rate, frame_len, hop
+
+
+def decimate(samples, factor):
+    """Reduz a taxa pela média de cada grupo de `factor` amostras (sobras são descartadas)"""
+    if factor == 1:
+        return samples
+    n = len(samples) - len(samples) % factor
+    return samples[:n].reshape(-1, factor).mean(axis=1)
+
+
+def frame_signal(samples, frame_len, hop):
+    """
+    Divide o sinal em quadros sobrepostos, sem copiar
+
+    Args:
+        samples (np.ndarray): Sinal mono
+        frame_len (int): Amostras por quadro
+        hop (int): Avanço entre quadros
+
+    Returns:
+        np.ndarray: Matriz (quadros, frame_len)
+    """
+    if len(samples) < frame_len:
+        return np.empty((0, frame_len))
+    return np.lib.stride_tricks.sliding_window_view(samples, frame_len)[::hop]
+
+
+_window_cache = {}
+
+
+def _fft_size(frame_len):
+    """Potência de 2 que evita a autocorrelação circular (tamanhos primos deixam a FFT lenta)"""
+    return 1 << (2 * frame_len - 1).bit_length()
+
+
+def _window(frame_len):
+    """Janela de Hann e sua autocorrelação normalizada (para corrigir o viés da janela)"""
+    if frame_len not in _window_cache:
+        window = np.hanning(frame_len)
+        spectrum = np.fft.rfft(window, n=_fft_size(frame_len))
+        acf = np.fft.irfft(np.abs(spectrum) ** 2)[:frame_len]
+        _window_cache[frame_len] = (window, acf / acf[0])
+    return _window_cache[frame_len]
+
+
+def frames_pitch(frames, rate):
+    """
+    Estima a frequência fundamental de cada quadro
+
+    Args:
+        frames (np.ndarray): Matriz (quadros, amostras)
+        rate (float): Taxa de amostragem dos quadros
+
+    Returns:
+        np.ndarray: f0 em Hz por quadro (0 para quadros não vozeados)
+    """
+    n_frames, frame_len = frames.shape
+    f0 = np.zeros(n_frames)
+    if n_frames == 0:
+        return f0
+
+    window, window_acf = _window(frame_len)
+    n_fft = _fft_size(frame_len)
+    lo = max(1, int(np.ceil(rate / MAX_FREQ)))
+    hi = min(frame_len // 2, int(rate / MIN_FREQ) + 1)
+
+    for start in range(0, n_frames, BLOCK_FRAMES):
+        block = frames[start:start + BLOCK_FRAMES]
+        block = block - block.mean(axis=1, keepdims=True)
+        rms = np.sqrt(np.mean(block ** 2, axis=1))
+
+        spectrum = np.fft.rfft(block * window, n=n_fft, axis=1)
+        acf = np.fft.irfft(spectrum.real ** 2 + spectrum.imag ** 2, axis=1)[:, :hi + 1]
+        energy = acf[:, :1]
+        acf = np.divide(acf, energy, out=np.zeros_like(acf), where=energy > 0)
+        acf /= window_acf[:hi + 1]
+
+        # Primeiro máximo local próximo do pico global: evita escolher múltiplos do período
+        seg = acf[:, lo:hi]
+        left = acf[:, lo - 1:hi - 1]
+        right = acf[:, lo + 1:hi + 1]
+        peak = seg.max(axis=1)
+        candidates = (seg > left) & (seg >= right) & (seg >= 0.9 * peak[:, None])
+        has_candidate = candidates.any(axis=1)
+        k = candidates.argmax(axis=1) + lo
+
+        rows = np.arange(len(block))
+        a, b, c = acf[rows, k - 1], acf[rows, k], acf[rows, k + 1]
+        denom = a - 2 * b + c
+        delta = np.divide(0.5 * (a - c), denom, out=np.zeros_like(denom), where=denom != 0)
+        lag = k + np.clip(delta, -0.5, 0.5)
+
+        voiced = has_candidate & (b >= VOICING_THRESHOLD) & (rms >= SILENCE_RMS)
+        f0[start:start + len(block)] = np.where(voiced, rate / lag, 0.0)
+
+    return f0
+
+
+def pitch_contour(samples, sr):
+    """
+    Calcula o contorno de pitch de um sinal
+
+    Args:
+        samples (np.ndarray): Sinal mono
+        sr (int): Taxa de amostragem
+
+    Returns:
+        tuple: (f0 em Hz por quadro, duração do hop em segundos)
+    """
+    factor, rate, frame_len, hop = analysis_params(sr)
+    frames = frame_signal(decimate(np.asarray(samples, dtype=np.float64), factor), frame_len, hop)
+    return frames_pitch(frames, rate), hop / rate
+
+
+def align_reference(n_frames, hop_seconds, ref_f0, ref_hop_seconds, offset=0):
+    """
+    Seleciona o quadro da referência mais próximo no tempo de cada quadro do usuário
+
+    Args:
+        n_frames (int): Quantidade de quadros do usuário
+        hop_seconds (float): Hop do usuário em segundos
+        ref_f0 (np.ndarray): Contorno da referência
+        ref_hop_seconds (float): Hop da referência em segundos
+        offset (int): Índice do primeiro quadro do usuário
+
+    Returns:
+        np.ndarray: f0 da referência alinhado (NaN após o fim da referência)
+    """
+    times = (np.arange(n_frames) + offset) * hop_seconds
+    idx = np.rint(times / ref_hop_seconds).astype(np.int64)
+    aligned = np.full(n_frames, np.nan)
+    inside = idx < len(ref_f0)
+    aligned[inside] = ref_f0[idx[inside]]
+    return aligned
+
+
+def frame_credit(user_f0, ref_f0):
+    """
+    Crédito de afinação por quadro
+
+    Só contam os quadros em que a referência é vozeada. Erros são dobrados
+    na oitava, então cantar uma oitava abaixo não é penalizado.
+
+    Args:
+        user_f0 (np.ndarray): Contorno do usuário
+        ref_f0 (np.ndarray): Contorno da referência alinhado
+
+    Returns:
+        tuple: (soma dos créditos em CREDIT_SCALE, quadros afinados, quadros avaliados)
+    """
+    scored = np.nan_to_num(ref_f0) > 0
+    both = scored & (user_f0 > 0)
+    cents = 1200.0 * np.log2(user_f0[both] / ref_f0[both])
+    error = np.abs((cents + 600.0) % 1200.0 - 600.0)
+    credit = np.clip((MAX_ERROR_CENTS - error) / (MAX_ERROR_CENTS - TOLERANCE_CENTS), 0.0, 1.0)
+    credit_units = np.rint(credit * CREDIT_SCALE).astype(np.int64)
+    return int(credit_units.sum()), int(np.count_nonzero(error <= TOLERANCE_CENTS)), int(np.count_nonzero(scored))
+
+
+def summarize(credit_sum, hits, scored):
+    """
+    Converte os totais de crédito em nota e precisão
+
+    Args:
+        credit_sum (int): Soma dos créditos em CREDIT_SCALE
+        hits (int): Quadros dentro da tolerância
+        scored (int): Quadros avaliados
+
+    Returns:
+        dict: score (0-100) e accuracy (percentual)
+    """
+    if scored == 0:
+        return {"score": 0, "accuracy": 0.0}
+    return {
+        "score": int(round(100.0 * credit_sum / (scored * CREDIT_SCALE))),
+        "accuracy": round(100.0 * hits / scored, 1)
+    }
+
+
+def score_contours(user_f0, hop_seconds, ref_f0, ref_hop_seconds):
+    """
+    Pontua um contorno de pitch contra o da referência
+
+    Returns:
+        dict: score (0-100) e accuracy (percentual)
+    """
+    aligned = align_reference(len(user_f0), hop_seconds, ref_f0, ref_hop_seconds)
+    return summarize(*frame_credit(user_f0, aligned))
+
+
+def score_audio(samples, sr, ref_samples, ref_sr):
+    """
+    Pontua um sinal contra o sinal de referência
+
+    Args:
+        samples (np.ndarray): Gravação mono
+        sr (int): Taxa da gravação
+        ref_samples (np.ndarray): Referência mono
+        ref_sr (int): Taxa da referência
+
+    Returns:
+        dict: score (0-100) e accuracy (percentual)
+    """
+    user_f0, hop_seconds = pitch_contour(samples, sr)
+    ref_f0, ref_hop_seconds = pitch_contour(ref_samples, ref_sr)
+    return score_contours(user_f0, hop_seconds, ref_f0, ref_hop_seconds)
+
+
+def score_recording(recording_path, reference_path):
+    """
+    Pontua uma gravação contra a faixa da música
+
+    O resultado pode ser passado direto para scores_store.add_score.
+
+    Args:
+        recording_path (str): Arquivo da gravação
+        reference_path (str): Faixa de referência (audio_path da música)
+
+    Returns:
+        dict: score (0-100) e accuracy (percentual)
+    """
+    samples, sr = load_audio(recording_path)
+    ref_samples, ref_sr = load_audio(reference_path)
+    return score_audio(samples, sr, ref_samples, ref_sr)
@@ -0,0 +1,271 @@
+"""
+Cache de características das faixas de referência
+Pitch, onsets, andamento e envelope de volume são calculados uma vez por
+faixa e gravados como arrays .npy ao lado do áudio, lidos via memory-map.
+
+Layout: <audio_path>.features/{pitch,loudness,onsets}.npy + meta.json
+O meta.json é gravado por último e guarda o hash do conteúdo da faixa: se a
+faixa for substituída, as características são recalculadas.
+"""
+import hashlib
+import json
+import os
+import tempfile
+
+import numpy as np
+
+from . import engine
+
+# Incrementar quando o formato ou o cálculo das características mudar
+FEATURES_VERSION = 1
+ARRAYS = ("pitch", "loudness", "onsets")
+MIN_BPM = 60.0
+MAX_BPM = 180.0
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def features_dir(audio_path):
+    """Diretório das características de uma faixa"""
+    return f"{audio_path}.features"
+
+
+def content_hash(path):
+    """
+    Hash SHA-256 do arquivo, lido em blocos
+
+    Args:
+        path (str): Caminho do arquivo
+
+    Returns:
+        str: Hash em hexadecimal
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def loudness_envelope(samples, sr):
+    """
+    RMS por quadro, na mesma grade de quadros do contorno de pitch
+
+    Usa soma acumulada dos quadrados para não materializar a matriz de quadros.
+
+    Returns:
+        np.ndarray: RMS por quadro
+    """
+    factor, _, frame_len, hop = engine.analysis_params(sr)
+    x = engine.decimate(np.asarray(samples, dtype=np.float64), factor)
+    if len(x) < frame_len:
+        return np.zeros(0)
+    starts = np.arange(0, len(x) - frame_len + 1, hop)
+    cumulative = np.concatenate([[0.0], np.cumsum(x * x)])
+    energy = (cumulative[starts + frame_len] - cumulative[starts]) / frame_len
+    return np.sqrt(np.maximum(energy, 0.0))
+
+
+def onset_strength(loudness):
+    """Aumento positivo do volume em escala log entre quadros consecutivos"""
+    log_loudness = np.log(loudness + 1e-6)
+    return np.maximum(np.diff(log_loudness, prepend=log_loudness[:1]), 0.0)
+
+
+def detect_onsets(strength, hop_seconds):
+    """
+    Tempos de ataque: picos locais da força de onset acima de média + desvio
+
+    Returns:
+        np.ndarray: Tempos em segundos
+    """
+    if len(strength) < 3:
+        return np.zeros(0)
+    threshold = strength.mean() + strength.std()
+    middle = strength[1:-1]
+    peaks = (middle > strength[:-2]) & (middle >= strength[2:]) & (middle > threshold)
+    return (np.nonzero(peaks)[0] + 1) * hop_seconds
+
+
+def estimate_tempo(strength, hop_seconds):
+    """
+    Andamento pela autocorrelação da força de onset
+
+    Returns:
+        float: BPM (0 se não houver sinal suficiente)
+    """
+    lo = int(np.floor(60.0 / MAX_BPM / hop_seconds))
+    hi = int(np.ceil(60.0 / MIN_BPM / hop_seconds))
+    if len(strength) <= hi + 1 or not strength.any():
+        return 0.0
+    centered = strength - strength.mean()
+    n_fft = 1 << (2 * len(centered) - 1).bit_length()
+    spectrum = np.fft.rfft(centered, n=n_fft)
+    acf = np.fft.irfft(spectrum.real ** 2 + spectrum.imag ** 2)[:hi + 1]
+    lag = lo + int(np.argmax(acf[lo:hi + 1]))
+    return 60.0 / (lag * hop_seconds) if lag else 0.0
+
+
+def compute_features(samples, sr):
+    """
+    Calcula as características de uma faixa
+
+    Args:
+        samples (np.ndarray): Sinal mono
+        sr (int): Taxa de amostragem
+
+    Returns:
+        dict: pitch, loudness e onsets (arrays float32), hop_seconds e tempo
+    """
+    pitch, hop_seconds = engine.pitch_contour(samples, sr)
+    loudness = loudness_envelope(samples, sr)
+    strength = onset_strength(loudness)
+    return {
+        "pitch": pitch.astype(np.float32),
+        "loudness": loudness.astype(np.float32),
+        "onsets": detect_onsets(strength, hop_seconds).astype(np.float32),
+        "hop_seconds": hop_seconds,
+        "tempo": estimate_tempo(strength, hop_seconds)
+    }
+
+
+def _read_meta(directory):
+    """Lê o meta.json do diretório de características (None se ausente ou corrompido)"""
+    try:
+        with open(os.path.join(directory, "meta.json"), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_atomic(path, write):
+    """
+    Grava em arquivo temporário e renomeia, para leitores nunca verem arquivo parcial
+
+    O temporário tem nome único no mesmo diretório (mkstemp): threads do
+    mesmo processo gravando a mesma faixa não compartilham o arquivo.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", prefix=os.path.basename(path) + ".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            write(f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def save_features(audio_path, features, digest=None):
+    """
+    Grava as características ao lado da faixa
+
+    Args:
+        audio_path (str): Caminho da faixa
+        features (dict): Resultado de compute_features
+        digest (str): Hash do conteúdo (calculado se omitido)
+    """
+    directory = features_dir(audio_path)
+    os.makedirs(directory, exist_ok=True)
+    for name in ARRAYS:
+        _write_atomic(os.path.join(directory, f"{name}.npy"), lambda f, a=features[name]: np.save(f, a))
+
+    st = os.stat(audio_path)
+    meta = {
+        "version": FEATURES_VERSION,
+        "hash": digest or content_hash(audio_path),
+        "size": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+        "hop_seconds": features["hop_seconds"],
+        "tempo": features["tempo"]
+    }
+    _write_atomic(os.path.join(directory, "meta.json"), lambda f: f.write(json.dumps(meta).encode('utf-8')))
+
+
+def load_features(audio_path):
+    """
+    Lê as características gravadas, se ainda corresponderem à faixa
+
+    Se tamanho e mtime da faixa mudaram, o conteúdo é rehasheado: só um hash
+    diferente invalida o cache.
+
+    Args:
+        audio_path (str): Caminho da faixa
+
+    Returns:
+        dict: Características (arrays em memory-map) ou None se ausentes/obsoletas
+    """
+    directory = features_dir(audio_path)
+    meta = _read_meta(directory)
+    if not meta or meta.get("version") != FEATURES_VERSION:
+        return None
+
+    st = os.stat(audio_path)
+    if (meta["size"], meta["mtime_ns"]) != (st.st_size, st.st_mtime_ns):
+        if content_hash(audio_path) != meta["hash"]:
+            return None
+        meta.update(size=st.st_size, mtime_ns=st.st_mtime_ns)
+        _write_atomic(os.path.join(directory, "meta.json"), lambda f: f.write(json.dumps(meta).encode('utf-8')))
+
+    try:
+        features = {
+            name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode='r')
+            for name in ARRAYS
+        }
+    except (OSError, ValueError):
+        return None
+    features["hop_seconds"] = meta["hop_seconds"]
+    features["tempo"] = meta["tempo"]
+    return features
+
+
+def get_reference_features(audio_path):
+    """
+    Características de uma faixa, calculadas e gravadas na primeira vez
+
+    Args:
+        audio_path (str): Caminho da faixa
+
+    Returns:
+        dict: pitch, loudness, onsets, hop_seconds e tempo
+    """
+    features = load_features(audio_path)
+    if features is None:
+        features = compute_features(*engine.load_audio(audio_path))
+        save_features(audio_path, features)
+    return features
+
+
+def precompute_features(audio_path):
+    """
+    Garante que as características da faixa estão gravadas (usado no upload)
+
+    Args:
+        audio_path (str): Caminho da faixa
+
+    Returns:
+        bool: True se precisou calcular, False se já estavam em cache
+    """
+    if load_features(audio_path) is not None:
+        return False
+    save_features(audio_path, compute_features(*engine.load_audio(audio_path)))
+    return True
+
+
+def score_recording(recording_path, reference_path):
+    """
+    Pontua uma gravação usando as características em cache da referência
+
+    Só o áudio do usuário é analisado, com a mesma comparação de
+    engine.score_recording.
+
+    Args:
+        recording_path (str): Arquivo da gravação
+        reference_path (str): Faixa de referência
+
+    Returns:
+        dict: score (0-100) e accuracy (percentual)
+    """
+    reference = get_reference_features(reference_path)
+    user_f0, hop_seconds = engine.pitch_contour(*engine.load_audio(recording_path))
+    return engine.score_contours(user_f0, hop_seconds, np.asarray(reference["pitch"], dtype=np.float64),
+                                 reference["hop_seconds"])
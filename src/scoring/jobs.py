@@ -0,0 +1,216 @@
+"""
+Fila de análise de gravações em processos separados
+Tira o trabalho de CPU (pontuação por áudio) da thread de requisição do Gradio
+"""
+import contextlib
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+# Processos de análise e quantidade máxima de jobs pendentes (na fila ou rodando)
+MAX_WORKERS = int(os.getenv("JINGLETUBE_SCORING_WORKERS", "2"))
+MAX_PENDING = int(os.getenv("JINGLETUBE_SCORING_QUEUE", "16"))
+# Jobs finalizados mantidos para consulta de status
+KEEP_FINISHED = 1000
+# Variável de ambiente que marca os processos de análise (o app não prepara dados neles)
+WORKER_ENV = "JINGLETUBE_SCORING_WORKER"
+
+
+class QueueFullError(Exception):
+    """A fila atingiu o limite de jobs pendentes"""
+
+
+@contextlib.contextmanager
+def _worker_env():
+    """Marca WORKER_ENV enquanto o pool cria processos (eles herdam o ambiente)"""
+    previous = os.environ.get(WORKER_ENV)
+    os.environ[WORKER_ENV] = "1"
+    try:
+        yield
+    finally:
+        if previous is None:
+            os.environ.pop(WORKER_ENV, None)
+        else:
+            os.environ[WORKER_ENV] = previous
+
+
+def _run(fn, args):
+    """Executa o job no processo de trabalho registrando início e fim"""
+    started = time.time()
+    result = fn(*args)
+    return result, started, time.time()
+
+
+class AnalysisQueue:
+    """
+    Fila de jobs limitada sobre um ProcessPoolExecutor
+
+    submit() retorna um ID na hora; o status (e o resultado) é consultado com
+    status(). Um callback opcional roda no processo principal ao término, para
+    persistir o resultado.
+
+    Os workers são criados com spawn: o processo principal tem threads (I/O,
+    curtidas, group commit) e um fork copiaria locks adquiridos por elas.
+    """
+
+    def __init__(self, max_workers=MAX_WORKERS, max_pending=MAX_PENDING):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor = None
+        self._lock = threading.Lock()
+        self._jobs = OrderedDict()
+        self._on_evict = {}
+        self._pending = 0
+        self._created_at = time.time()
+        self._busy_seconds = 0.0
+        self._queue_latency_total = 0.0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+
+    def _get_executor(self):
+        """Cria o pool na primeira submissão (não no import do app)"""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn")
+            )
+            self._created_at = time.time()
+        return self._executor
+
+    def submit(self, fn, *args, on_done=None, callback_executor=None, on_evict=None):
+        """
+        Enfileira um job
+
+        Args:
+            fn (callable): Função de nível de módulo (precisa ser serializável)
+            *args: Argumentos da função
+            on_done (callable): Chamado com o resultado quando o job termina bem
+            callback_executor (Executor): Onde on_done roda; sem ele, roda na
+                thread que recebe os resultados do pool e atrasa os demais jobs
+            on_evict (callable): Chamado sem argumentos quando o job finalizado
+                sai da lista de status (ver KEEP_FINISHED)
+
+        Returns:
+            str: ID do job
+
+        Raises:
+            QueueFullError: Se já houver max_pending jobs pendentes
+        """
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.rejected += 1
+                raise QueueFullError(
+                    f"Fila de análise cheia ({self._pending} jobs pendentes). Tente novamente em instantes."
+                )
+            submitted_at = time.time()
+            # Com spawn, o pool cria os processos dentro de submit()
+            with _worker_env():
+                future = self._get_executor().submit(_run, fn, args)
+            self._pending += 1
+            job_id = uuid.uuid4().hex
+            job = {
+                "id": job_id,
+                "state": "queued",
+                "submitted_at": submitted_at,
+                "result": None,
+                "error": None
+            }
+            self._jobs[job_id] = job
+            if on_evict is not None:
+                self._on_evict[job_id] = on_evict
+
+        # Fora do lock: se o job já terminou, o callback roda nesta thread
+        future.add_done_callback(lambda f: self._dispatch(job, f, on_done, callback_executor))
+        return job_id
+
+    def _dispatch(self, job, future, on_done, callback_executor):
+        """Passa o término do job para callback_executor quando há I/O a fazer"""
+        if on_done is not None and callback_executor is not None and future.exception() is None:
+            callback_executor.submit(self._finish, job, future, on_done)
+        else:
+            self._finish(job, future, on_done)
+
+    def _finish(self, job, future, on_done):
+        """Registra o término de um job"""
+        error = future.exception()
+        if error is None:
+            result, started, finished = future.result()
+            if on_done is not None:
+                try:
+                    on_done(result)
+                except Exception as callback_error:
+                    error = callback_error
+
+        with self._lock:
+            self._pending -= 1
+            if error is None:
+                job["state"] = "done"
+                job["result"] = result
+                job["queue_latency"] = started - job["submitted_at"]
+                job["run_seconds"] = finished - started
+                self._busy_seconds += finished - started
+                self._queue_latency_total += job["queue_latency"]
+                self.completed += 1
+            else:
+                job["state"] = "failed"
+                job["error"] = str(error) or type(error).__name__
+                self.failed += 1
+
+            finished_jobs = [k for k, j in self._jobs.items() if j["state"] in ("done", "failed")]
+            evicted = []
+            for key in finished_jobs[:max(0, len(finished_jobs) - KEEP_FINISHED)]:
+                del self._jobs[key]
+                evicted.append(self._on_evict.pop(key, None))
+
+        for on_evict in evicted:
+            if on_evict is not None:
+                on_evict()
+
+    def status(self, job_id):
+        """
+        Consulta um job
+
+        Args:
+            job_id (str): ID retornado por submit
+
+        Returns:
+            dict: Cópia do job (state: queued|done|failed) ou None se desconhecido
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def stats(self):
+        """
+        Métricas da fila
+
+        Returns:
+            dict: Jobs pendentes, concluídos, falhos, rejeitados, latência média
+                de fila (s) e utilização dos workers (0-1)
+        """
+        with self._lock:
+            elapsed = max(time.time() - self._created_at, 1e-9)
+            return {
+                "pending": self._pending,
+                "max_pending": self.max_pending,
+                "workers": self.max_workers,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "avg_queue_latency": self._queue_latency_total / self.completed if self.completed else 0.0,
+                "utilisation": min(1.0, self._busy_seconds / (elapsed * self.max_workers))
+            }
+
+    def shutdown(self, wait=True):
+        """Encerra o pool de processos"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+
+# Fila compartilhada pelo app
+analysis_queue = AnalysisQueue()
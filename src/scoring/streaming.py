@@ -0,0 +1,118 @@
+"""
+Pontuação incremental enquanto o usuário canta
+Consome os pedaços de áudio do microfone à medida que chegam
+"""
+import numpy as np
+
+from . import engine
+
+
+def to_float(samples):
+    """
+    Converte amostras inteiras (ex.: int16 do microfone) para float entre -1 e 1
+
+    Args:
+        samples (np.ndarray): Amostras inteiras ou float
+
+    Returns:
+        np.ndarray: Amostras float64
+    """
+    samples = np.asarray(samples)
+    if np.issubdtype(samples.dtype, np.integer):
+        return samples / float(2 ** (8 * samples.dtype.itemsize - 1))
+    return samples.astype(np.float64)
+
+
+class StreamingScorer:
+    """
+    Pontuação de pitch acumulada pedaço a pedaço
+
+    Cada pedaço é decimado, dividido nos quadros que ficaram completos e
+    analisado uma única vez; só as amostras necessárias para o próximo quadro
+    ficam em um buffer de tamanho limitado. Como os quadros e a decimação
+    seguem exatamente a mesma grade da análise offline, o resultado final é
+    igual ao de engine.score_contours sobre o áudio inteiro.
+    """
+
+    def __init__(self, ref_f0, ref_hop_seconds):
+        self.ref_f0 = ref_f0
+        self.ref_hop_seconds = ref_hop_seconds
+        self.sr = None
+        self.frames_done = 0
+        self.credit_sum = 0
+        self.hits = 0
+        self.scored = 0
+
+    def _setup(self, sr):
+        """Fixa os parâmetros de análise na chegada do primeiro pedaço"""
+        self.sr = sr
+        self.factor, self.rate, self.frame_len, self.hop = engine.analysis_params(sr)
+        # Amostras brutas que ainda não completam um grupo de decimação
+        self._pending = np.empty(0)
+        # Amostras decimadas a partir do início do próximo quadro
+        self._buffer = np.empty(self.frame_len + self.hop)
+        self._buffered = 0
+
+    def _append(self, decimated):
+        """Acrescenta amostras ao buffer, crescendo só se o pedaço não couber"""
+        needed = self._buffered + len(decimated)
+        if needed > len(self._buffer):
+            grown = np.empty(needed)
+            grown[:self._buffered] = self._buffer[:self._buffered]
+            self._buffer = grown
+        self._buffer[self._buffered:needed] = decimated
+        self._buffered = needed
+
+    def feed(self, samples, sr):
+        """
+        Processa um pedaço de áudio
+
+        Args:
+            samples (np.ndarray): Amostras (mono ou (n, canais)), int ou float
+            sr (int): Taxa de amostragem
+
+        Returns:
+            dict: Pontuação parcial (score, accuracy)
+        """
+        if self.sr is None:
+            self._setup(sr)
+        elif sr != self.sr:
+            raise ValueError(f"Taxa de amostragem mudou durante a gravação: {self.sr} -> {sr}")
+
+        samples = to_float(samples)
+        if samples.ndim == 2:
+            samples = engine.to_mono(samples, samples.shape[1])
+
+        raw = np.concatenate([self._pending, samples])
+        usable = len(raw) - len(raw) % self.factor
+        self._pending = raw[usable:]
+        self._append(engine.decimate(raw[:usable], self.factor))
+
+        frames = engine.frame_signal(self._buffer[:self._buffered], self.frame_len, self.hop)
+        if len(frames):
+            f0 = engine.frames_pitch(frames, self.rate)
+            aligned = engine.align_reference(
+                len(f0), self.hop / self.rate, self.ref_f0, self.ref_hop_seconds, offset=self.frames_done
+            )
+            credit_sum, hits, scored = engine.frame_credit(f0, aligned)
+            self.credit_sum += credit_sum
+            self.hits += hits
+            self.scored += scored
+            self.frames_done += len(f0)
+
+            # Descarta o que já foi analisado; fica só o início do próximo quadro
+            consumed = len(f0) * self.hop
+            remaining = self._buffered - consumed
+            self._buffer[:remaining] = self._buffer[consumed:self._buffered]
+            self._buffered = remaining
+
+        return self.result()
+
+    def result(self):
+        """
+        Pontuação acumulada até agora
+
+        Returns:
+            dict: score (0-100) e accuracy (percentual)
+        """
+        return engine.summarize(self.credit_sum, self.hits, self.scored)
@@ -0,0 +1,175 @@
+"""
+Versões assíncronas das APIs de armazenamento
+O I/O de arquivo roda num executor próprio e limitado, fora do event loop
+do Gradio; escritas diretas num mesmo arquivo são serializadas por um
+asyncio.Lock por arquivo, então esperar a vez não ocupa nenhuma thread.
+
+As escritas de users/songs/recordings.json do app passam pelo group commit
+(transactions.GroupCommit), que já as serializa e junta em lotes: elas não
+usam os locks por arquivo, que impediriam a formação dos lotes.
+"""
+import asyncio
+import functools
+import os
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+
+from . import blob_store, comments_store, metrics, scores_store, transactions, user_stats
+
+# Threads do executor de I/O (limita o I/O simultâneo em disco)
+IO_WORKERS = int(os.getenv("JINGLETUBE_IO_WORKERS", "16"))
+
+_executor = None
+_executor_lock = threading.Lock()
+
+# Locks por arquivo, separados por event loop (um asyncio.Lock só vale num loop)
+_file_locks = weakref.WeakKeyDictionary()
+
+
+def _get_executor():
+    """Cria o executor de I/O no primeiro uso"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=IO_WORKERS, thread_name_prefix="jingletube-io")
+        return _executor
+
+
+def executor():
+    """Executor de I/O, para agendar escritas fora do event loop (ex.: callbacks de jobs)"""
+    return _get_executor()
+
+
+def shutdown():
+    """Encerra o executor de I/O, esperando as tarefas em andamento"""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+            _executor = None
+
+
+async def run(fn, *args, **kwargs):
+    """
+    Executa uma função bloqueante no executor de I/O
+
+    Args:
+        fn (callable): Função síncrona
+        *args, **kwargs: Argumentos de fn
+
+    Returns:
+        object: Retorno de fn
+    """
+    loop = asyncio.get_running_loop()
+    call = functools.partial(fn, *args, **kwargs)
+    if metrics.ENABLED:
+        call = _timed_wait(call, time.perf_counter())
+    return await loop.run_in_executor(_get_executor(), call)
+
+
+def _timed_wait(call, submitted):
+    """Registra quanto a chamada esperou por uma thread livre do executor"""
+    def timed():
+        metrics.observe("wait", "aio.executor", time.perf_counter() - submitted)
+        return call()
+    return timed
+
+
+def file_lock(path):
+    """
+    Lock assíncrono de um arquivo no event loop atual
+
+    Args:
+        path (str): Caminho do arquivo
+
+    Returns:
+        asyncio.Lock: Lock compartilhado por todas as escritas do arquivo
+    """
+    locks = _file_locks.setdefault(asyncio.get_running_loop(), {})
+    key = os.path.abspath(path)
+    lock = locks.get(key)
+    if lock is None:
+        lock = locks[key] = asyncio.Lock()
+    return lock
+
+
+async def write(path, fn, *args, **kwargs):
+    """
+    Executa uma escrita no executor, uma por vez para o arquivo
+
+    Args:
+        path (str): Arquivo escrito por fn
+        fn (callable): Função síncrona que escreve o arquivo
+
+    Returns:
+        object: Retorno de fn
+    """
+    async with file_lock(path):
+        return await run(fn, *args, **kwargs)
+
+
+async def load_json(path):
+    """Lê um arquivo JSON do app (dicionário vazio se ausente ou inválido)"""
+    return await run(transactions._read_json, str(path))
+
+
+async def save_json(path, data):
+    """Grava um arquivo JSON com arquivo temporário e rename atômico"""
+    def save():
+        tx = transactions.Transaction()
+        tx.save(path, data)
+        tx.commit()
+
+    await write(str(path), save)
+
+
+async def commit(writer, fn):
+    """
+    Executa fn(tx) num lote do group commit
+
+    Args:
+        writer (GroupCommit): Group commit dos arquivos
+        fn (callable): Função transacional (ver GroupCommit.run)
+
+    Returns:
+        object: Retorno de fn
+    """
+    return await run(writer.run, fn)
+
+
+async def put_file(src_path):
+    """Versão assíncrona de blob_store.put_file"""
+    return await write(blob_store.REFS_FILE, blob_store.put_file, src_path)
+
+
+async def add_comment(recording_id, username, comment):
+    """Versão assíncrona de comments_store.add_comment"""
+    return await write(comments_store._comments_file(recording_id), comments_store.add_comment,
+                       recording_id, username, comment)
+
+
+async def get_comments(recording_id, cursor=None, limit=comments_store.PAGE_SIZE):
+    """Versão assíncrona de comments_store.get_comments"""
+    return await run(comments_store.get_comments, recording_id, cursor, limit)
+
+
+async def add_score(song_id, player_name, score, accuracy=None):
+    """Versão assíncrona de scores_store.add_score"""
+    return await write(scores_store.SCORES_FILE, scores_store.add_score, song_id, player_name, score, accuracy)
+
+
+async def get_top_scores(song_id=None, limit=10):
+    """Versão assíncrona de scores_store.get_top_scores"""
+    return await run(scores_store.get_top_scores, song_id, limit)
+
+
+async def query_score_table(query):
+    """Versão assíncrona de scores_store.query_score_table"""
+    return await run(scores_store.query_score_table, query)
+
+
+async def get_user_stats(username):
+    """Versão assíncrona de user_stats.get_user_stats"""
+    return await run(user_stats.get_user_stats, username)
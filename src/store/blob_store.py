@@ -0,0 +1,221 @@
+"""
+Armazenamento de áudio endereçado por conteúdo
+Cada arquivo é guardado uma única vez, com nome igual ao seu hash SHA-256,
+e uma contagem de referências decide quando ele pode ser apagado.
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+
+from . import metrics
+
+BLOB_DIR = "data/audio/blobs"
+REFS_FILE = "data/audio/blobs/refs.json"
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# ioctl do Linux que clona um arquivo compartilhando blocos (btrfs, xfs...)
+FICLONE = 0x40049409
+
+_lock = threading.Lock()
+
+
+def hash_file(path):
+    """
+    Calcula o SHA-256 de um arquivo em uma única passada, em blocos
+
+    Args:
+        path (str): Caminho do arquivo
+
+    Returns:
+        str: Hash em hexadecimal
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def blob_path(digest):
+    """Caminho do blob de um hash (subdiretório pelos 2 primeiros caracteres)"""
+    return os.path.join(BLOB_DIR, digest[:2], digest)
+
+
+@metrics.instrument("io")
+def _load_refs():
+    """Carrega a contagem de referências"""
+    try:
+        with open(REFS_FILE, 'r', encoding='utf-8') as f:
+            refs = json.load(f)
+            metrics.record_read(REFS_FILE, f)
+            return refs
+    except (OSError, ValueError):
+        return {}
+
+
+@metrics.instrument("io")
+def _save_refs(refs):
+    """Salva a contagem de referências (troca atômica do arquivo)"""
+    directory = os.path.dirname(REFS_FILE)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix="refs.", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(refs, f)
+            metrics.record_write(REFS_FILE, f)
+        os.replace(tmp_path, REFS_FILE)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _clone(src, dst):
+    """
+    Copia src para dst pelo caminho mais barato disponível
+
+    Ordem: reflink (FICLONE), copy_file_range no kernel e, por fim,
+    shutil.copyfile. dst é um arquivo novo.
+
+    Returns:
+        str: Método usado
+    """
+    with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+        try:
+            import fcntl
+            fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+            return "reflink"
+        except (ImportError, OSError):
+            pass
+
+        if hasattr(os, "copy_file_range"):
+            try:
+                remaining = os.fstat(fsrc.fileno()).st_size
+                while remaining > 0:
+                    copied = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+                    if copied == 0:
+                        break
+                    remaining -= copied
+                if remaining == 0:
+                    return "copy_file_range"
+            except OSError:
+                pass
+            fsrc.seek(0)
+            fdst.seek(0)
+            fdst.truncate()
+
+    shutil.copyfile(src, dst)
+    return "copy"
+
+
+def put_file(src_path):
+    """
+    Guarda um arquivo no blob store, reaproveitando o blob se o conteúdo já existir
+
+    O blob é sempre uma cópia (um reflink também é): a origem, como o
+    upload temporário do Gradio, pode ser apagada ou reescrita depois.
+
+    Args:
+        src_path (str): Arquivo a guardar (ex.: upload temporário do Gradio)
+
+    Returns:
+        dict: hash, path (caminho do blob), size e method (como o blob foi
+            criado: existing, reflink, copy_file_range ou copy)
+    """
+    digest = hash_file(src_path)
+    path = blob_path(digest)
+
+    with _lock:
+        if os.path.exists(path):
+            method = "existing"
+        else:
+            directory = os.path.dirname(path)
+            os.makedirs(directory, exist_ok=True)
+            # Nome único no diretório do blob: outro processo pode estar
+            # guardando o mesmo conteúdo, e o rename final é atômico
+            fd, tmp_path = tempfile.mkstemp(prefix=f"{digest}.", suffix=".tmp", dir=directory)
+            os.close(fd)
+            try:
+                method = _clone(src_path, tmp_path)
+                os.replace(tmp_path, path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+
+        refs = _load_refs()
+        refs[digest] = refs.get(digest, 0) + 1
+        _save_refs(refs)
+
+    return {
+        "hash": digest,
+        "path": path,
+        "size": os.path.getsize(path),
+        "method": method
+    }
+
+
+def add_ref(digest):
+    """
+    Registra mais uma referência a um blob existente
+
+    Returns:
+        int: Nova contagem
+    """
+    with _lock:
+        refs = _load_refs()
+        refs[digest] = refs.get(digest, 0) + 1
+        _save_refs(refs)
+        return refs[digest]
+
+
+def release(digest):
+    """
+    Remove uma referência; apaga o blob (e caches ao lado dele) quando chega a zero
+
+    Args:
+        digest (str): Hash do blob
+
+    Returns:
+        int: Referências restantes
+    """
+    with _lock:
+        refs = _load_refs()
+        count = refs.get(digest, 0) - 1
+        if count > 0:
+            refs[digest] = count
+            _save_refs(refs)
+            return count
+
+        refs.pop(digest, None)
+        _save_refs(refs)
+        path = blob_path(digest)
+        if os.path.exists(path):
+            os.remove(path)
+        shutil.rmtree(f"{path}.features", ignore_errors=True)
+        return 0
+
+
+def get_ref_count(digest):
+    """Retorna a quantidade de referências de um blob"""
+    return _load_refs().get(digest, 0)
+
+
+def disk_usage():
+    """
+    Resumo do espaço ocupado pelos blobs
+
+    Returns:
+        dict: blobs, bytes e referências totais
+    """
+    refs = _load_refs()
+    total = 0
+    for digest in refs:
+        try:
+            total += os.path.getsize(blob_path(digest))
+        except OSError:
+            pass
+    return {"blobs": len(refs), "bytes": total, "references": sum(refs.values())}
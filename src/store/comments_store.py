@@ -0,0 +1,130 @@
+"""
+Comentários das gravações
+Cada gravação tem seu próprio arquivo JSONL só de acréscimo, fora do
+recordings.json: comentar não reescreve nada e quem lê o ranking não
+carrega os textos
+"""
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+
+from .pagination import PAGE_SIZE, decode_cursor, encode_cursor
+
+COMMENTS_DIR = "data/comments"
+
+# Serializa os acréscimos entre threads do Gradio
+_lock = threading.Lock()
+
+def _comments_file(recording_id):
+    """
+    Arquivo de comentários de uma gravação
+
+    O nome é o hash do ID, já que o ID inclui o nome do usuário.
+    """
+    name = hashlib.sha1(recording_id.encode('utf-8')).hexdigest()
+    return os.path.join(COMMENTS_DIR, f"{name}.jsonl")
+
+def append_comments(recording_id, comments):
+    """
+    Acrescenta comentários já montados (ex.: migração do recordings.json)
+
+    Args:
+        recording_id (str): ID da gravação
+        comments (list): Comentários (username, comment, timestamp)
+    """
+    if not comments:
+        return
+    os.makedirs(COMMENTS_DIR, exist_ok=True)
+    with _lock:
+        with open(_comments_file(recording_id), 'a', encoding='utf-8') as f:
+            for comment in comments:
+                f.write(json.dumps(comment, ensure_ascii=False) + "\n")
+
+def add_comment(recording_id, username, comment):
+    """
+    Adiciona um comentário a uma gravação
+
+    Args:
+        recording_id (str): ID da gravação
+        username (str): Autor
+        comment (str): Texto
+
+    Returns:
+        dict: Comentário adicionado
+    """
+    comment_data = {
+        "username": username,
+        "comment": comment,
+        "timestamp": str(datetime.now())
+    }
+    append_comments(recording_id, [comment_data])
+    return comment_data
+
+def get_comments(recording_id, cursor=None, limit=PAGE_SIZE):
+    """
+    Lista comentários de uma gravação, do mais antigo para o mais novo
+
+    O cursor guarda a posição em bytes no arquivo: como ele só cresce, a
+    página seguinte não muda com comentários novos.
+
+    Args:
+        recording_id (str): ID da gravação
+        cursor (str): Cursor retornado na página anterior (None para a primeira)
+        limit (int): Quantidade máxima de comentários
+
+    Returns:
+        dict: comments e next_cursor (None quando não há mais comentários)
+
+    Raises:
+        ValueError: Se o cursor for inválido
+    """
+    offset = 0
+    if cursor:
+        direction, key = decode_cursor(cursor)
+        if direction != "next" or len(key) != 1 or not isinstance(key[0], int):
+            raise ValueError(f"Cursor inválido: {cursor!r}")
+        offset = key[0]
+
+    comments = []
+    try:
+        with open(_comments_file(recording_id), 'rb') as f:
+            f.seek(offset)
+            while len(comments) < limit:
+                line = f.readline()
+                # Linha sem \n: escrita em andamento, fica para a próxima leitura
+                if not line.endswith(b"\n"):
+                    break
+                offset += len(line)
+                try:
+                    comments.append(json.loads(line))
+                except ValueError:
+                    continue
+            has_more = f.readline().endswith(b"\n")
+    except FileNotFoundError:
+        has_more = False
+
+    return {
+        "comments": comments,
+        "next_cursor": encode_cursor("next", (offset,)) if has_more else None
+    }
+
+def count_comments(recording_id):
+    """
+    Conta os comentários de uma gravação lendo o arquivo
+
+    O app guarda a contagem na própria gravação (comment_count); esta função
+    serve para conferência.
+
+    Args:
+        recording_id (str): ID da gravação
+
+    Returns:
+        int: Quantidade de comentários
+    """
+    try:
+        with open(_comments_file(recording_id), 'rb') as f:
+            return sum(1 for line in f if line.endswith(b"\n"))
+    except FileNotFoundError:
+        return 0
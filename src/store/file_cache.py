@@ -0,0 +1,233 @@
+"""
+Cache de leitura compartilhado para os arquivos JSON do store
+Evita reabrir e reparsear arquivos que não mudaram desde a última leitura
+"""
+import json
+import os
+import threading
+
+from . import metrics
+
+
+def signature(paths):
+    """
+    Calcula a assinatura (mtime, tamanho, inode) de um conjunto de arquivos
+
+    Args:
+        paths (tuple): Caminhos dos arquivos
+
+    Returns:
+        tuple: Assinatura de cada arquivo (None se não existir)
+    """
+    result = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+        except OSError:
+            result.append(None)
+            continue
+        result.append((st.st_mtime_ns, st.st_size, st.st_ino))
+    return tuple(result)
+
+
+class FileCache:
+    """
+    Cache de objetos carregados de arquivos, validado pela assinatura em disco
+
+    A chave é a tupla de caminhos de que o valor depende (ex.: snapshot e
+    journal das pontuações). Os valores são compartilhados entre chamadas:
+    quem lê não deve alterá-los no lugar.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, paths, loader):
+        """
+        Retorna o valor em cache ou carrega de novo se os arquivos mudaram
+
+        Args:
+            paths (tuple): Caminhos dos arquivos
+            loader (callable): Função que carrega o valor do disco
+
+        Returns:
+            object: Valor carregado
+        """
+        paths = tuple(paths)
+        # A assinatura é lida antes do carregamento: se o arquivo mudar no meio,
+        # a próxima leitura vê uma assinatura diferente e recarrega.
+        sig = signature(paths)
+        with self._lock:
+            entry = self._entries.get(paths)
+            if entry is not None and entry[0] == sig:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        value = loader()
+        with self._lock:
+            self._entries[paths] = (sig, value)
+        return value
+
+    def peek(self, paths):
+        """
+        Retorna o valor em cache apenas se ainda for válido
+
+        Args:
+            paths (tuple): Caminhos dos arquivos
+
+        Returns:
+            object: Valor em cache ou None
+        """
+        paths = tuple(paths)
+        sig = signature(paths)
+        with self._lock:
+            entry = self._entries.get(paths)
+            if entry is not None and entry[0] == sig:
+                return entry[1]
+        return None
+
+    def put(self, paths, value):
+        """
+        Registra o valor recém-escrito pelo próprio processo
+
+        Args:
+            paths (tuple): Caminhos dos arquivos
+            value (object): Valor correspondente ao conteúdo atual em disco
+        """
+        paths = tuple(paths)
+        sig = signature(paths)
+        with self._lock:
+            self._entries[paths] = (sig, value)
+
+    def invalidate(self, path=None):
+        """
+        Descarta entradas que dependem de um arquivo
+
+        Args:
+            path (str): Caminho do arquivo (None descarta tudo)
+        """
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+                return
+            for key in [k for k in self._entries if path in k]:
+                del self._entries[key]
+
+    def stats(self):
+        """
+        Retorna os contadores do cache
+
+        Returns:
+            dict: hits, misses e quantidade de entradas
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._entries)
+            }
+
+
+def load_dict(path):
+    """
+    Lê um arquivo JSON do app (dicionário por ID)
+
+    Args:
+        path (str): Caminho do arquivo
+
+    Returns:
+        dict: Conteúdo, ou dicionário vazio se ausente ou inválido
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+            metrics.record_read(path, f)
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+class IndexCache:
+    """
+    Índice em memória derivado de arquivos, validado pela assinatura em disco
+
+    Escritas do próprio processo atualizam o índice no lugar com
+    begin()/commit(); qualquer outra mudança nos arquivos faz o índice ser
+    reconstruído na próxima leitura.
+    """
+
+    def __init__(self, paths, build, lock=None):
+        """
+        Args:
+            paths (tuple): Arquivos de que o índice depende
+            build (callable): Constrói o índice a partir do disco
+            lock (threading.RLock): Lock compartilhado com quem escreve os
+                arquivos (um próprio se omitido)
+        """
+        self._paths = tuple(str(path) for path in paths)
+        self._build = build
+        self._lock = lock or threading.RLock()
+        self._index = None
+        self._source = None
+
+    def _get(self):
+        """Retorna o índice, reconstruindo se os arquivos mudaram"""
+        source = signature(self._paths)
+        if self._index is None or self._source != source:
+            self._index = self._build()
+            self._source = source
+        return self._index
+
+    def read(self, fn):
+        """
+        Consulta o índice com o lock adquirido
+
+        Args:
+            fn (callable): Recebe o índice e retorna o resultado da consulta
+
+        Returns:
+            object: Resultado de fn
+        """
+        with self._lock:
+            return fn(self._get())
+
+    def begin(self):
+        """
+        Chamado antes de uma escrita nos arquivos
+
+        Returns:
+            object: Índice atual, ou None se ainda não construído ou obsoleto
+        """
+        with self._lock:
+            if self._index is not None and self._source == signature(self._paths):
+                return self._index
+            return None
+
+    def commit(self, index, update=None):
+        """
+        Chamado depois da escrita: aplica a mudança e marca o índice como atual
+
+        Args:
+            index (object): Valor retornado por begin()
+            update (callable): Recebe o índice e aplica a mudança
+        """
+        with self._lock:
+            if index is None or index is not self._index:
+                return
+            if update is not None:
+                update(index)
+            self._source = signature(self._paths)
+
+    def invalidate(self):
+        """Descarta o índice"""
+        with self._lock:
+            self._index = None
+            self._source = None
+
+
+# Instância compartilhada por songs_store e scores_store
+cache = FileCache()
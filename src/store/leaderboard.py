@@ -0,0 +1,101 @@
+"""
+Índice incremental de melhores pontuações
+Mantém o top-K global e por música para get_top_scores
+"""
+import bisect
+
+
+class TopKIndex:
+    """
+    Top-K global e por música, ordenado por pontuação decrescente
+
+    Cada item é (-score, seq, entry). O seq segue a ordem de inserção, então
+    empates mantêm a ordem do arquivo, como no sort estável original.
+    """
+
+    def __init__(self, k):
+        self.k = k
+        self._global = []
+        self._by_song = {}
+        self._next_seq = 0
+
+    @classmethod
+    def build(cls, scores, k):
+        """
+        Constrói o índice a partir da lista completa de pontuações
+
+        Args:
+            scores (list): Pontuações na ordem do arquivo
+            k (int): Tamanho máximo de cada top
+
+        Returns:
+            TopKIndex: Índice construído
+        """
+        index = cls(k)
+        for entry in scores:
+            index.add(entry)
+        return index
+
+    def _insert(self, bucket, item):
+        """Insere mantendo a ordem e descarta o que passar de K"""
+        if len(bucket) >= self.k and item >= bucket[-1]:
+            return
+        bisect.insort(bucket, item)
+        del bucket[self.k:]
+
+    def _rank(self, scores, song_id=None):
+        """Monta um top-K a partir de uma lista completa de pontuações"""
+        bucket = []
+        for seq, entry in enumerate(scores):
+            if song_id is None or entry['songId'] == song_id:
+                self._insert(bucket, (-entry['score'], seq, entry))
+        return bucket
+
+    def add(self, entry):
+        """
+        Registra uma nova pontuação
+
+        Args:
+            entry (dict): Pontuação adicionada
+        """
+        item = (-entry['score'], self._next_seq, entry)
+        self._next_seq += 1
+        self._insert(self._global, item)
+        self._insert(self._by_song.setdefault(entry['songId'], []), item)
+
+    def remove(self, entry, remaining):
+        """
+        Remove uma pontuação
+
+        Só os tops que continham a pontuação são reconstruídos, a partir das
+        pontuações restantes, para recuperar o (K+1)-ésimo colocado.
+
+        Args:
+            entry (dict): Pontuação removida
+            remaining (list): Pontuações restantes, na ordem do arquivo
+        """
+        song_id = entry['songId']
+        if any(item[2]['id'] == entry['id'] for item in self._global):
+            self._global = self._rank(remaining)
+
+        bucket = self._by_song.get(song_id, [])
+        if any(item[2]['id'] == entry['id'] for item in bucket):
+            self._by_song[song_id] = self._rank(remaining, song_id)
+            if not self._by_song[song_id]:
+                del self._by_song[song_id]
+
+        self._next_seq = max(self._next_seq, len(remaining))
+
+    def top(self, song_id=None, limit=10):
+        """
+        Retorna as melhores pontuações
+
+        Args:
+            song_id (str): ID da música (opcional, None retorna de todas)
+            limit (int): Número máximo de resultados (no máximo K)
+
+        Returns:
+            list: Pontuações ordenadas
+        """
+        bucket = self._global if song_id is None else self._by_song.get(song_id, [])
+        return [item[2] for item in bucket[:limit]]
@@ -0,0 +1,127 @@
+"""
+Contador de curtidas com escrita em lote
+As curtidas se acumulam em memória e são gravadas de uma vez quando passa o
+intervalo ou a quantidade limite, e no encerramento do app
+"""
+import logging
+import os
+import threading
+
+# Segundos entre gravações e curtidas pendentes que antecipam a gravação
+FLUSH_INTERVAL = float(os.getenv("JINGLETUBE_LIKES_FLUSH_INTERVAL", "2"))
+FLUSH_BATCH = int(os.getenv("JINGLETUBE_LIKES_FLUSH_BATCH", "100"))
+
+logger = logging.getLogger(__name__)
+
+
+class LikeCounter:
+    """
+    Deltas de curtidas por gravação, gravados em lote por uma thread de fundo
+
+    A função de gravação roda com o lock adquirido. Quem monta contagens a
+    partir do disco deve usar o mesmo lock (parâmetro lock) e somar
+    pending(): assim nunca vê o arquivo já gravado com os deltas ainda
+    pendentes, nem o contrário.
+    """
+
+    def __init__(self, flush, interval=FLUSH_INTERVAL, batch=FLUSH_BATCH, lock=None):
+        """
+        Args:
+            flush (callable): Recebe {recording_id: delta} e grava no disco
+            interval (float): Segundos máximos que uma curtida fica pendente
+            batch (int): Curtidas pendentes que disparam a gravação antes do prazo
+            lock (threading.RLock): Lock compartilhado com os leitores
+        """
+        self._flush = flush
+        self.interval = interval
+        self.batch = batch
+        self._lock = lock or threading.RLock()
+        self._pending = {}
+        self._by_owner = {}
+        self._count = 0
+        self._wake = threading.Event()
+        self._stopped = False
+        self._thread = None
+        self.flushes = 0
+
+    def _start(self):
+        """Inicia a thread de gravação na primeira curtida"""
+        if self._thread is None and not self._stopped:
+            self._thread = threading.Thread(target=self._run, name="like-counter", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        """Grava os deltas a cada intervalo, ou antes se o lote encher"""
+        while not self._stopped:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception:
+                # Os deltas continuam pendentes e entram na próxima tentativa
+                logger.exception("Falha ao gravar as curtidas pendentes")
+
+    def add(self, recording_id, delta=1, owner=None):
+        """
+        Registra curtidas de uma gravação
+
+        Args:
+            recording_id (str): ID da gravação
+            delta (int): Quantidade de curtidas
+            owner (str): Autor da gravação, para pending_for_owner
+        """
+        with self._lock:
+            self._pending[recording_id] = self._pending.get(recording_id, 0) + delta
+            if owner is not None:
+                self._by_owner[owner] = self._by_owner.get(owner, 0) + delta
+            self._count += delta
+            self._start()
+            if self._count >= self.batch:
+                self._wake.set()
+
+    def pending(self, recording_id=None):
+        """
+        Curtidas ainda não gravadas
+
+        Args:
+            recording_id (str): ID da gravação (None para todas)
+
+        Returns:
+            int | dict: Delta da gravação, ou cópia de todos os deltas
+        """
+        with self._lock:
+            if recording_id is None:
+                return dict(self._pending)
+            return self._pending.get(recording_id, 0)
+
+    def pending_for_owner(self, owner):
+        """Curtidas ainda não gravadas nas gravações de um autor"""
+        with self._lock:
+            return self._by_owner.get(owner, 0)
+
+    def flush(self):
+        """
+        Grava os deltas pendentes
+
+        Returns:
+            int: Quantidade de gravações atualizadas
+        """
+        with self._lock:
+            if not self._pending:
+                return 0
+            deltas = self._pending
+            self._flush(deltas)
+            self._pending = {}
+            self._by_owner = {}
+            self._count = 0
+            self.flushes += 1
+            return len(deltas)
+
+    def close(self):
+        """Para a thread de fundo e grava o que estiver pendente"""
+        self._stopped = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self.flush()
@@ -0,0 +1,287 @@
+"""
+Instrumentação de latência e I/O
+Contagem de chamadas, histogramas de latência, bytes lidos/gravados e
+tamanho dos arquivos, exportados no formato texto do Prometheus
+
+Desativada por padrão (JINGLETUBE_METRICS=1 ativa). Desligada, instrument()
+devolve a própria função e record_read/record_write retornam no primeiro
+teste, então os caminhos instrumentados não pagam nada.
+"""
+import bisect
+import functools
+import inspect
+import os
+import threading
+import time
+
+ENABLED = os.getenv("JINGLETUBE_METRICS", "0") == "1"
+
+# Limites superiores (segundos) dos buckets do histograma de latência
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Histogram:
+    """Histograma de latência com buckets fixos"""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, seconds):
+        """Registra uma medição"""
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+
+    def quantile(self, q):
+        """
+        Estimativa de um quantil pelo limite do bucket
+
+        Args:
+            q (float): Quantil (0-1)
+
+        Returns:
+            float: Limite superior do bucket que contém o quantil (inf no último)
+        """
+        target = q * self.count
+        total = 0
+        for bound, count in zip(BUCKETS + (float("inf"),), self.counts):
+            total += count
+            if total >= target:
+                return bound
+        return float("inf")
+
+
+class FileStats:
+    """Leituras, escritas e tamanho de um arquivo"""
+
+    def __init__(self):
+        self.reads = 0
+        self.bytes_read = 0
+        self.writes = 0
+        self.bytes_written = 0
+        self.size = 0
+
+
+class Registry:
+    """Métricas do processo, protegidas por um lock"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Zera todas as métricas"""
+        with self._lock:
+            self.calls = {}
+            self.errors = {}
+            self.latency = {}
+            self.files = {}
+
+    def observe(self, kind, name, seconds, failed=False):
+        """
+        Registra uma chamada
+
+        Args:
+            kind (str): Categoria (handler, io, wait)
+            name (str): Função medida
+            seconds (float): Duração
+            failed (bool): Se a chamada levantou exceção
+        """
+        key = (kind, name)
+        with self._lock:
+            self.calls[key] = self.calls.get(key, 0) + 1
+            if failed:
+                self.errors[key] = self.errors.get(key, 0) + 1
+            histogram = self.latency.get(key)
+            if histogram is None:
+                histogram = self.latency[key] = Histogram()
+            histogram.observe(seconds)
+
+    def _file(self, path):
+        """Estatísticas de um arquivo (chamar com o lock adquirido)"""
+        stats = self.files.get(path)
+        if stats is None:
+            stats = self.files[path] = FileStats()
+        return stats
+
+    def record_read(self, path, size):
+        """Registra a leitura completa de um arquivo de size bytes"""
+        with self._lock:
+            stats = self._file(path)
+            stats.reads += 1
+            stats.bytes_read += size
+            stats.size = size
+
+    def record_write(self, path, size):
+        """Registra a gravação completa de um arquivo de size bytes"""
+        with self._lock:
+            stats = self._file(path)
+            stats.writes += 1
+            stats.bytes_written += size
+            stats.size = size
+
+    def render(self):
+        """
+        Exporta as métricas no formato texto do Prometheus
+
+        Returns:
+            str: Corpo da resposta do endpoint de métricas
+        """
+        with self._lock:
+            calls = sorted(self.calls.items())
+            errors = dict(self.errors)
+            latency = {key: (list(h.counts), h.sum, h.count) for key, h in self.latency.items()}
+            files = sorted((path, vars(stats).copy()) for path, stats in self.files.items())
+
+        lines = [
+            "# HELP jingletube_calls_total Calls to instrumented functions.",
+            "# TYPE jingletube_calls_total counter",
+        ]
+        lines += [f"jingletube_calls_total{_labels(kind=k, name=n)} {count}" for (k, n), count in calls]
+        lines += [
+            "# HELP jingletube_errors_total Calls that raised an exception.",
+            "# TYPE jingletube_errors_total counter",
+        ]
+        lines += [f"jingletube_errors_total{_labels(kind=k, name=n)} {errors.get((k, n), 0)}" for (k, n), _ in calls]
+        lines += [
+            "# HELP jingletube_latency_seconds Latency of instrumented functions.",
+            "# TYPE jingletube_latency_seconds histogram",
+        ]
+        for (kind, name), _ in calls:
+            counts, total, count = latency[(kind, name)]
+            cumulative = 0
+            for bound, bucket in zip([str(b) for b in BUCKETS] + ["+Inf"], counts):
+                cumulative += bucket
+                lines.append(f"jingletube_latency_seconds_bucket{_labels(kind=kind, name=name, le=bound)} {cumulative}")
+            lines.append(f"jingletube_latency_seconds_sum{_labels(kind=kind, name=name)} {total}")
+            lines.append(f"jingletube_latency_seconds_count{_labels(kind=kind, name=name)} {count}")
+
+        for metric, field, kind, text in (
+            ("jingletube_file_reads_total", "reads", "counter", "Whole-file reads."),
+            ("jingletube_file_read_bytes_total", "bytes_read", "counter", "Bytes read."),
+            ("jingletube_file_writes_total", "writes", "counter", "Whole-file writes."),
+            ("jingletube_file_written_bytes_total", "bytes_written", "counter", "Bytes written."),
+            ("jingletube_file_size_bytes", "size", "gauge", "File size at the last read or write."),
+        ):
+            lines += [f"# HELP {metric} {text}", f"# TYPE {metric} {kind}"]
+            lines += [f"{metric}{_labels(path=path)} {stats[field]}" for path, stats in files]
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self):
+        """
+        Tabelas para a aba de administração
+
+        Returns:
+            tuple: (linhas por função, linhas por arquivo)
+        """
+        with self._lock:
+            calls = [
+                [kind, name, count, self.errors.get((kind, name), 0),
+                 round(self.latency[(kind, name)].sum / count * 1000, 3),
+                 self.latency[(kind, name)].quantile(0.95) * 1000]
+                for (kind, name), count in sorted(self.calls.items())
+            ]
+            files = [
+                [path, stats.reads, stats.bytes_read, stats.writes, stats.bytes_written, stats.size]
+                for path, stats in sorted(self.files.items())
+            ]
+        return calls, files
+
+
+def _escape(value):
+    """Escapa o valor de um rótulo (barra invertida, aspas e quebra de linha)"""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels):
+    """Formata os rótulos de uma série ({chave="valor",...})"""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+# Métricas do processo
+registry = Registry()
+
+
+def instrument(kind, name=None):
+    """
+    Decorador que mede chamadas, latência e erros de uma função (sync ou async)
+
+    Args:
+        kind (str): Categoria (ex.: "handler", "io")
+        name (str): Nome da série (padrão: módulo.função)
+
+    Returns:
+        callable: Decorador; com as métricas desativadas, devolve a função intacta
+    """
+    def decorate(fn):
+        if not ENABLED:
+            return fn
+        label = name or f"{fn.__module__}.{fn.__name__}"
+
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                failed = True
+                try:
+                    result = await fn(*args, **kwargs)
+                    failed = False
+                    return result
+                finally:
+                    registry.observe(kind, label, time.perf_counter() - start, failed)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            failed = True
+            try:
+                result = fn(*args, **kwargs)
+                failed = False
+                return result
+            finally:
+                registry.observe(kind, label, time.perf_counter() - start, failed)
+        return wrapper
+    return decorate
+
+
+def observe(kind, name, seconds):
+    """Registra uma duração medida fora de instrument() (ex.: espera numa fila)"""
+    if ENABLED:
+        registry.observe(kind, name, seconds)
+
+
+def record_read(path, f):
+    """
+    Registra a leitura de um arquivo inteiro
+
+    Args:
+        path (str): Arquivo (rótulo da série)
+        f (file): Arquivo aberto, para obter o tamanho
+    """
+    if not ENABLED:
+        return
+    registry.record_read(str(path), os.fstat(f.fileno()).st_size)
+
+
+def record_write(path, f):
+    """
+    Registra a gravação de um arquivo inteiro
+
+    Args:
+        path (str): Arquivo final (rótulo da série)
+        f (file | str): Arquivo aberto para escrita, ainda não fechado, ou o
+            caminho do temporário já gravado
+    """
+    if not ENABLED:
+        return
+    if isinstance(f, str):
+        size = os.stat(f).st_size
+    else:
+        f.flush()
+        size = os.fstat(f.fileno()).st_size
+    registry.record_write(str(path), size)
@@ -0,0 +1,48 @@
+"""
+Migração única dos arquivos JSON para o backend SQLite
+
+Uso:
+    python -m store.migrate   (a partir de src/)
+"""
+from . import scores_store, songs_store, sqlite_backend
+
+MIGRATION_KEY = "migrated_from_json"
+
+
+def migrate_json_to_sqlite(force=False):
+    """
+    Copia músicas e pontuações dos arquivos JSON para o SQLite
+
+    A migração é registrada na tabela meta e não roda de novo, a menos que
+    force=True. Registros já presentes (mesmo id) são ignorados; músicas com
+    youtubeId repetido no songs.json são mantidas, como no backend JSON.
+
+    Args:
+        force (bool): Roda mesmo se a migração já foi feita
+
+    Returns:
+        dict: Quantidade de músicas e pontuações inseridas, ou None se já migrado
+    """
+    if not force and sqlite_backend.get_meta(MIGRATION_KEY):
+        return None
+
+    songs = songs_store._read_songs()
+    # songs.json no formato do app (dicionário por ID) não é deste store
+    if not isinstance(songs, list):
+        songs = []
+    scores = scores_store._read_scores()
+
+    result = {
+        "songs": sqlite_backend.insert_songs(songs, keep_duplicates=True),
+        "scores": sqlite_backend.insert_scores(scores)
+    }
+    sqlite_backend.set_meta(MIGRATION_KEY, "1")
+    return result
+
+
+if __name__ == "__main__":
+    migrated = migrate_json_to_sqlite()
+    if migrated is None:
+        print(f"{sqlite_backend.DB_FILE} já foi migrado.")
+    else:
+        print(f"Migradas {migrated['songs']} músicas e {migrated['scores']} pontuações para {sqlite_backend.DB_FILE}.")
@@ -0,0 +1,83 @@
+"""
+Paginação por cursor sobre listas de chaves ordenadas
+O cursor guarda a chave da borda da página (não um offset), então inserções
+em outras posições não fazem a página seguinte repetir ou pular linhas
+"""
+import base64
+import bisect
+import json
+
+PAGE_SIZE = 20
+
+
+def encode_cursor(direction, key):
+    """
+    Gera um cursor opaco
+
+    Args:
+        direction (str): "next" (linhas depois da chave) ou "prev" (antes)
+        key (tuple): Chave da borda da página
+
+    Returns:
+        str: Cursor em base64 url-safe
+    """
+    raw = json.dumps([direction, list(key)], separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii')
+
+
+def decode_cursor(cursor):
+    """
+    Lê um cursor gerado por encode_cursor
+
+    Args:
+        cursor (str): Cursor opaco
+
+    Returns:
+        tuple: (direction, key)
+
+    Raises:
+        ValueError: Se o cursor for inválido
+    """
+    try:
+        direction, key = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    except (AttributeError, TypeError, ValueError, UnicodeError):
+        raise ValueError(f"Cursor inválido: {cursor!r}")
+    if direction not in ("next", "prev") or not isinstance(key, list):
+        raise ValueError(f"Cursor inválido: {cursor!r}")
+    return direction, tuple(key)
+
+
+def paginate(keys, cursor=None, limit=PAGE_SIZE):
+    """
+    Seleciona uma página de uma lista de chaves em ordem crescente
+
+    Args:
+        keys (list): Chaves ordenadas (tuplas comparáveis)
+        cursor (str): Cursor de uma página anterior (None para a primeira)
+        limit (int): Tamanho da página
+
+    Returns:
+        dict: keys (chaves da página), start (posição da primeira chave),
+            prev_cursor e next_cursor (None quando não há página naquela direção)
+
+    Raises:
+        ValueError: Se o cursor for inválido
+    """
+    if cursor:
+        direction, key = decode_cursor(cursor)
+        if direction == "next":
+            start = bisect.bisect_right(keys, key)
+            end = min(len(keys), start + limit)
+        else:
+            end = bisect.bisect_left(keys, key)
+            start = max(0, end - limit)
+    else:
+        start, end = 0, min(len(keys), limit)
+
+    page = keys[start:end]
+    return {
+        "keys": page,
+        "start": start,
+        "prev_cursor": encode_cursor("prev", page[0]) if page and start > 0 else None,
+        "next_cursor": encode_cursor("next", page[-1]) if page and end < len(keys) else None
+    }
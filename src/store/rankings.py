@@ -0,0 +1,213 @@
+"""
+Índice incremental do ranking de gravações
+Mantém as gravações ordenadas por curtidas e por data, com o título da
+música já resolvido, para servir uma página sem reordenar tudo
+"""
+import bisect
+import datetime
+
+from .file_cache import IndexCache, load_dict
+from .pagination import PAGE_SIZE, paginate
+
+
+def _time_key(timestamp):
+    """Converte o timestamp gravado (str(datetime)) em segundos; 0 se inválido"""
+    try:
+        return datetime.datetime.fromisoformat(timestamp).timestamp()
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class RecordingRankings:
+    """
+    Gravações ordenadas por curtidas e por data
+
+    _by_likes guarda (-likes, seq, id) e _by_time guarda (-tempo, -seq, id),
+    ambos em ordem crescente, ou seja, na ordem de exibição. O seq segue a
+    ordem do arquivo: empates por curtidas mantêm a ordem original e empates
+    por data mostram a mais nova primeiro. Cada linha já traz o título da
+    música.
+    """
+
+    def __init__(self):
+        self._rows = {}
+        self._seq = {}
+        self._by_likes = []
+        self._by_time = []
+        self._next_seq = 0
+
+    @classmethod
+    def build(cls, recordings, songs):
+        """
+        Constrói o índice a partir dos arquivos completos
+
+        Args:
+            recordings (dict): Gravações por ID, na ordem do arquivo
+            songs (dict): Músicas por ID
+
+        Returns:
+            RecordingRankings: Índice construído
+        """
+        index = cls()
+        for recording_id, recording in recordings.items():
+            song_title = songs.get(recording.get("song_id"), {}).get("title", "Unknown")
+            index._rows[recording_id] = index._row(recording_id, recording, song_title)
+            index._seq[recording_id] = index._next_seq
+            index._by_likes.append((-recording.get("likes", 0), index._next_seq, recording_id))
+            index._by_time.append(index._time_entry(recording, index._next_seq, recording_id))
+            index._next_seq += 1
+        index._by_likes.sort()
+        index._by_time.sort()
+        return index
+
+    @staticmethod
+    def _row(recording_id, recording, song_title):
+        """Linha exibida no ranking"""
+        return [
+            recording["username"],
+            song_title,
+            recording.get("timestamp", "Unknown"),
+            str(recording.get("likes", 0)),
+            recording_id
+        ]
+
+    @staticmethod
+    def _time_entry(recording, seq, recording_id):
+        """Chave da ordenação por data (mais nova primeiro)"""
+        return (-_time_key(recording.get("timestamp")), -seq, recording_id)
+
+    def _keys(self, sort_by):
+        """Chaves na ordem de exibição"""
+        return self._by_time if sort_by == "recent" else self._by_likes
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __contains__(self, recording_id):
+        return recording_id in self._rows
+
+    def add(self, recording_id, recording, song_title):
+        """
+        Registra uma nova gravação
+
+        Args:
+            recording_id (str): ID da gravação
+            recording (dict): Dados da gravação
+            song_title (str): Título da música (ou "Unknown")
+        """
+        if recording_id in self._rows:
+            return
+        seq = self._next_seq
+        self._next_seq += 1
+        self._rows[recording_id] = self._row(recording_id, recording, song_title)
+        self._seq[recording_id] = seq
+        bisect.insort(self._by_likes, (-recording.get("likes", 0), seq, recording_id))
+        bisect.insort(self._by_time, self._time_entry(recording, seq, recording_id))
+
+    def set_likes(self, recording_id, likes):
+        """
+        Atualiza as curtidas de uma gravação, reposicionando só ela
+
+        Args:
+            recording_id (str): ID da gravação
+            likes (int): Novo total de curtidas
+        """
+        row = self._rows.get(recording_id)
+        if row is None:
+            return
+        seq = self._seq[recording_id]
+        old = (-int(row[3]), seq, recording_id)
+        position = bisect.bisect_left(self._by_likes, old)
+        if position < len(self._by_likes) and self._by_likes[position] == old:
+            del self._by_likes[position]
+        bisect.insort(self._by_likes, (-likes, seq, recording_id))
+        row[3] = str(likes)
+
+    def username(self, recording_id):
+        """Autor de uma gravação (None se não estiver no índice)"""
+        row = self._rows.get(recording_id)
+        return row[0] if row else None
+
+    def add_likes(self, recording_id, delta=1):
+        """
+        Soma curtidas a uma gravação
+
+        Returns:
+            int: Novo total, ou None se a gravação não estiver no índice
+        """
+        row = self._rows.get(recording_id)
+        if row is None:
+            return None
+        likes = int(row[3]) + delta
+        self.set_likes(recording_id, likes)
+        return likes
+
+    def page(self, sort_by="likes", limit=None, offset=0):
+        """
+        Retorna uma página do ranking
+
+        Args:
+            sort_by (str): "likes" (mais curtidas primeiro) ou "recent" (mais
+                novas primeiro)
+            limit (int): Tamanho da página (None para todas)
+            offset (int): Quantidade de linhas a pular
+
+        Returns:
+            list: Cópias das linhas da página
+        """
+        keys = self._keys(sort_by)
+        end = len(keys) if limit is None else offset + limit
+        return [list(self._rows[key[2]]) for key in keys[offset:end]]
+
+    def paginate(self, sort_by="likes", cursor=None, limit=PAGE_SIZE):
+        """
+        Página do ranking a partir de um cursor
+
+        Args:
+            sort_by (str): "likes" ou "recent"
+            cursor (str): Cursor retornado na página anterior (None para a primeira)
+            limit (int): Tamanho da página
+
+        Returns:
+            dict: rows, start, prev_cursor, next_cursor e total
+
+        Raises:
+            ValueError: Se o cursor for inválido
+        """
+        result = paginate(self._keys(sort_by), cursor, limit)
+        return {
+            "rows": [list(self._rows[key[2]]) for key in result.pop("keys")],
+            "total": len(self._rows),
+            **result
+        }
+
+
+class RankingsCache(IndexCache):
+    """
+    Índice do ranking validado pela assinatura de recordings.json e songs.json
+
+    Com pending_likes, as curtidas ainda não gravadas são somadas a cada
+    reconstrução (ver like_counter.LikeCounter).
+    """
+
+    def __init__(self, recordings_path, songs_path, pending_likes=None, lock=None):
+        def build():
+            index = RecordingRankings.build(load_dict(recordings_path), load_dict(songs_path))
+            if pending_likes is not None:
+                for recording_id, delta in pending_likes().items():
+                    index.add_likes(recording_id, delta)
+            return index
+
+        super().__init__((recordings_path, songs_path), build, lock)
+
+    def page(self, sort_by="likes", limit=None, offset=0):
+        """Página do ranking (ver RecordingRankings.page)"""
+        return self.read(lambda index: index.page(sort_by, limit, offset))
+
+    def paginate(self, sort_by="likes", cursor=None, limit=PAGE_SIZE):
+        """Página do ranking por cursor (ver RecordingRankings.paginate)"""
+        return self.read(lambda index: index.paginate(sort_by, cursor, limit))
+
+    def count(self):
+        """Total de gravações no ranking"""
+        return self.read(len)
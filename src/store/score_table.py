@@ -0,0 +1,236 @@
+"""
+Tabela colunar de pontuações para análises
+Cada pontuação ocupa uma posição em colunas de tipo fixo (array); músicas e
+jogadores são internados como inteiros. As consultas rodam vetorizadas com
+NumPy sobre visões das colunas, sem cópia.
+"""
+from array import array
+from datetime import datetime
+
+import numpy as np
+
+# Tamanho padrão dos intervalos de distribution_over_time (1 dia)
+DAY_SECONDS = 86400
+
+
+def _epoch(timestamp):
+    """Converte o criadoEm (ISO, UTC) em segundos; NaN se ausente ou inválido"""
+    if not timestamp:
+        return float("nan")
+    try:
+        return datetime.fromisoformat(timestamp.replace("Z", "+00:00")).timestamp()
+    except (TypeError, ValueError):
+        return float("nan")
+
+
+class _Interner:
+    """Mapeia strings para inteiros sequenciais e de volta"""
+
+    def __init__(self):
+        self.codes = {}
+        self.values = []
+
+    def code(self, value):
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+class ScoreTable:
+    """
+    Pontuações em colunas: música, jogador, score, accuracy e horário
+
+    score e accuracy são float32 (accuracy ausente vira NaN) e o horário é
+    o criadoEm em segundos desde 1970 (float64). São 24 bytes por pontuação,
+    mais uma string por música e por jogador distintos.
+    """
+
+    def __init__(self):
+        self._songs = _Interner()
+        self._players = _Interner()
+        self._song = array('i')
+        self._player = array('i')
+        self._score = array('f')
+        self._accuracy = array('f')
+        self._time = array('d')
+
+    @classmethod
+    def build(cls, scores):
+        """
+        Constrói a tabela a partir das pontuações do scores_store
+
+        Args:
+            scores (iterable): Pontuações (songId, playerName, score,
+                accuracy, criadoEm)
+
+        Returns:
+            ScoreTable: Tabela construída
+        """
+        table = cls()
+        table.extend(scores)
+        return table
+
+    def __len__(self):
+        return len(self._score)
+
+    def extend(self, entries):
+        """
+        Acrescenta pontuações ao fim das colunas
+
+        Args:
+            entries (iterable): Pontuações no formato do scores_store
+        """
+        song_code, player_code = self._songs.code, self._players.code
+        for entry in entries:
+            accuracy = entry.get('accuracy')
+            self._song.append(song_code(entry['songId']))
+            self._player.append(player_code(entry['playerName']))
+            self._score.append(entry['score'])
+            self._accuracy.append(float("nan") if accuracy is None else accuracy)
+            self._time.append(_epoch(entry.get('criadoEm')))
+
+    def memory_bytes(self):
+        """
+        Memória ocupada pelas colunas (sem contar as strings internadas)
+
+        Returns:
+            int: Bytes alocados
+        """
+        columns = (self._song, self._player, self._score, self._accuracy, self._time)
+        return sum(column.buffer_info()[1] * column.itemsize for column in columns)
+
+    def _column(self, column, dtype):
+        """Visão NumPy de uma coluna, sem cópia"""
+        if not column:
+            return np.empty(0, dtype=dtype)
+        return np.frombuffer(column, dtype=dtype)
+
+    def _mask(self, song_id):
+        """Linhas de uma música (None se song_id for None; False se desconhecida)"""
+        if song_id is None:
+            return None
+        code = self._songs.codes.get(song_id)
+        if code is None:
+            return False
+        return self._column(self._song, np.int32) == code
+
+    def _scores(self, song_id=None):
+        """Coluna de scores, filtrada pela música se informada"""
+        scores = self._column(self._score, np.float32)
+        mask = self._mask(song_id)
+        if mask is None:
+            return scores
+        if mask is False:
+            return scores[:0]
+        return scores[mask]
+
+    def percentiles(self, song_id=None, percents=(50, 90, 99)):
+        """
+        Percentis das pontuações
+
+        Args:
+            song_id (str): ID da música (None considera todas)
+            percents (tuple): Percentis desejados (0-100)
+
+        Returns:
+            dict: Percentil -> pontuação (vazio se não houver pontuações)
+        """
+        scores = self._scores(song_id)
+        if not len(scores):
+            return {}
+        values = np.percentile(scores, percents)
+        return {p: float(v) for p, v in zip(percents, values)}
+
+    def histogram(self, song_id=None, bins=10, value_range=(0, 100)):
+        """
+        Histograma das pontuações
+
+        Args:
+            song_id (str): ID da música (None considera todas)
+            bins (int): Quantidade de faixas
+            value_range (tuple): Limites (mínimo, máximo) das faixas
+
+        Returns:
+            dict: counts (por faixa) e edges (bins + 1 limites)
+        """
+        counts, edges = np.histogram(self._scores(song_id), bins=bins, range=value_range)
+        return {"counts": counts.tolist(), "edges": edges.tolist()}
+
+    def player_rank(self, player_name, song_id=None):
+        """
+        Posição da melhor pontuação do jogador entre todas as tentativas
+
+        Args:
+            player_name (str): Nome do jogador
+            song_id (str): ID da música (None considera todas)
+
+        Returns:
+            dict: best, rank (1 = melhor), total e percentile (percentual de
+                tentativas abaixo), ou None se o jogador não pontuou
+        """
+        code = self._players.codes.get(player_name)
+        if code is None:
+            return None
+        scores = self._column(self._score, np.float32)
+        players = self._column(self._player, np.int32)
+        mask = self._mask(song_id)
+        if mask is False:
+            return None
+        if mask is not None:
+            scores, players = scores[mask], players[mask]
+
+        own = scores[players == code]
+        if not len(own):
+            return None
+        best = own.max()
+        total = len(scores)
+        return {
+            "best": float(best),
+            "rank": int(np.count_nonzero(scores > best)) + 1,
+            "total": total,
+            "percentile": float(np.count_nonzero(scores < best)) * 100 / total
+        }
+
+    def distribution_over_time(self, song_id=None, bucket_seconds=DAY_SECONDS):
+        """
+        Resumo das pontuações por intervalo de tempo
+
+        Args:
+            song_id (str): ID da música (None considera todas)
+            bucket_seconds (int): Tamanho de cada intervalo em segundos
+
+        Returns:
+            list: Um dict por intervalo com pontuações, em ordem
+                cronológica: start (epoch), count, mean, median, min e max
+        """
+        scores = self._column(self._score, np.float32)
+        times = self._column(self._time, np.float64)
+        mask = self._mask(song_id)
+        if mask is False:
+            return []
+        if mask is not None:
+            scores, times = scores[mask], times[mask]
+        valid = ~np.isnan(times)
+        scores, times = scores[valid], times[valid]
+        if not len(scores):
+            return []
+
+        buckets = np.floor(times / bucket_seconds).astype(np.int64)
+        # Ordena por intervalo e, dentro dele, por pontuação: a mediana e os
+        # extremos saem por posição
+        order = np.lexsort((scores, buckets))
+        buckets, scores = buckets[order], scores[order].astype(np.float64)
+        starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+        counts = np.diff(np.r_[starts, len(buckets)])
+        ends = starts + counts - 1
+        sums = np.add.reduceat(scores, starts)
+        medians = (scores[starts + (counts - 1) // 2] + scores[starts + counts // 2]) / 2
+
+        return [
+            {"start": int(bucket) * bucket_seconds, "count": int(count), "mean": float(total / count),
+             "median": float(median), "min": float(low), "max": float(high)}
+            for bucket, count, total, median, low, high
+            in zip(buckets[starts], counts, sums, medians, scores[starts], scores[ends])
+        ]
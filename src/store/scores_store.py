@@ -1,52 +1,301 @@
 """
 Gerenciamento de pontuações
-CRUD para o arquivo scores.json
+CRUD para o arquivo scores.json (ou para o SQLite, com JINGLETUBE_STORE_BACKEND=sqlite)
+
+No modo journal (JINGLETUBE_SCORES_JOURNAL=1) as escritas apenas acrescentam
+uma linha JSON em scores.jsonl; o snapshot scores.json é reescrito somente na
+compactação.
 """
+import copy
+import itertools
 import json
 import os
+import threading
 from datetime import datetime
 import uuid
 
+from . import metrics, sqlite_backend, transactions
+from .file_cache import cache, signature
+from .leaderboard import TopKIndex
+
 SCORES_FILE = "data/scores.json"
+SCORES_JOURNAL_FILE = "data/scores.jsonl"
+
+# Backend de persistência: "json" (padrão) ou "sqlite"
+STORE_BACKEND = os.getenv("JINGLETUBE_STORE_BACKEND", "json")
+
+# Modo journal: add_score/delete_score acrescentam um registro por linha
+JOURNAL_ENABLED = os.getenv("JINGLETUBE_SCORES_JOURNAL", "0") == "1"
+# Política de fsync do journal: "always" (a cada escrita) ou "never" (fica a cargo do SO)
+JOURNAL_FSYNC = os.getenv("JINGLETUBE_JOURNAL_FSYNC", "always")
+# Quantidade de registros no journal que dispara a compactação automática (0 desativa)
+JOURNAL_COMPACT_THRESHOLD = int(os.getenv("JINGLETUBE_JOURNAL_COMPACT_THRESHOLD", "1000"))
+
+# Pontuações por escrita em add_scores no journal e no SQLite
+BULK_CHUNK = int(os.getenv("JINGLETUBE_BULK_CHUNK", "1000"))
+
+# Tamanho do top-K mantido em memória para get_top_scores
+LEADERBOARD_K = int(os.getenv("JINGLETUBE_LEADERBOARD_K", "10"))
+
+# Registros pendentes no journal, por caminho do arquivo
+_journal_counts = {}
+
+# Índice de melhores pontuações, construído do disco na primeira leitura
+_leaderboard = None
+_leaderboard_source = None
+
+# Tabela colunar para as análises, construída do disco na primeira consulta
+_score_table = None
+_score_table_source = None
+
+# Serializa as escritas e o acesso ao índice entre threads do Gradio
+_lock = threading.Lock()
+
+# Funções chamadas com as pontuações recém-adicionadas (ver add_listener)
+_listeners = []
 
 def _ensure_data_dir():
     """Garante que o diretório data/ existe"""
     os.makedirs("data", exist_ok=True)
 
-def _load_scores():
-    """Carrega pontuações do arquivo JSON"""
-    _ensure_data_dir()
+def _read_snapshot():
+    """Lê o snapshot scores.json"""
     if not os.path.exists(SCORES_FILE):
         return []
     
     try:
         with open(SCORES_FILE, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except:
+            scores = json.load(f)
+            metrics.record_read(SCORES_FILE, f)
+            return scores
+    except (OSError, ValueError):
         return []
 
+def _paths():
+    """Arquivos de que as pontuações carregadas dependem"""
+    return (SCORES_FILE, SCORES_JOURNAL_FILE)
+
+def _replay_journal(scores):
+    """
+    Aplica os registros do journal sobre o snapshot
+    
+    Args:
+        scores (list): Pontuações do snapshot
+        
+    Returns:
+        list: Pontuações com o journal aplicado
+    """
+    if not os.path.exists(SCORES_JOURNAL_FILE):
+        _journal_counts[SCORES_JOURNAL_FILE] = 0
+        return scores
+    
+    by_id = {s['id']: s for s in scores}
+    count = 0
+    with open(SCORES_JOURNAL_FILE, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # Linha incompleta (queda durante a escrita): ignora
+                continue
+            count += 1
+            if record.get("op") == "add":
+                entry = record["entry"]
+                by_id[entry['id']] = entry
+            elif record.get("op") == "delete":
+                by_id.pop(record["id"], None)
+    
+    _journal_counts[SCORES_JOURNAL_FILE] = count
+    return list(by_id.values())
+
+def _read_scores():
+    """Lê o snapshot JSON e aplica o journal, sem passar pelo cache"""
+    return _replay_journal(_read_snapshot())
+
+@metrics.instrument("io")
+def _load_scores():
+    """Carrega pontuações do snapshot JSON e aplica o journal"""
+    _ensure_data_dir()
+    return copy.copy(cache.get(_paths(), _read_scores))
+
+@metrics.instrument("io")
 def _save_scores(scores):
-    """Salva pontuações no arquivo JSON"""
+    """
+    Salva pontuações no arquivo JSON e descarta o journal já incorporado
+    
+    O snapshot é gravado num temporário com fsync e trocado por rename
+    atômico; o journal só é apagado depois, então uma queda no meio deixa
+    o snapshot antigo mais o journal, nunca um arquivo truncado.
+    """
     _ensure_data_dir()
-    with open(SCORES_FILE, 'w', encoding='utf-8') as f:
-        json.dump(scores, f, indent=2, ensure_ascii=False)
+    tmp_path = transactions.temp_path(SCORES_FILE)
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(scores, f, indent=2, ensure_ascii=False)
+            metrics.record_write(SCORES_FILE, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, SCORES_FILE)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    
+    if os.path.exists(SCORES_JOURNAL_FILE):
+        os.remove(SCORES_JOURNAL_FILE)
+    _journal_counts[SCORES_JOURNAL_FILE] = 0
+    cache.put(_paths(), copy.copy(scores))
 
-def add_score(song_id, player_name, score, accuracy=None):
+def _count_journal():
+    """Conta os registros do journal (usado só quando a contagem é desconhecida)"""
+    if not os.path.exists(SCORES_JOURNAL_FILE):
+        return 0
+    with open(SCORES_JOURNAL_FILE, 'r', encoding='utf-8') as f:
+        return sum(1 for _ in f)
+
+def _append_journal(records):
     """
-    Adiciona uma nova pontuação
+    Acrescenta registros ao journal respeitando a política de fsync
     
     Args:
-        song_id (str): ID da música
-        player_name (str): Nome do jogador
-        score (int): Pontuação obtida
-        accuracy (float): Precisão percentual (opcional)
+        records (list): Registros ({"op": "add"|"delete", ...})
+    """
+    _ensure_data_dir()
+    if SCORES_JOURNAL_FILE not in _journal_counts:
+        _journal_counts[SCORES_JOURNAL_FILE] = _count_journal()
+    cached = cache.peek(_paths())
+    
+    with open(SCORES_JOURNAL_FILE, 'a', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        if JOURNAL_FSYNC == "always":
+            f.flush()
+            os.fsync(f.fileno())
+    
+    _journal_counts[SCORES_JOURNAL_FILE] += len(records)
+    
+    # Aplica os registros à lista em cache, no lugar, em vez de reler o
+    # journal inteiro (quem lê recebe cópias, ver _load_scores)
+    if cached is not None:
+        for record in records:
+            if record["op"] == "add":
+                cached.append(record["entry"])
+            else:
+                cached[:] = [s for s in cached if s['id'] != record["id"]]
+        cache.put(_paths(), cached)
+    
+    if JOURNAL_COMPACT_THRESHOLD and _journal_counts[SCORES_JOURNAL_FILE] >= JOURNAL_COMPACT_THRESHOLD:
+        _compact_scores()
+
+def _compact_scores():
+    """Incorpora o journal ao snapshot (chamar com _lock adquirido)"""
+    scores = _load_scores()
+    _save_scores(scores)
+    return len(scores)
+
+def compact_scores():
+    """
+    Incorpora o journal ao snapshot scores.json
+    
+    Roda com o lock das escritas: um add_score no meio não cai no journal
+    que está para ser apagado. A reaplicação do journal é idempotente, então
+    uma queda entre a escrita do snapshot e a remoção do journal não duplica
+    pontuações.
+    
+    Returns:
+        int: Número de pontuações no snapshot compactado
+    """
+    with _lock:
+        return _compact_scores()
+
+def _leaderboard_key():
+    """Identifica os dados em disco de que o índice top-K depende"""
+    return (_paths(), LEADERBOARD_K, signature(_paths()))
+
+def _current_leaderboard():
+    """Retorna o índice top-K já construído, ou None se ausente ou obsoleto"""
+    if _leaderboard_source != _leaderboard_key():
+        return None
+    return _leaderboard
+
+def _get_leaderboard():
+    """Retorna o índice top-K, reconstruindo do disco se necessário"""
+    global _leaderboard, _leaderboard_source
+    if _current_leaderboard() is None:
+        key = _leaderboard_key()
+        _leaderboard = TopKIndex.build(_load_scores(), LEADERBOARD_K)
+        _leaderboard_source = key
+    return _leaderboard
+
+def _mark_leaderboard_current():
+    """Registra que o índice já reflete a escrita que o próprio módulo fez"""
+    global _leaderboard_source
+    _leaderboard_source = _leaderboard_key()
+
+def rebuild_leaderboard():
+    """
+    Descarta o índice top-K e o reconstrói a partir do disco
+    
+    Returns:
+        TopKIndex: Índice reconstruído
+    """
+    global _leaderboard_source
+    with _lock:
+        _leaderboard_source = None
+        return _get_leaderboard()
+
+def _score_table_key():
+    """Identifica os dados em disco de que a tabela colunar depende"""
+    return (_paths(), signature(_paths()))
+
+def _current_score_table():
+    """Retorna a tabela colunar já construída, ou None se ausente ou obsoleta"""
+    if _score_table_source != _score_table_key():
+        return None
+    return _score_table
+
+def query_score_table(query):
+    """
+    Consulta a tabela colunar de pontuações (percentis, histogramas, ranking)
+    
+    A tabela é construída na primeira consulta e acompanha add_score/add_scores
+    sem reler o disco. A consulta roda com o lock adquirido.
+    
+    Args:
+        query (callable): Recebe a ScoreTable e retorna o resultado
         
     Returns:
-        dict: Pontuação adicionada
+        object: Resultado de query
     """
-    scores = _load_scores()
+    global _score_table, _score_table_source
+    # Só as análises precisam da tabela colunar: importada no primeiro uso
+    from .score_table import ScoreTable
+    if _use_sqlite():
+        return query(ScoreTable.build(sqlite_backend.load_scores()))
+    
+    with _lock:
+        if _current_score_table() is None:
+            key = _score_table_key()
+            _score_table = ScoreTable.build(_load_scores())
+            _score_table_source = key
+        return query(_score_table)
+
+def _use_sqlite():
+    """Verifica se o backend SQLite está ativo"""
+    return STORE_BACKEND == "sqlite"
+
+def _copy(score):
+    """
+    Cópia de um registro para quem chama a API
     
-    score_entry = {
+    Os registros em cache e no top-K são compartilhados entre chamadas:
+    alterar a cópia não afeta leituras futuras (como ao reler o arquivo).
+    """
+    return dict(score)
+
+def _new_score(song_id, player_name, score, accuracy=None):
+    """Monta o registro de uma nova pontuação"""
+    return {
         "id": str(uuid.uuid4()),
         "songId": song_id,
         "playerName": player_name,
@@ -54,10 +303,110 @@ def add_score(song_id, player_name, score, accuracy=None):
         "accuracy": accuracy,
         "criadoEm": datetime.utcnow().isoformat() + "Z"
     }
+
+def _insert_scores(entries):
+    """
+    Persiste novas pontuações com uma única escrita
     
-    scores.append(score_entry)
-    _save_scores(scores)
-    return score_entry
+    Args:
+        entries (list): Pontuações já montadas
+    """
+    global _score_table_source
+    if _use_sqlite():
+        sqlite_backend.insert_scores(entries)
+    else:
+        with _lock:
+            leaderboard = _current_leaderboard()
+            table = _current_score_table()
+            if JOURNAL_ENABLED:
+                _append_journal([{"op": "add", "entry": e} for e in entries])
+            else:
+                scores = _load_scores()
+                scores.extend(entries)
+                _save_scores(scores)
+            
+            if leaderboard is not None:
+                for entry in entries:
+                    leaderboard.add(entry)
+                _mark_leaderboard_current()
+            if table is not None:
+                table.extend(entries)
+                _score_table_source = _score_table_key()
+    
+    for listener in _listeners:
+        listener(entries)
+
+def add_listener(listener):
+    """
+    Registra uma função chamada após cada add_score/add_scores
+    
+    Args:
+        listener (callable): Recebe a lista de pontuações adicionadas
+    """
+    _listeners.append(listener)
+
+def add_score(song_id, player_name, score, accuracy=None):
+    """
+    Adiciona uma nova pontuação
+    
+    Args:
+        song_id (str): ID da música
+        player_name (str): Nome do jogador
+        score (int): Pontuação obtida
+        accuracy (float): Precisão percentual (opcional)
+        
+    Returns:
+        dict: Pontuação adicionada
+    """
+    score_entry = _new_score(song_id, player_name, score, accuracy)
+    _insert_scores([score_entry])
+    return _copy(score_entry)
+
+def _chunks(items, size):
+    """Divide um iterável em listas de até size itens, sem materializá-lo inteiro"""
+    items = iter(items)
+    while True:
+        chunk = list(itertools.islice(items, size))
+        if not chunk:
+            return
+        yield chunk
+
+def add_scores(scores, return_records=True):
+    """
+    Adiciona várias pontuações em lote
+    
+    A entrada é consumida em blocos de BULK_CHUNK itens: no modo journal cada
+    bloco é um append em scores.jsonl e no SQLite um executemany, então um
+    gerador (ex.: linhas de um CSV de importação) não é carregado inteiro na
+    memória. Sem journal, o scores.json é regravado uma única vez no final.
+    
+    Args:
+        scores (iterable): Dicionários com song_id, player_name, score e
+            accuracy (opcional)
+        return_records (bool): False devolve só a quantidade, sem guardar
+            as pontuações criadas
+        
+    Returns:
+        list | int: Pontuações adicionadas (ou a quantidade)
+    """
+    entries = (
+        _new_score(item['song_id'], item['player_name'], item['score'], item.get('accuracy'))
+        for item in scores
+    )
+    if _use_sqlite() or JOURNAL_ENABLED:
+        chunks = _chunks(entries, BULK_CHUNK)
+    else:
+        # O arquivo inteiro é reescrito: uma única escrita com tudo
+        chunks = [chunk for chunk in [list(entries)] if chunk]
+    
+    added = []
+    count = 0
+    for chunk in chunks:
+        _insert_scores(chunk)
+        count += len(chunk)
+        if return_records:
+            added.extend(_copy(entry) for entry in chunk)
+    return added if return_records else count
 
 def get_all_scores():
     """
@@ -66,7 +415,9 @@ def get_all_scores():
     Returns:
         list: Lista de pontuações
     """
-    return _load_scores()
+    if _use_sqlite():
+        return sqlite_backend.load_scores()
+    return [_copy(score) for score in _load_scores()]
 
 def get_scores_by_song(song_id):
     """
@@ -78,8 +429,11 @@ def get_scores_by_song(song_id):
     Returns:
         list: Lista de pontuações da música
     """
+    if _use_sqlite():
+        return sqlite_backend.load_scores(song_id)
+    
     scores = _load_scores()
-    return [s for s in scores if s['songId'] == song_id]
+    return [_copy(s) for s in scores if s['songId'] == song_id]
 
 def get_top_scores(song_id=None, limit=10):
     """
@@ -92,6 +446,13 @@ def get_top_scores(song_id=None, limit=10):
     Returns:
         list: Lista das melhores pontuações ordenadas
     """
+    if _use_sqlite():
+        return sqlite_backend.top_scores(song_id, limit)
+    
+    if limit <= LEADERBOARD_K:
+        with _lock:
+            return [_copy(s) for s in _get_leaderboard().top(song_id or None, limit)]
+    
     scores = _load_scores()
     
     if song_id:
@@ -99,7 +460,7 @@ def get_top_scores(song_id=None, limit=10):
     
     # Ordena por pontuação (decrescente)
     scores.sort(key=lambda x: x['score'], reverse=True)
-    return scores[:limit]
+    return [_copy(s) for s in scores[:limit]]
 
 def delete_score(score_id):
     """
@@ -111,10 +472,24 @@ def delete_score(score_id):
     Returns:
         bool: True se removido com sucesso
     """
-    scores = _load_scores()
-    filtered = [s for s in scores if s['id'] != score_id]
+    if _use_sqlite():
+        return sqlite_backend.delete_score(score_id)
     
-    if len(filtered) < len(scores):
-        _save_scores(filtered)
+    with _lock:
+        leaderboard = _current_leaderboard()
+        scores = _load_scores()
+        filtered = [s for s in scores if s['id'] != score_id]
+        
+        if len(filtered) == len(scores):
+            return False
+        
+        if JOURNAL_ENABLED:
+            _append_journal([{"op": "delete", "id": score_id}])
+        else:
+            _save_scores(filtered)
+        
+        if leaderboard is not None:
+            removed = next(s for s in scores if s['id'] == score_id)
+            leaderboard.remove(removed, filtered)
+            _mark_leaderboard_current()
         return True
-    return False
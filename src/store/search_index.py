@@ -0,0 +1,241 @@
+"""
+Índice invertido para a busca de músicas
+Título, artista e letra são tokenizados sem acentos e sem diferenciar
+maiúsculas; o último termo da consulta casa por prefixo (busca enquanto digita)
+"""
+import bisect
+import heapq
+import re
+import unicodedata
+
+# Peso de cada campo no ranking dos resultados
+FIELD_WEIGHTS = (("title", 3), ("artist", 2), ("lyrics", 1))
+
+# Listas do prefixo até este múltiplo da do termo mais raro viram um conjunto
+# para descartar candidatos sem conferir o texto
+PREFIX_SET_RATIO = 8
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def normalize(text):
+    """
+    Remove acentos e converte para minúsculas ("Canção" -> "cancao")
+
+    Args:
+        text (str): Texto original
+
+    Returns:
+        str: Texto normalizado
+    """
+    text = text.casefold()
+    if text.isascii():
+        return text
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def tokenize(text):
+    """
+    Divide um texto em termos normalizados
+
+    Args:
+        text (str): Texto original (None é tratado como vazio)
+
+    Returns:
+        list: Termos na ordem do texto
+    """
+    if not text:
+        return []
+    return _TOKEN_RE.findall(normalize(text))
+
+
+class SearchIndex:
+    """
+    Índice invertido termo -> {peso: [documentos]}
+
+    Os documentos são numerados na ordem de inserção, então cada lista já
+    nasce ordenada; percorrer os pesos do maior para o menor dá os documentos
+    por relevância sem ordenar nada. O peso de um termo num documento é a
+    soma dos pesos dos campos em que ele aparece.
+
+    O vocabulário fica ordenado para expandir prefixos com bisect, e o texto
+    normalizado de cada campo é guardado para conferir os demais termos da
+    consulta só nos candidatos.
+    """
+
+    def __init__(self):
+        self._postings = {}
+        self._sizes = {}
+        self._masks = {}
+        self._vocabulary = []
+        self._ids = []
+        self._fields = []
+        self._seq_by_id = {}
+
+    @classmethod
+    def build(cls, documents):
+        """
+        Constrói o índice de uma vez (o vocabulário é ordenado só no final)
+
+        Args:
+            documents (iterable): Pares (doc_id, campos) na ordem desejada
+
+        Returns:
+            SearchIndex: Índice construído
+        """
+        index = cls()
+        for doc_id, fields in documents:
+            index._index(doc_id, fields)
+        index._vocabulary = sorted(index._postings)
+        return index
+
+    def __len__(self):
+        return len(self._ids)
+
+    def _index(self, doc_id, fields):
+        """Indexa um documento e retorna os termos novos no vocabulário"""
+        if doc_id in self._seq_by_id:
+            return []
+        seq = len(self._ids)
+        self._ids.append(doc_id)
+        self._seq_by_id[doc_id] = seq
+
+        weights = {}
+        masks = {}
+        field_texts = []
+        for bit, (name, weight) in enumerate(FIELD_WEIGHTS):
+            tokens = tokenize(fields.get(name))
+            field_texts.append(" " + " ".join(tokens) + " ")
+            for token in set(tokens):
+                weights[token] = weights.get(token, 0) + weight
+                masks[token] = masks.get(token, 0) | 1 << bit
+        self._fields.append(tuple(field_texts))
+
+        new_terms = []
+        for token, weight in weights.items():
+            posting = self._postings.get(token)
+            if posting is None:
+                posting = self._postings[token] = {}
+                new_terms.append(token)
+            posting.setdefault(weight, []).append(seq)
+            self._sizes[token] = self._sizes.get(token, 0) + 1
+            self._masks[token] = self._masks.get(token, 0) | masks[token]
+        return new_terms
+
+    def add(self, doc_id, fields):
+        """
+        Indexa um novo documento
+
+        Args:
+            doc_id (str): ID do documento
+            fields (dict): title, artist e lyrics
+        """
+        for token in self._index(doc_id, fields):
+            bisect.insort(self._vocabulary, token)
+
+    def _expand(self, prefix):
+        """Termos do vocabulário que começam com o prefixo"""
+        start = bisect.bisect_left(self._vocabulary, prefix)
+        end = bisect.bisect_left(self._vocabulary, prefix + "\U0010ffff", start)
+        return self._vocabulary[start:end]
+
+    def _ranked(self, term, within=None):
+        """Gera (-peso, seq) do termo por relevância (só os documentos de within, se dado)"""
+        posting = self._postings[term]
+        for weight in sorted(posting, reverse=True):
+            docs = posting[weight] if within is None else sorted(within.intersection(posting[weight]))
+            for seq in docs:
+                yield (-weight, seq)
+
+    def _max_weight(self, terms):
+        """Maior peso que os termos podem somar num documento (campos em que já apareceram)"""
+        mask = 0
+        for term in terms:
+            mask |= self._masks[term]
+        return sum(weight for bit, (_, weight) in enumerate(FIELD_WEIGHTS) if mask >> bit & 1)
+
+    def _candidates(self, terms, limit):
+        """
+        Documentos com algum dos termos, para descartar candidatos sem olhar o texto
+
+        Returns:
+            set: Documentos, ou None se as listas somarem limit ou mais
+        """
+        total = 0
+        for term in terms:
+            total += self._sizes[term]
+            if total >= limit:
+                return None
+        return set().union(*(docs for term in terms for docs in self._postings[term].values()))
+
+    def _weight(self, seq, needle):
+        """Peso dos campos do documento que contêm o trecho (" termo " ou " prefixo")"""
+        return sum(weight for (_, weight), text in zip(FIELD_WEIGHTS, self._fields[seq]) if needle in text)
+
+    def search(self, query, limit=20, accept=None):
+        """
+        Busca documentos com todos os termos (o último como prefixo)
+
+        Só com o prefixo, as listas dos termos expandidos são intercaladas por
+        relevância. Com mais termos, a lista do termo mais raro é percorrida
+        por relevância (cortada pelos documentos do prefixo, se as listas dele
+        forem curtas) e os outros termos são conferidos no texto de cada
+        candidato. Os `limit` melhores pesos totais ficam num heap, e a busca
+        para quando nem o peso máximo dos termos restantes alcança o pior deles.
+
+        Args:
+            query (str): Texto digitado
+            limit (int): Máximo de resultados
+            accept (callable): Filtro opcional por doc_id (ex.: gênero)
+
+        Returns:
+            list: IDs dos documentos, do mais relevante ao menos relevante
+        """
+        terms = tokenize(query)
+        if not terms:
+            return []
+        exact, prefix = list(dict.fromkeys(terms[:-1])), terms[-1]
+        if any(term not in self._postings for term in exact):
+            return []
+        expansions = self._expand(prefix)
+        if not expansions:
+            return []
+
+        if exact:
+            rarest = min(exact, key=self._sizes.__getitem__)
+            others = [term for term in exact if term != rarest]
+            stream = self._ranked(rarest, self._candidates(expansions, PREFIX_SET_RATIO * self._sizes[rarest]))
+            needles = [" " + term + " " for term in others] + [" " + prefix]
+            # Maior peso que os demais termos podem somar a um candidato
+            bonus = sum(max(self._postings[term]) for term in others) + self._max_weight(expansions)
+        else:
+            stream = heapq.merge(*(self._ranked(term) for term in expansions))
+            needles = []
+            bonus = 0
+
+        ids = self._ids
+        # Heap (peso, -seq) dos melhores: o topo é o pior resultado guardado
+        found = []
+        seen = set()
+        for negative_weight, seq in stream:
+            # Os próximos têm peso menor, ou igual com seq maior: não superam o pior
+            if len(found) >= limit and (-negative_weight + bonus, -seq) < found[0]:
+                break
+            if seq in seen:
+                continue
+            seen.add(seq)
+            score = -negative_weight
+            for needle in needles:
+                weight = self._weight(seq, needle)
+                if not weight:
+                    break
+                score += weight
+            else:
+                if accept is None or accept(ids[seq]):
+                    if len(found) < limit:
+                        heapq.heappush(found, (score, -seq))
+                    elif (score, -seq) > found[0]:
+                        heapq.heapreplace(found, (score, -seq))
+        found.sort(reverse=True)
+        return [ids[-negative_seq] for _, negative_seq in found]
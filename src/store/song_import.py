@@ -0,0 +1,201 @@
+"""
+Importação de playlists para a biblioteca de músicas
+Lê um arquivo texto/CSV de links do YouTube linha a linha, extrai os IDs,
+ignora vídeos já cadastrados e grava em lotes de tamanho limitado, sem
+carregar o arquivo inteiro na memória.
+
+Formato: uma música por linha, "link,título,artista" (título e artista
+opcionais) ou "link título" separado por espaço. Linhas vazias, comentários
+(#) e cabeçalhos sem link válido são ignorados.
+
+Uso:
+    PYTHONPATH=src python -m store.song_import playlist.csv [--batch 5000]
+"""
+import argparse
+import csv
+import datetime
+import os
+
+from youtube.parser import extract_video_ids
+
+from . import transactions
+
+SONGS_FILE = "data/songs.json"
+
+# Músicas gravadas por lote (cada lote reescreve o songs.json uma vez)
+IMPORT_BATCH = int(os.getenv("JINGLETUBE_IMPORT_BATCH", "5000"))
+
+
+def read_links(lines):
+    """
+    Converte linhas de texto/CSV em links com título e artista
+
+    Args:
+        lines (iterable): Linhas do arquivo
+
+    Yields:
+        dict: url, title e artist (vazios se ausentes)
+    """
+    rows = csv.reader(line for line in lines if line.strip() and not line.lstrip().startswith("#"))
+    for row in rows:
+        if not row:
+            continue
+        url = row[0].strip()
+        if len(row) == 1 and " " in url:
+            url, _, title = url.partition(" ")
+            row = [url, title]
+        yield {
+            "url": url,
+            "title": row[1].strip() if len(row) > 1 else "",
+            "artist": row[2].strip() if len(row) > 2 else ""
+        }
+
+
+def _chunks(items, size):
+    """Agrupa um iterável em listas de até `size` itens"""
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def import_links(lines, add_batch, known_ids=(), batch_size=None, progress=None):
+    """
+    Importa links em lotes
+
+    Args:
+        lines (iterable): Linhas do arquivo (consumidas sob demanda)
+        add_batch (callable): Grava uma lista de músicas (youtube_id, titulo,
+            artista) e retorna quantas foram criadas
+        known_ids (iterable): youtubeIds já cadastrados
+        batch_size (int): Músicas por lote (IMPORT_BATCH se omitido)
+        progress (callable): Recebe as contagens após cada lote
+
+    Returns:
+        dict: read, imported, duplicates e invalid
+    """
+    stats = {"read": 0, "imported": 0, "duplicates": 0, "invalid": 0}
+    seen = set(known_ids)
+    for chunk in _chunks(read_links(lines), batch_size or IMPORT_BATCH):
+        batch = []
+        for item, youtube_id in zip(chunk, extract_video_ids(item["url"] for item in chunk)):
+            stats["read"] += 1
+            if youtube_id is None:
+                stats["invalid"] += 1
+            elif youtube_id in seen:
+                stats["duplicates"] += 1
+            else:
+                seen.add(youtube_id)
+                batch.append({"youtube_id": youtube_id, "titulo": item["title"], "artista": item["artist"]})
+        if batch:
+            stats["imported"] += add_batch(batch)
+        if progress:
+            progress(dict(stats))
+    return stats
+
+
+def library_youtube_ids(songs):
+    """
+    youtubeIds das músicas da biblioteca do app
+
+    Args:
+        songs (dict): Conteúdo do songs.json (dicionário por ID)
+
+    Returns:
+        set: IDs de vídeo já cadastrados
+    """
+    return {song["youtube_id"] for song in songs.values() if song.get("youtube_id")}
+
+
+def add_to_library(tx, songs_file, batch):
+    """
+    Acrescenta um lote ao songs.json do app dentro de uma transação
+
+    Args:
+        tx (Transaction): Transação em andamento
+        songs_file (str): Caminho do songs.json
+        batch (list): Músicas com youtube_id, titulo e artista
+
+    Returns:
+        list: Pares (song_id, música) criados
+    """
+    songs = tx.load(songs_file)
+    now = datetime.datetime.now()
+    created = []
+    for item in batch:
+        song_id = f"song_{len(songs) + 1}_{now.timestamp()}"
+        songs[song_id] = {
+            "title": item["titulo"] or f"YouTube {item['youtube_id']}",
+            "artist": item["artista"] or "Unknown",
+            "genre": "Unknown",
+            "lyrics": "",
+            "audio_path": None,
+            "audio_blob": None,
+            "youtube_id": item["youtube_id"],
+            "added_at": str(now),
+            "play_count": 0
+        }
+        created.append((song_id, songs[song_id]))
+    tx.save(songs_file, songs)
+    return created
+
+
+def import_file(path, add_batch, known_ids=(), batch_size=None, progress=None):
+    """
+    Importa um arquivo, informando também a fração já lida
+
+    Args:
+        path (str): Arquivo texto/CSV (UTF-8)
+        add_batch, known_ids, batch_size: Ver import_links
+        progress (callable): Recebe as contagens e "fraction" (0 a 1)
+
+    Returns:
+        dict: read, imported, duplicates e invalid
+    """
+    size = os.path.getsize(path) or 1
+    consumed = [0]
+
+    def lines(f):
+        for raw in f:
+            consumed[0] += len(raw)
+            yield raw.decode("utf-8", errors="replace").lstrip("\ufeff")
+
+    def report(stats):
+        if progress:
+            progress(dict(stats, fraction=min(1.0, consumed[0] / size)))
+
+    with open(path, "rb") as f:
+        return import_links(lines(f), add_batch, known_ids, batch_size, report)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Importa links do YouTube para a biblioteca de músicas")
+    parser.add_argument("path", help="Arquivo texto/CSV: link,título,artista por linha")
+    parser.add_argument("--songs-file", default=SONGS_FILE, help="songs.json do app")
+    parser.add_argument("--batch", type=int, default=IMPORT_BATCH, help="Músicas por lote")
+    args = parser.parse_args()
+
+    os.makedirs(os.path.dirname(args.songs_file) or ".", exist_ok=True)
+    transactions.recover()
+
+    def add_batch(batch):
+        tx = transactions.Transaction()
+        created = add_to_library(tx, args.songs_file, batch)
+        tx.commit()
+        return len(created)
+
+    def progress(stats):
+        print(f"\r{stats['fraction']:6.1%}  {stats['imported']} importadas, "
+              f"{stats['duplicates']} repetidas, {stats['invalid']} inválidas", end="", flush=True)
+
+    known = library_youtube_ids(transactions.Transaction().load(args.songs_file))
+    stats = import_file(args.path, add_batch, known, args.batch, progress)
+    print(f"\n{stats['read']} linhas lidas, {stats['imported']} músicas importadas.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+Índice da biblioteca de músicas do app
+Mantém as músicas na ordem de cadastro, com listas por gênero, para paginar
+e contar sem percorrer o songs.json, e o índice de busca por texto
+"""
+from .file_cache import IndexCache, load_dict
+from .pagination import PAGE_SIZE, paginate
+from .search_index import SearchIndex
+
+ALL_GENRES = "All"
+
+
+class SongLibrary:
+    """
+    Músicas na ordem de cadastro, no total e por gênero
+
+    As chaves são (seq, song_id), com seq seguindo a ordem do arquivo.
+    """
+
+    def __init__(self):
+        self._rows = {}
+        self._keys = []
+        self._by_genre = {}
+        self._genre_of = {}
+        self._next_seq = 0
+        self._search = SearchIndex()
+
+    @classmethod
+    def build(cls, songs):
+        """
+        Constrói o índice a partir do songs.json completo
+
+        Args:
+            songs (dict): Músicas por ID, na ordem do arquivo
+
+        Returns:
+            SongLibrary: Índice construído
+        """
+        index = cls()
+        for song_id, song in songs.items():
+            index._add_row(song_id, song)
+        index._search = SearchIndex.build(songs.items())
+        return index
+
+    def add(self, song_id, song):
+        """
+        Registra uma nova música
+
+        Args:
+            song_id (str): ID da música
+            song (dict): Dados da música
+        """
+        if song_id in self._rows:
+            return
+        self._add_row(song_id, song)
+        self._search.add(song_id, song)
+
+    def _add_row(self, song_id, song):
+        """Registra a linha da música nas listas de paginação"""
+        if song_id in self._rows:
+            return
+        key = (self._next_seq, song_id)
+        self._next_seq += 1
+        genre = song.get("genre")
+        self._rows[song_id] = [song["title"], song["artist"], song.get("genre", "Unknown"), song_id]
+        # seq é crescente, então append mantém as listas ordenadas
+        self._keys.append(key)
+        self._by_genre.setdefault(genre, []).append(key)
+        self._genre_of[song_id] = genre
+
+    def _genre_keys(self, genre):
+        """Chaves de um gênero (todas para "All")"""
+        if genre == ALL_GENRES:
+            return self._keys
+        return self._by_genre.get(genre, [])
+
+    def count(self, genre=ALL_GENRES):
+        """Quantidade de músicas do gênero"""
+        return len(self._genre_keys(genre))
+
+    def rows(self, genre=ALL_GENRES):
+        """Todas as linhas do gênero, na ordem de cadastro"""
+        return [list(self._rows[key[1]]) for key in self._genre_keys(genre)]
+
+    def paginate(self, genre=ALL_GENRES, cursor=None, limit=PAGE_SIZE):
+        """
+        Página da biblioteca a partir de um cursor
+
+        Args:
+            genre (str): Gênero ou "All"
+            cursor (str): Cursor retornado na página anterior (None para a primeira)
+            limit (int): Tamanho da página
+
+        Returns:
+            dict: rows, prev_cursor, next_cursor, total e start (posição da
+                primeira linha)
+
+        Raises:
+            ValueError: Se o cursor for inválido
+        """
+        keys = self._genre_keys(genre)
+        result = paginate(keys, cursor, limit)
+        return {
+            "rows": [list(self._rows[key[1]]) for key in result.pop("keys")],
+            "total": len(keys),
+            **result
+        }
+
+
+    def search(self, query, genre=ALL_GENRES, limit=PAGE_SIZE):
+        """
+        Busca músicas por título, artista e letra
+
+        Args:
+            query (str): Texto digitado (o último termo casa por prefixo)
+            genre (str): Gênero ou "All"
+            limit (int): Máximo de resultados
+
+        Returns:
+            list: Linhas das músicas encontradas, das mais relevantes às menos
+        """
+        accept = None
+        if genre != ALL_GENRES:
+            accept = lambda song_id: self._genre_of[song_id] == genre
+        return [list(self._rows[song_id]) for song_id in self._search.search(query, limit, accept)]
+
+
+class SongLibraryCache(IndexCache):
+    """Índice da biblioteca validado pela assinatura do songs.json"""
+
+    def __init__(self, songs_path):
+        super().__init__((songs_path,), lambda: SongLibrary.build(load_dict(songs_path)))
+
+    def rows(self, genre=ALL_GENRES):
+        """Todas as linhas do gênero (ver SongLibrary.rows)"""
+        return self.read(lambda index: index.rows(genre))
+
+    def paginate(self, genre=ALL_GENRES, cursor=None, limit=PAGE_SIZE):
+        """Página da biblioteca por cursor (ver SongLibrary.paginate)"""
+        return self.read(lambda index: index.paginate(genre, cursor, limit))
+
+    def count(self, genre=ALL_GENRES):
+        """Quantidade de músicas do gênero"""
+        return self.read(lambda index: index.count(genre))
+
+    def search(self, query, genre=ALL_GENRES, limit=PAGE_SIZE):
+        """Busca por texto (ver SongLibrary.search)"""
+        return self.read(lambda index: index.search(query, genre, limit))
@@ -1,35 +1,137 @@
 """
 Gerenciamento de músicas
-CRUD para o arquivo songs.json
+CRUD para o arquivo songs.json (ou para o SQLite, com JINGLETUBE_STORE_BACKEND=sqlite)
 """
+import copy
+import itertools
 import json
 import os
+import threading
 from datetime import datetime
 import uuid
 
+from . import metrics, sqlite_backend
+from .file_cache import cache
+
 SONGS_FILE = "data/songs.json"
 
+# Backend de persistência: "json" (padrão) ou "sqlite"
+STORE_BACKEND = os.getenv("JINGLETUBE_STORE_BACKEND", "json")
+
+# Músicas por executemany em add_songs no SQLite
+BULK_CHUNK = int(os.getenv("JINGLETUBE_BULK_CHUNK", "1000"))
+
+# Serializa as escritas entre threads do Gradio
+_lock = threading.Lock()
+
+# Índices por id e youtubeId: (lista em cache de origem, por id, por youtubeId)
+_indexes = (None, {}, {})
+
 def _ensure_data_dir():
     """Garante que o diretório data/ existe"""
     os.makedirs("data", exist_ok=True)
 
-def _load_songs():
-    """Carrega músicas do arquivo JSON"""
-    _ensure_data_dir()
+def _read_songs():
+    """Lê o arquivo JSON, sem passar pelo cache"""
     if not os.path.exists(SONGS_FILE):
         return []
     
     try:
         with open(SONGS_FILE, 'r', encoding='utf-8') as f:
-            return json.load(f)
+            songs = json.load(f)
+            metrics.record_read(SONGS_FILE, f)
+            return songs
     except:
         return []
 
-def _save_songs(songs):
-    """Salva músicas no arquivo JSON"""
+@metrics.instrument("io")
+def _load_songs():
+    """Carrega músicas do arquivo JSON"""
     _ensure_data_dir()
+    return copy.copy(cache.get((SONGS_FILE,), _read_songs))
+
+def _copy(song):
+    """
+    Cópia de um registro para quem chama a API
+    
+    Os registros em cache e nos índices são compartilhados entre chamadas:
+    alterar a cópia não afeta leituras futuras (como ao reler o arquivo).
+    """
+    return dict(song) if song is not None else None
+
+def _build_indexes(songs):
+    """Monta os índices por id e youtubeId (a primeira ocorrência prevalece)"""
+    by_id = {}
+    by_youtube_id = {}
+    for song in songs:
+        by_id.setdefault(song['id'], song)
+        by_youtube_id.setdefault(song['youtubeId'], song)
+    return (songs, by_id, by_youtube_id)
+
+def _get_indexes():
+    """
+    Retorna os índices de músicas, reconstruindo se o arquivo mudou
+    
+    Returns:
+        tuple: (por id, por youtubeId)
+    """
+    global _indexes
+    _ensure_data_dir()
+    songs = cache.get((SONGS_FILE,), _read_songs)
+    if _indexes[0] is not songs:
+        _indexes = _build_indexes(songs)
+    return _indexes[1], _indexes[2]
+
+@metrics.instrument("io")
+def _save_songs(songs, added=(), removed=()):
+    """
+    Salva músicas no arquivo JSON
+    
+    Args:
+        songs (list): Lista completa de músicas
+        added (list): Músicas novas, para atualizar os índices sem reconstruí-los
+        removed (list): Músicas removidas, idem
+    """
+    global _indexes
+    _ensure_data_dir()
+    indexes_current = _indexes[0] is not None and _indexes[0] is cache.peek((SONGS_FILE,))
+    
     with open(SONGS_FILE, 'w', encoding='utf-8') as f:
         json.dump(songs, f, indent=2, ensure_ascii=False)
+        metrics.record_write(SONGS_FILE, f)
+    cached = copy.copy(songs)
+    cache.put((SONGS_FILE,), cached)
+    
+    if indexes_current:
+        _, by_id, by_youtube_id = _indexes
+        for song in removed:
+            for index, key in ((by_id, 'id'), (by_youtube_id, 'youtubeId')):
+                # Com chaves repetidas no arquivo, a entrada pode ser outra música;
+                # se for a removida, a próxima cópia restante assume o lugar
+                if index.get(song[key]) is not song:
+                    continue
+                replacement = next((s for s in cached if s[key] == song[key]), None)
+                if replacement is None:
+                    del index[song[key]]
+                else:
+                    index[song[key]] = replacement
+        for song in added:
+            by_id.setdefault(song['id'], song)
+            by_youtube_id.setdefault(song['youtubeId'], song)
+        _indexes = (cached, by_id, by_youtube_id)
+
+def _use_sqlite():
+    """Verifica se o backend SQLite está ativo"""
+    return STORE_BACKEND == "sqlite"
+
+def _new_song(youtube_id, titulo, position):
+    """Monta o registro de uma nova música"""
+    return {
+        "id": str(uuid.uuid4()),
+        "youtubeId": youtube_id,
+        "titulo": titulo or f"Música {position}",
+        "criadoEm": datetime.utcnow().isoformat() + "Z"
+    }
 
 def add_song(youtube_id, titulo=None):
     """
@@ -42,23 +144,90 @@ def add_song(youtube_id, titulo=None):
     Returns:
         dict: Música adicionada
     """
-    songs = _load_songs()
-    
-    # Verifica se já existe
-    for song in songs:
-        if song['youtubeId'] == youtube_id:
-            return song
+    with _lock:
+        if _use_sqlite():
+            existing = sqlite_backend.get_song_by_youtube_id(youtube_id)
+            if existing:
+                return existing
+            song = _new_song(youtube_id, titulo, sqlite_backend.count_songs() + 1)
+            sqlite_backend.insert_songs([song])
+            # Outro processo pode ter inserido o mesmo youtubeId antes: a
+            # inserção é ignorada e a música dele é retornada
+            return sqlite_backend.get_song_by_youtube_id(youtube_id)
+        
+        # Verifica se já existe
+        existing = _get_indexes()[1].get(youtube_id)
+        if existing:
+            return _copy(existing)
+        
+        songs = _load_songs()
+        song = _new_song(youtube_id, titulo, len(songs) + 1)
+        songs.append(song)
+        _save_songs(songs, added=[song])
+        return _copy(song)
+
+def add_songs(songs, return_records=True):
+    """
+    Adiciona várias músicas em lote
     
-    song = {
-        "id": str(uuid.uuid4()),
-        "youtubeId": youtube_id,
-        "titulo": titulo or f"Música {len(songs) + 1}",
-        "criadoEm": datetime.utcnow().isoformat() + "Z"
-    }
+    A entrada é consumida item a item: no SQLite as músicas novas são
+    inseridas em blocos de BULK_CHUNK, então um gerador (ex.: links de uma
+    playlist) não é carregado inteiro na memória. No JSON o songs.json é
+    regravado uma única vez no final. youtubeIds já cadastrados, ou
+    repetidos na própria entrada, são ignorados.
     
-    songs.append(song)
-    _save_songs(songs)
-    return song
+    Args:
+        songs (iterable): Dicionários com youtube_id e titulo (opcional)
+        return_records (bool): False devolve só a quantidade, sem guardar
+            as músicas criadas
+        
+    Returns:
+        list | int: Músicas criadas, sem as já existentes (ou a quantidade)
+    """
+    with _lock:
+        if _use_sqlite():
+            position = sqlite_backend.count_songs()
+            created = []
+            count = 0
+            items = iter(songs)
+            while True:
+                batch = list(itertools.islice(items, BULK_CHUNK))
+                if not batch:
+                    return created if return_records else count
+                chunk = []
+                seen = set()
+                for item in batch:
+                    youtube_id = item['youtube_id']
+                    # Os blocos anteriores já estão no banco: basta conferir o bloco atual
+                    if youtube_id in seen or sqlite_backend.get_song_by_youtube_id(youtube_id):
+                        continue
+                    seen.add(youtube_id)
+                    position += 1
+                    chunk.append(_new_song(youtube_id, item.get('titulo'), position))
+                if chunk:
+                    sqlite_backend.insert_songs(chunk)
+                    count += len(chunk)
+                    if return_records:
+                        created.extend(chunk)
+        
+        existing = _load_songs()
+        by_youtube_id = _get_indexes()[1]
+        seen = set()
+        added = []
+        for item in songs:
+            youtube_id = item['youtube_id']
+            if youtube_id in seen or youtube_id in by_youtube_id:
+                continue
+            seen.add(youtube_id)
+            song = _new_song(youtube_id, item.get('titulo'), len(existing) + 1)
+            existing.append(song)
+            added.append(song)
+        
+        if added:
+            _save_songs(existing, added=added)
+        if not return_records:
+            return len(added)
+        return [_copy(song) for song in added]
 
 def get_all_songs():
     """
@@ -67,7 +236,9 @@ def get_all_songs():
     Returns:
         list: Lista de músicas
     """
-    return _load_songs()
+    if _use_sqlite():
+        return sqlite_backend.load_songs()
+    return [_copy(song) for song in _load_songs()]
 
 def get_song_by_id(song_id):
     """
@@ -79,11 +250,25 @@ def get_song_by_id(song_id):
     Returns:
         dict: Música encontrada ou None
     """
-    songs = _load_songs()
-    for song in songs:
-        if song['id'] == song_id:
-            return song
-    return None
+    if _use_sqlite():
+        return sqlite_backend.get_song(song_id)
+    
+    return _copy(_get_indexes()[0].get(song_id))
+
+def get_song_by_youtube_id(youtube_id):
+    """
+    Busca uma música pelo ID do vídeo do YouTube
+    
+    Args:
+        youtube_id (str): ID do vídeo do YouTube
+        
+    Returns:
+        dict: Música encontrada ou None
+    """
+    if _use_sqlite():
+        return sqlite_backend.get_song_by_youtube_id(youtube_id)
+    
+    return _copy(_get_indexes()[1].get(youtube_id))
 
 def delete_song(song_id):
     """
@@ -95,10 +280,15 @@ def delete_song(song_id):
     Returns:
         bool: True se removido com sucesso
     """
-    songs = _load_songs()
-    filtered = [s for s in songs if s['id'] != song_id]
+    if _use_sqlite():
+        return sqlite_backend.delete_song(song_id)
     
-    if len(filtered) < len(songs):
-        _save_songs(filtered)
+    with _lock:
+        song = _get_indexes()[0].get(song_id)
+        if song is None:
+            return False
+        
+        songs = _load_songs()
+        filtered = [s for s in songs if s['id'] != song_id]
+        _save_songs(filtered, removed=[song])
         return True
-    return False
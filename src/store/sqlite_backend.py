@@ -0,0 +1,234 @@
+"""
+Backend SQLite para músicas e pontuações
+Ativado com JINGLETUBE_STORE_BACKEND=sqlite; songs_store e scores_store
+continuam sendo a interface pública e delegam para este módulo.
+"""
+import os
+import sqlite3
+import threading
+
+DB_FILE = os.getenv("JINGLETUBE_SQLITE_PATH", "data/jingletube.db")
+
+SONG_COLUMNS = ("id", "youtubeId", "titulo", "criadoEm")
+SCORE_COLUMNS = ("id", "songId", "playerName", "score", "accuracy", "criadoEm")
+
+# seq preserva a ordem de inserção, que é a ordem do arquivo JSON equivalente.
+# score/accuracy usam afinidade NUMERIC para que inteiros continuem inteiros.
+# O índice de youtubeId não é único: um songs.json com vídeos repetidos é
+# migrado inteiro, como o JSON os mantém; o app evita novas repetições.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS songs (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT NOT NULL UNIQUE,
+    youtubeId TEXT NOT NULL,
+    titulo TEXT,
+    criadoEm TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_songs_youtube_id ON songs (youtubeId);
+
+CREATE TABLE IF NOT EXISTS scores (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT NOT NULL UNIQUE,
+    songId TEXT NOT NULL,
+    playerName TEXT,
+    score NUMERIC,
+    accuracy NUMERIC,
+    criadoEm TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_scores_song_id ON scores (songId);
+CREATE INDEX IF NOT EXISTS idx_scores_song_score ON scores (songId, score DESC);
+CREATE INDEX IF NOT EXISTS idx_scores_score ON scores (score DESC);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# Uma conexão por thread e por arquivo (conexões sqlite3 não são compartilháveis)
+_local = threading.local()
+
+
+def _connect():
+    """Retorna a conexão desta thread, criando banco e schema se necessário"""
+    connections = getattr(_local, "connections", None)
+    if connections is None:
+        connections = _local.connections = {}
+
+    conn = connections.get(DB_FILE)
+    if conn is None:
+        directory = os.path.dirname(DB_FILE)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(DB_FILE, timeout=30)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        _drop_unique_youtube_index(conn)
+        conn.executescript(SCHEMA)
+        connections[DB_FILE] = conn
+    return conn
+
+
+def _drop_unique_youtube_index(conn):
+    """Remove o índice único de youtubeId de bancos antigos (o SCHEMA o recria sem UNIQUE)"""
+    row = conn.execute(
+        "SELECT sql FROM sqlite_master WHERE type = 'index' AND name = 'idx_songs_youtube_id'"
+    ).fetchone()
+    if row and row[0].upper().startswith("CREATE UNIQUE"):
+        with conn:
+            conn.execute("DROP INDEX idx_songs_youtube_id")
+
+
+def close():
+    """Fecha a conexão desta thread com o banco atual"""
+    connections = getattr(_local, "connections", {})
+    conn = connections.pop(DB_FILE, None)
+    if conn is not None:
+        conn.close()
+
+
+def _song(row):
+    return {column: row[column] for column in SONG_COLUMNS}
+
+
+def _score(row):
+    return {column: row[column] for column in SCORE_COLUMNS}
+
+
+def _insert(table, columns, records):
+    """
+    Insere registros ignorando IDs já existentes
+
+    Args:
+        table (str): Nome da tabela
+        columns (tuple): Colunas a preencher
+        records (iterable): Dicionários com as colunas
+
+    Returns:
+        int: Número de linhas inseridas
+    """
+    conn = _connect()
+    placeholders = ", ".join("?" for _ in columns)
+    sql = f"INSERT OR IGNORE INTO {table} ({', '.join(columns)}) VALUES ({placeholders})"
+    with conn:
+        before = conn.total_changes
+        conn.executemany(sql, (tuple(r.get(c) for c in columns) for r in records))
+        return conn.total_changes - before
+
+
+# Músicas
+
+def load_songs():
+    """Retorna todas as músicas na ordem de inserção"""
+    rows = _connect().execute("SELECT * FROM songs ORDER BY seq")
+    return [_song(row) for row in rows]
+
+
+def count_songs():
+    """Retorna a quantidade de músicas"""
+    return _connect().execute("SELECT COUNT(*) FROM songs").fetchone()[0]
+
+
+def get_song(song_id):
+    """Busca uma música pelo ID (índice único em id)"""
+    row = _connect().execute("SELECT * FROM songs WHERE id = ?", (song_id,)).fetchone()
+    return _song(row) if row else None
+
+
+def get_song_by_youtube_id(youtube_id):
+    """Busca uma música pelo youtubeId; havendo repetidas, a primeira inserida prevalece"""
+    row = _connect().execute(
+        "SELECT * FROM songs WHERE youtubeId = ? ORDER BY seq LIMIT 1", (youtube_id,)
+    ).fetchone()
+    return _song(row) if row else None
+
+
+def insert_songs(songs, keep_duplicates=False):
+    """
+    Insere músicas ignorando IDs já existentes
+
+    Cada linha só entra se o youtubeId ainda não estiver no banco; a
+    checagem e a inserção são um único comando, então dois processos não
+    cadastram o mesmo vídeo.
+
+    Args:
+        songs (iterable): Dicionários com as colunas de SONG_COLUMNS
+        keep_duplicates (bool): Insere mesmo com youtubeId já cadastrado
+            (migração de um songs.json que tenha vídeos repetidos)
+
+    Returns:
+        int: Número de linhas inseridas
+    """
+    if keep_duplicates:
+        return _insert("songs", SONG_COLUMNS, songs)
+
+    conn = _connect()
+    placeholders = ", ".join("?" for _ in SONG_COLUMNS)
+    sql = (
+        f"INSERT OR IGNORE INTO songs ({', '.join(SONG_COLUMNS)}) SELECT {placeholders} "
+        "WHERE NOT EXISTS (SELECT 1 FROM songs WHERE youtubeId = ?)"
+    )
+    with conn:
+        before = conn.total_changes
+        conn.executemany(sql, (tuple(s.get(c) for c in SONG_COLUMNS) + (s.get("youtubeId"),) for s in songs))
+        return conn.total_changes - before
+
+
+def delete_song(song_id):
+    """Remove uma música, retornando True se existia"""
+    conn = _connect()
+    with conn:
+        return conn.execute("DELETE FROM songs WHERE id = ?", (song_id,)).rowcount > 0
+
+
+# Pontuações
+
+def load_scores(song_id=None):
+    """Retorna as pontuações (de uma música, se informada) na ordem de inserção"""
+    conn = _connect()
+    if song_id is None:
+        rows = conn.execute("SELECT * FROM scores ORDER BY seq")
+    else:
+        rows = conn.execute("SELECT * FROM scores WHERE songId = ? ORDER BY seq", (song_id,))
+    return [_score(row) for row in rows]
+
+
+def top_scores(song_id=None, limit=10):
+    """Retorna as melhores pontuações; empates seguem a ordem de inserção"""
+    conn = _connect()
+    if song_id:
+        rows = conn.execute(
+            "SELECT * FROM scores WHERE songId = ? ORDER BY score DESC, seq LIMIT ?",
+            (song_id, limit)
+        )
+    else:
+        rows = conn.execute("SELECT * FROM scores ORDER BY score DESC, seq LIMIT ?", (limit,))
+    return [_score(row) for row in rows]
+
+
+def insert_scores(scores):
+    """Insere pontuações"""
+    return _insert("scores", SCORE_COLUMNS, scores)
+
+
+def delete_score(score_id):
+    """Remove uma pontuação, retornando True se existia"""
+    conn = _connect()
+    with conn:
+        return conn.execute("DELETE FROM scores WHERE id = ?", (score_id,)).rowcount > 0
+
+
+# Metadados
+
+def get_meta(key):
+    """Lê um valor da tabela meta"""
+    row = _connect().execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+    return row[0] if row else None
+
+
+def set_meta(key, value):
+    """Grava um valor na tabela meta"""
+    conn = _connect()
+    with conn:
+        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
@@ -0,0 +1,294 @@
+"""
+Transações sobre os arquivos JSON do app (unit of work)
+Uma transação carrega cada arquivo uma vez, acumula as alterações e grava
+cada arquivo alterado uma única vez, com arquivo temporário e rename atômico.
+Requisições concorrentes que chegam em poucos milissegundos podem ser
+gravadas juntas (group commit).
+
+Para que uma queda no meio não deixe só parte dos arquivos trocados, os
+temporários são gravados primeiro, depois um registro da transação lista as
+trocas pendentes; recover() termina as trocas na próxima inicialização.
+"""
+import json
+import logging
+import os
+import threading
+import time
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+# Registro das trocas de arquivos em andamento
+JOURNAL_FILE = "data/.transaction.json"
+
+# Janela de espera do group commit (ms) e tamanho máximo de um lote
+GROUP_COMMIT_MS = float(os.getenv("JINGLETUBE_GROUP_COMMIT_MS", "2"))
+GROUP_COMMIT_MAX = 64
+
+_counter_lock = threading.Lock()
+_counter = 0
+
+
+def temp_path(path):
+    """Nome único (processo e contador) para o temporário de um arquivo, no mesmo diretório"""
+    global _counter
+    with _counter_lock:
+        _counter += 1
+        return f"{path}.tmp-{os.getpid()}-{_counter}"
+
+
+@metrics.instrument("io")
+def _write_file(path, data):
+    """Grava o JSON no temporário e força para o disco"""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+@metrics.instrument("io")
+def _read_json(path):
+    """Lê um arquivo JSON do app (dicionário vazio se ausente ou inválido)"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+            metrics.record_read(path, f)
+            return data
+    except (OSError, ValueError):
+        return {}
+
+
+def recover(journal_file=None):
+    """
+    Conclui as trocas de arquivos de uma transação interrompida
+
+    Se o registro existe, todos os temporários já foram gravados: basta
+    terminar os renames que faltaram.
+
+    Returns:
+        int: Quantidade de arquivos trocados
+    """
+    journal_file = journal_file or JOURNAL_FILE
+    try:
+        with open(journal_file, 'r', encoding='utf-8') as f:
+            pending = json.load(f)
+    except FileNotFoundError:
+        return 0
+    except ValueError:
+        # Registro incompleto: a transação não chegou a ser confirmada
+        os.remove(journal_file)
+        return 0
+
+    replaced = 0
+    for tmp_path, path in pending.get("files", []):
+        if os.path.exists(tmp_path):
+            os.replace(tmp_path, path)
+            replaced += 1
+    os.remove(journal_file)
+    return replaced
+
+
+class Transaction:
+    """
+    Unidade de trabalho sobre arquivos JSON
+
+    load() devolve o documento (lido uma vez por transação) e save() o marca
+    para gravação. commit() grava cada arquivo marcado uma única vez e
+    depois roda os callbacks registrados com after_commit().
+    """
+
+    def __init__(self, journal_file=None):
+        self.journal_file = journal_file or JOURNAL_FILE
+        self._docs = {}
+        self._dirty = {}
+        self._after_commit = []
+
+    def load(self, path):
+        """
+        Retorna o documento de um arquivo
+
+        Args:
+            path (str): Caminho do arquivo
+
+        Returns:
+            object: Documento (alterações feitas nele valem para a transação)
+        """
+        path = str(path)
+        if path not in self._docs:
+            self._docs[path] = _read_json(path)
+        return self._docs[path]
+
+    def save(self, path, data):
+        """
+        Marca um documento para ser gravado no commit
+
+        Args:
+            path (str): Caminho do arquivo
+            data (object): Conteúdo completo
+        """
+        path = str(path)
+        self._docs[path] = data
+        self._dirty[path] = data
+
+    def after_commit(self, callback):
+        """
+        Registra uma função chamada depois que os arquivos forem gravados
+
+        Exceções do callback são registradas no log e não chegam a quem fez
+        o commit, cujos dados já estão em disco.
+        """
+        self._after_commit.append(callback)
+
+    def commit(self):
+        """
+        Grava os arquivos alterados
+
+        Returns:
+            int: Quantidade de arquivos gravados
+        """
+        if self._dirty:
+            pending = []
+            try:
+                for path, data in self._dirty.items():
+                    tmp_path = temp_path(path)
+                    pending.append((tmp_path, path))
+                    _write_file(tmp_path, data)
+                    metrics.record_write(path, tmp_path)
+            except BaseException:
+                for tmp_path, _ in pending:
+                    if os.path.exists(tmp_path):
+                        os.remove(tmp_path)
+                raise
+
+            if len(pending) == 1:
+                os.replace(*pending[0])
+            else:
+                os.makedirs(os.path.dirname(self.journal_file) or ".", exist_ok=True)
+                _write_file(self.journal_file, {"files": pending})
+                for tmp_path, path in pending:
+                    os.replace(tmp_path, path)
+                os.remove(self.journal_file)
+
+        written = len(self._dirty)
+        self._dirty = {}
+        callbacks, self._after_commit = self._after_commit, []
+        for callback in callbacks:
+            # Os arquivos já foram trocados: uma falha aqui não desfaz a
+            # transação nem impede os demais callbacks
+            try:
+                callback()
+            except Exception:
+                logger.exception("Falha num callback após o commit")
+        return written
+
+
+class _Request:
+    """Uma função aguardando o group commit"""
+
+    def __init__(self, fn):
+        self.fn = fn
+        self.result = None
+        self.error = None
+        self.done = threading.Event()
+
+
+class GroupCommit:
+    """
+    Executa funções transacionais juntando as que chegam ao mesmo tempo
+
+    A primeira thread a chegar vira líder: espera a janela, pega todas as
+    requisições da fila, aplica cada uma sobre uma única Transaction e grava
+    os arquivos uma vez. As demais só aguardam o resultado.
+
+    As funções recebem a Transaction e só devem alterar arquivos por ela:
+    se uma falhar, o lote é refeito sem ela a partir dos arquivos em disco.
+    Efeitos fora dos arquivos devem ir para tx.after_commit().
+    """
+
+    def __init__(self, lock=None, window_ms=GROUP_COMMIT_MS, max_batch=GROUP_COMMIT_MAX, journal_file=None):
+        """
+        Args:
+            lock (threading.RLock): Lock mantido durante a aplicação e a
+                gravação (o mesmo dos outros escritores dos arquivos).
+                Quem chama run() não pode estar com ele adquirido.
+            window_ms (float): Espera do líder por outras requisições
+            max_batch (int): Requisições por lote
+            journal_file (str): Registro das trocas de arquivos
+        """
+        self._lock = lock or threading.RLock()
+        self.window = window_ms / 1000.0
+        self.max_batch = max_batch
+        self.journal_file = journal_file
+        self._queue_lock = threading.Lock()
+        self._queue = []
+        self._leader_active = False
+        self.batches = 0
+        self.requests = 0
+
+    def run(self, fn):
+        """
+        Executa fn(tx) dentro de um lote
+
+        Args:
+            fn (callable): Recebe a Transaction; o retorno é repassado
+
+        Returns:
+            object: Retorno de fn
+        """
+        request = _Request(fn)
+        with self._queue_lock:
+            self._queue.append(request)
+            lead = not self._leader_active
+            self._leader_active = True
+
+        if lead:
+            if self.window > 0:
+                time.sleep(self.window)
+            self._drain()
+
+        request.done.wait()
+        if request.error is not None:
+            raise request.error
+        return request.result
+
+    def _drain(self):
+        """Grava lotes enquanto houver requisições na fila"""
+        while True:
+            with self._queue_lock:
+                batch = self._queue[:self.max_batch]
+                del self._queue[:self.max_batch]
+                if not batch:
+                    self._leader_active = False
+                    return
+            self._commit(batch)
+
+    def _commit(self, batch):
+        """Aplica um lote numa única transação; refaz sem as funções que falharem"""
+        with self._lock:
+            while batch:
+                tx = Transaction(self.journal_file)
+                failed = None
+                for position, request in enumerate(batch):
+                    try:
+                        request.result = request.fn(tx)
+                    except Exception as error:
+                        request.error = error
+                        failed = position
+                        break
+
+                if failed is not None:
+                    batch[failed].done.set()
+                    batch = batch[:failed] + batch[failed + 1:]
+                    continue
+
+                try:
+                    tx.commit()
+                except Exception as error:
+                    for request in batch:
+                        request.error = error
+                self.batches += 1
+                self.requests += len(batch)
+                for request in batch:
+                    request.done.set()
+                return
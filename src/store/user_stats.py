@@ -0,0 +1,309 @@
+"""
+Estatísticas materializadas por usuário
+Gravações, curtidas recebidas, melhor pontuação por música e última
+atividade, atualizadas a cada evento para o perfil não varrer os arquivos
+
+Cada evento acrescenta as entradas alteradas em user_stats.jsonl; o snapshot
+user_stats.json só é reescrito na compactação, a cada COMPACT_THRESHOLD
+registros.
+
+Uso (reconstrução/conferência a partir dos arquivos do app):
+    PYTHONPATH=src python -m store.user_stats [--check]
+"""
+import argparse
+import json
+import os
+import threading
+from datetime import datetime
+
+from . import metrics, transactions
+from .file_cache import cache, load_dict
+
+STATS_FILE = "data/user_stats.json"
+STATS_JOURNAL_FILE = "data/user_stats.jsonl"
+USERS_FILE = "data/users.json"
+RECORDINGS_FILE = "data/recordings.json"
+
+# Registros no journal que disparam a reescrita do snapshot (0 desativa)
+COMPACT_THRESHOLD = int(os.getenv("JINGLETUBE_STATS_COMPACT_THRESHOLD", "1000"))
+
+# Serializa as atualizações entre threads do Gradio
+_lock = threading.RLock()
+
+# Registros no journal ainda não incorporados ao snapshot
+_journal_count = 0
+
+def _empty():
+    """Estatísticas de um usuário sem atividade"""
+    return {
+        "registered": False,
+        "member_since": None,
+        "favorites": 0,
+        "recordings": 0,
+        "likes": 0,
+        "best_scores": {},
+        "last_activity": None
+    }
+
+def _epoch(timestamp):
+    """
+    Converte timestamps do app (str(datetime) local) e do scores_store (ISO UTC com Z)
+
+    Returns:
+        float: Segundos desde a época, ou None se inválido
+    """
+    try:
+        return datetime.fromisoformat(timestamp).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+def _touch(entry, timestamp):
+    """Avança a última atividade se o timestamp for mais recente"""
+    moment = _epoch(timestamp)
+    if moment is not None and (entry["last_activity"] is None or moment > entry["last_activity"]):
+        entry["last_activity"] = moment
+
+def _paths():
+    """Arquivos de que as estatísticas carregadas dependem"""
+    return (STATS_FILE, STATS_JOURNAL_FILE)
+
+def _read_stats():
+    """Lê o snapshot e aplica o journal, sem passar pelo cache"""
+    global _journal_count
+    stats = load_dict(STATS_FILE)
+    count = 0
+    if os.path.exists(STATS_JOURNAL_FILE):
+        with open(STATS_JOURNAL_FILE, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Linha incompleta (queda durante a escrita): ignora
+                    continue
+                stats[record["user"]] = record["entry"]
+                count += 1
+    _journal_count = count
+    return stats
+
+@metrics.instrument("io")
+def _load_stats():
+    """
+    Carrega as estatísticas (objeto compartilhado do cache)
+
+    Só _update altera o dicionário no lugar, com o lock adquirido; os demais
+    não devem alterá-lo.
+    """
+    return cache.get(_paths(), _read_stats)
+
+@metrics.instrument("io")
+def _save_stats(stats):
+    """Grava o snapshot (troca atômica do arquivo) e descarta o journal incorporado"""
+    global _journal_count
+    os.makedirs(os.path.dirname(STATS_FILE) or ".", exist_ok=True)
+    tmp_path = transactions.temp_path(STATS_FILE)
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(stats, f, ensure_ascii=False)
+            metrics.record_write(STATS_FILE, f)
+        os.replace(tmp_path, STATS_FILE)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    if os.path.exists(STATS_JOURNAL_FILE):
+        os.remove(STATS_JOURNAL_FILE)
+    _journal_count = 0
+    cache.put(_paths(), stats)
+
+def _append_journal(changed):
+    """
+    Acrescenta as entradas alteradas ao journal (sem fsync: as estatísticas
+    podem ser reconstruídas a partir dos arquivos do app)
+
+    Args:
+        changed (dict): Entradas novas por usuário
+    """
+    global _journal_count
+    os.makedirs(os.path.dirname(STATS_JOURNAL_FILE) or ".", exist_ok=True)
+    with open(STATS_JOURNAL_FILE, 'a', encoding='utf-8') as f:
+        f.write("".join(json.dumps({"user": u, "entry": e}, ensure_ascii=False) + "\n"
+                        for u, e in changed.items()))
+    _journal_count += len(changed)
+
+def _update(usernames, apply):
+    """
+    Aplica uma alteração às estatísticas de alguns usuários com uma única escrita
+
+    O custo é proporcional aos usuários afetados: as entradas novas vão para o
+    journal e substituem as antigas no dicionário em cache.
+
+    Args:
+        usernames (iterable): Usuários afetados
+        apply (callable): Recebe (username, entry) e altera a entrada
+    """
+    with _lock:
+        stats = _load_stats()
+        changed = {}
+        for username in usernames:
+            entry = dict(stats.get(username) or _empty())
+            entry["best_scores"] = dict(entry["best_scores"])
+            apply(username, entry)
+            changed[username] = entry
+        if not changed:
+            return
+        _append_journal(changed)
+        stats.update(changed)
+        cache.put(_paths(), stats)
+        if COMPACT_THRESHOLD and _journal_count >= COMPACT_THRESHOLD:
+            _save_stats(stats)
+
+def record_user(username, created_at, favorites=0):
+    """
+    Registra um usuário cadastrado
+
+    Args:
+        username (str): Nome do usuário
+        created_at (str): Data do cadastro
+        favorites (int): Quantidade de músicas favoritas
+    """
+    def apply(_, entry):
+        entry.update(registered=True, member_since=created_at, favorites=favorites)
+    _update([username], apply)
+
+def record_recording(username, song_id, timestamp):
+    """
+    Registra uma nova gravação do usuário
+
+    Args:
+        username (str): Autor
+        song_id (str): Música cantada
+        timestamp (str): Data da gravação
+    """
+    def apply(_, entry):
+        entry["recordings"] += 1
+        _touch(entry, timestamp)
+    _update([username], apply)
+
+def record_likes(deltas):
+    """
+    Soma curtidas recebidas (um lote por escrita)
+
+    Args:
+        deltas (dict): Curtidas por usuário
+    """
+    def apply(username, entry):
+        entry["likes"] += deltas[username]
+    _update([u for u, delta in deltas.items() if delta], apply)
+
+def record_scores(entries):
+    """
+    Registra pontuações do scores_store (melhor por música e atividade)
+
+    Args:
+        entries (list): Pontuações (playerName, songId, score, criadoEm)
+    """
+    by_player = {}
+    for entry in entries:
+        by_player.setdefault(entry['playerName'], []).append(entry)
+
+    def apply(username, stats_entry):
+        best = stats_entry["best_scores"]
+        for score in by_player[username]:
+            if score['songId'] not in best or score['score'] > best[score['songId']]:
+                best[score['songId']] = score['score']
+            _touch(stats_entry, score.get('criadoEm'))
+    _update(by_player, apply)
+
+def get_user_stats(username):
+    """
+    Retorna as estatísticas de um usuário
+
+    Args:
+        username (str): Nome do usuário
+
+    Returns:
+        dict: Cópia das estatísticas, ou None se não houver nada registrado
+    """
+    entry = _load_stats().get(username)
+    if entry is None:
+        return None
+    entry = dict(entry)
+    entry["best_scores"] = dict(entry["best_scores"])
+    return entry
+
+def compute_stats(users, recordings, scores):
+    """
+    Calcula as estatísticas do zero
+
+    Args:
+        users (dict): users.json do app
+        recordings (dict): recordings.json do app
+        scores (list): Pontuações do scores_store
+
+    Returns:
+        dict: Estatísticas por usuário
+    """
+    stats = {}
+
+    def entry_for(username):
+        if username not in stats:
+            stats[username] = _empty()
+        return stats[username]
+
+    for username, user in users.items():
+        entry_for(username).update(registered=True, member_since=user.get("created_at"),
+                                   favorites=len(user.get("favorites", [])))
+    for recording in recordings.values():
+        entry = entry_for(recording["username"])
+        entry["recordings"] += 1
+        entry["likes"] += recording.get("likes", 0)
+        _touch(entry, recording.get("timestamp"))
+    for score in scores:
+        entry = entry_for(score['playerName'])
+        best = entry["best_scores"]
+        if score['songId'] not in best or score['score'] > best[score['songId']]:
+            best[score['songId']] = score['score']
+        _touch(entry, score.get('criadoEm'))
+    return stats
+
+def rebuild(users, recordings, scores):
+    """
+    Recalcula e grava as estatísticas de todos os usuários
+
+    Returns:
+        dict: Estatísticas gravadas
+    """
+    stats = compute_stats(users, recordings, scores)
+    with _lock:
+        _save_stats(stats)
+    return stats
+
+def check(users, recordings, scores):
+    """
+    Compara as estatísticas gravadas com um recálculo do zero
+
+    Returns:
+        list: Usuários cujas estatísticas divergem
+    """
+    expected = compute_stats(users, recordings, scores)
+    with _lock:
+        stored = dict(_load_stats())
+    return sorted(u for u in set(expected) | set(stored) if expected.get(u) != stored.get(u))
+
+
+if __name__ == "__main__":
+    from . import scores_store
+
+    parser = argparse.ArgumentParser(description="Reconstrói as estatísticas por usuário")
+    parser.add_argument("--check", action="store_true", help="Só compara, sem gravar")
+    args = parser.parse_args()
+
+    sources = (load_dict(USERS_FILE), load_dict(RECORDINGS_FILE), scores_store.get_all_scores())
+    if args.check:
+        diverging = check(*sources)
+        if diverging:
+            print(f"{len(diverging)} usuário(s) divergentes: {', '.join(diverging)}")
+            raise SystemExit(1)
+        print("Estatísticas consistentes.")
+    else:
+        print(f"Estatísticas de {len(rebuild(*sources))} usuário(s) gravadas em {STATS_FILE}.")
@@ -3,8 +3,41 @@ YouTube URL Parser
 Parseia URLs do YouTube para extrair IDs de vídeos
 """
 import re
+from functools import lru_cache
 from urllib.parse import urlparse, parse_qs
 
+# Quantidade de URLs distintas lembradas pelo cache de extract_video_id
+CACHE_SIZE = 4096
+
+# Um único padrão para todos os formatos: watch?v= (em qualquer posição da
+# query string), youtu.be/, embed/, v/, shorts/ e live/. Os hosts www., m. e
+# music.youtube.com são cobertos por buscar "youtube.com/" em qualquer ponto.
+_VIDEO_ID_RE = re.compile(
+    r'(?:youtube\.com/(?:watch\?(?:[^#\s]*?&)??v=|embed/|v/|shorts/|live/)|youtu\.be/)([\w-]+)'
+)
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _match_video_id(url):
+    """Aplica o padrão compilado a uma URL (resultado guardado no cache LRU)"""
+    match = _VIDEO_ID_RE.search(url)
+    if match:
+        return match.group(1)
+    return _query_video_id(url)
+
+def _query_video_id(url):
+    """Tenta extrair o v= da query string de qualquer página do youtube.com (ex.: /?v=ID)"""
+    try:
+        parsed = urlparse(url)
+    except ValueError:
+        return None
+    hostname = parsed.hostname or ''
+    if hostname != 'youtube.com' and not hostname.endswith('.youtube.com'):
+        return None
+    query_params = parse_qs(parsed.query)
+    if 'v' in query_params:
+        return query_params['v'][0]
+    return None
+
 def extract_video_id(url):
     """
     Extrai o ID do vídeo de uma URL do YouTube
@@ -18,30 +51,22 @@ def extract_video_id(url):
     if not url:
         return None
     
-    # Padrões de URL do YouTube
-    patterns = [
-        r'(?:youtube\.com\/watch\?v=)([\w-]+)',
-        r'(?:youtu\.be\/)([\w-]+)',
-        r'(?:youtube\.com\/embed\/)([\w-]+)',
-        r'(?:youtube\.com\/v\/)([\w-]+)'
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, url)
-        if match:
-            return match.group(1)
+    return _match_video_id(url)
+
+def extract_video_ids(urls):
+    """
+    Extrai os IDs de vários vídeos de uma vez (ex.: importação de playlist)
     
-    # Tenta extrair da query string
-    try:
-        parsed = urlparse(url)
-        if parsed.hostname in ['www.youtube.com', 'youtube.com']:
-            query_params = parse_qs(parsed.query)
-            if 'v' in query_params:
-                return query_params['v'][0]
-    except:
-        pass
+    URLs repetidas são resolvidas pelo cache sem rodar o padrão de novo.
     
-    return None
+    Args:
+        urls (iterable): URLs do YouTube
+        
+    Returns:
+        list: ID de cada URL, na mesma ordem (None para as inválidas)
+    """
+    match = _match_video_id
+    return [match(url) if url else None for url in urls]
 
 def is_valid_youtube_url(url):
     """
@@ -53,4 +78,4 @@ def is_valid_youtube_url(url):
     Returns:
         bool: True se for uma URL válida do YouTube
     """
-    return extract_video_id(url) is not None
\ No newline at end of file
+    return extract_video_id(url) is not None
@@ -0,0 +1,70 @@
+"""Tests for the async store layer."""
+
+import asyncio
+import os
+import tempfile
+import threading
+import time
+
+import pytest
+
+from store import aio, comments_store, transactions
+
+
+@pytest.fixture
+def data_dir(monkeypatch):
+    with tempfile.TemporaryDirectory() as temp_dir:
+        monkeypatch.setattr(comments_store, "COMMENTS_DIR", os.path.join(temp_dir, "comments"))
+        monkeypatch.setattr(transactions, "JOURNAL_FILE", os.path.join(temp_dir, ".transaction.json"))
+        yield temp_dir
+
+
+def test_run_uses_io_executor_off_the_loop():
+    """Test that blocking calls run on the I/O executor, not the event loop thread."""
+    async def main():
+        loop_thread = threading.current_thread().name
+        return loop_thread, await aio.run(lambda: threading.current_thread().name)
+
+    loop_thread, worker = asyncio.run(main())
+    assert worker != loop_thread
+    assert worker.startswith("jingletube-io")
+
+
+def test_writes_to_the_same_file_are_serialized(data_dir):
+    """Test that writes to one file never overlap while other files proceed."""
+    active = {"a": 0, "b": 0}
+    peaks = {"a": 0, "b": 0}
+
+    def write(name):
+        active[name] += 1
+        peaks[name] = max(peaks[name], active[name])
+        time.sleep(0.01)
+        active[name] -= 1
+
+    async def main():
+        await asyncio.gather(*(aio.write(os.path.join(data_dir, name), write, name)
+                               for name in ["a", "b"] * 5))
+
+    asyncio.run(main())
+    assert peaks == {"a": 1, "b": 1}
+
+
+def test_async_json_and_comments(data_dir):
+    """Test the async JSON helpers, comments and group commit round trip."""
+    path = os.path.join(data_dir, "doc.json")
+    writer = transactions.GroupCommit(window_ms=0, journal_file=os.path.join(data_dir, ".transaction.json"))
+
+    def increment(tx):
+        doc = tx.load(path)
+        doc["count"] = doc.get("count", 0) + 1
+        tx.save(path, doc)
+
+    async def main():
+        await aio.save_json(path, {"count": 0})
+        await asyncio.gather(*(aio.commit(writer, increment) for _ in range(10)))
+        await asyncio.gather(*(aio.add_comment("rec1", "ana", f"c{i}") for i in range(5)))
+        return await aio.load_json(path), await aio.get_comments("rec1")
+
+    doc, page = asyncio.run(main())
+    assert doc == {"count": 10}
+    assert sorted(c["comment"] for c in page["comments"]) == [f"c{i}" for i in range(5)]
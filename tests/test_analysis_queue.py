@@ -0,0 +1,120 @@
+"""Tests for the background recording analysis queue."""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from scoring import jobs
+from scoring.jobs import AnalysisQueue, QueueFullError
+
+
+def wait_for(queue, job_id, timeout=10.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = queue.status(job_id)
+        if job["state"] != "queued":
+            return job
+        time.sleep(0.01)
+    raise AssertionError("job did not finish")
+
+
+def test_submit_returns_immediately_and_completes():
+    """Test that a job id is returned at once and the result can be polled."""
+    queue = AnalysisQueue(max_workers=1, max_pending=4)
+    try:
+        done = threading.Event()
+        results = []
+        job_id = queue.submit(pow, 2, 10, on_done=lambda result: results.append(result) or done.set())
+
+        job = wait_for(queue, job_id)
+        assert job["state"] == "done"
+        assert job["result"] == 1024
+        assert job["queue_latency"] >= 0
+        assert done.wait(5) and results == [1024]
+
+        stats = queue.stats()
+        assert stats["completed"] == 1
+        assert stats["pending"] == 0
+        assert 0.0 <= stats["utilisation"] <= 1.0
+    finally:
+        queue.shutdown()
+
+
+def test_failed_job_reports_error():
+    """Test that exceptions in the worker mark the job as failed."""
+    queue = AnalysisQueue(max_workers=1, max_pending=4)
+    try:
+        job = wait_for(queue, queue.submit(int, "not a number"))
+        assert job["state"] == "failed"
+        assert "invalid literal" in job["error"]
+        assert queue.stats()["failed"] == 1
+    finally:
+        queue.shutdown()
+
+
+def test_overload_is_rejected():
+    """Test that submissions beyond the pending limit are rejected."""
+    queue = AnalysisQueue(max_workers=1, max_pending=2)
+    try:
+        first = queue.submit(time.sleep, 0.5)
+        queue.submit(time.sleep, 0.5)
+        with pytest.raises(QueueFullError):
+            queue.submit(time.sleep, 0.5)
+        assert queue.stats()["rejected"] == 1
+
+        wait_for(queue, first)
+        assert queue.status("unknown") is None
+    finally:
+        queue.shutdown()
+
+
+def test_on_done_runs_on_the_callback_executor():
+    """Test that on_done is handed off to callback_executor and the job is done after it."""
+    queue = AnalysisQueue(max_workers=1, max_pending=4)
+    callbacks = ThreadPoolExecutor(max_workers=1, thread_name_prefix="callbacks")
+    try:
+        threads = []
+        job = wait_for(queue, queue.submit(
+            pow, 2, 3, on_done=lambda result: threads.append(threading.current_thread().name),
+            callback_executor=callbacks
+        ))
+        assert job["state"] == "done"
+        assert threads and threads[0].startswith("callbacks")
+    finally:
+        callbacks.shutdown()
+        queue.shutdown()
+
+
+def test_evicted_jobs_call_on_evict(monkeypatch):
+    """Test that dropping finished jobs from the status list calls on_evict."""
+    monkeypatch.setattr(jobs, "KEEP_FINISHED", 1)
+    queue = AnalysisQueue(max_workers=1, max_pending=4)
+    try:
+        evicted = []
+        first = queue.submit(pow, 2, 1, on_evict=lambda: evicted.append("first"))
+        wait_for(queue, first)
+        second = queue.submit(pow, 2, 2, on_evict=lambda: evicted.append("second"))
+        wait_for(queue, second)
+        deadline = time.time() + 5
+        while not evicted and time.time() < deadline:
+            time.sleep(0.01)
+
+        assert evicted == ["first"]
+        assert queue.status(first) is None
+        assert queue.status(second)["result"] == 4
+    finally:
+        queue.shutdown()
+
+
+def test_workers_are_marked_and_the_server_is_not():
+    """Test that spawned workers see WORKER_ENV while the parent's environment is unchanged."""
+    queue = AnalysisQueue(max_workers=1, max_pending=4)
+    try:
+        job = wait_for(queue, queue.submit(os.getenv, jobs.WORKER_ENV))
+        assert job["result"] == "1"
+        assert os.getenv(jobs.WORKER_ENV) is None
+    finally:
+        queue.shutdown()
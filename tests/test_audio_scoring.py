@@ -0,0 +1,103 @@
+"""Tests for the vectorized audio scoring engine."""
+
+import os
+import shutil
+import tempfile
+import wave
+
+import numpy as np
+import pytest
+
+from scoring import engine
+
+
+SR = 16000
+
+
+def tone(freq, seconds=2.0, sr=SR, amplitude=0.5):
+    """Generate a sine tone with a second harmonic."""
+    t = np.arange(int(seconds * sr)) / sr
+    return amplitude * np.sin(2 * np.pi * freq * t) + 0.2 * amplitude * np.sin(4 * np.pi * freq * t)
+
+
+def test_pitch_contour_detects_frequency():
+    """Test pitch estimation across the singing range."""
+    for freq in [82.0, 196.0, 440.0, 880.0]:
+        f0, hop_seconds = engine.pitch_contour(tone(freq), SR)
+        voiced = f0[f0 > 0]
+        assert len(voiced) > 0.9 * len(f0)
+        assert abs(np.median(voiced) - freq) / freq < 0.01
+        assert abs(hop_seconds - engine.HOP_SECONDS) < 0.001
+
+
+def test_silence_is_unvoiced():
+    """Test that silence yields no pitch."""
+    f0, _ = engine.pitch_contour(np.zeros(SR), SR)
+    assert np.all(f0 == 0)
+
+
+def test_score_matching_performance():
+    """Test that singing the reference pitch scores near 100."""
+    reference = tone(220.0)
+    rng = np.random.default_rng(0)
+    result = engine.score_audio(reference + 0.02 * rng.standard_normal(len(reference)), SR, reference, SR)
+    assert result["score"] >= 95
+    assert result["accuracy"] >= 95.0
+
+
+def test_score_octave_is_not_penalized():
+    """Test that singing an octave below counts as in tune."""
+    result = engine.score_audio(tone(110.0), SR, tone(220.0), SR)
+    assert result["score"] >= 95
+
+
+def test_score_detuned_and_silent():
+    """Test that detuned or silent performances score lower."""
+    reference = tone(220.0)
+    detuned = engine.score_audio(tone(220.0 * 2 ** (3 / 12)), SR, reference, SR)
+    silent = engine.score_audio(np.zeros(len(reference)), SR, reference, SR)
+
+    assert detuned["score"] < 20
+    assert detuned["accuracy"] == 0.0
+    assert silent == {"score": 0, "accuracy": 0.0}
+
+
+def test_score_across_sample_rates():
+    """Test that recording and reference may use different sample rates."""
+    result = engine.score_audio(tone(330.0, sr=44100), 44100, tone(330.0, sr=SR), SR)
+    assert result["score"] >= 95
+
+
+def test_score_recording_from_wav_files():
+    """Test scoring WAV files from disk."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        paths = []
+        for name, signal in [("rec.wav", tone(262.0)), ("ref.wav", np.repeat(tone(262.0), 2))]:
+            path = os.path.join(temp_dir, name)
+            channels = 1 if name == "rec.wav" else 2
+            with wave.open(path, "wb") as wav:
+                wav.setnchannels(channels)
+                wav.setsampwidth(2)
+                wav.setframerate(SR)
+                wav.writeframes((signal * 32767).astype("<i2").tobytes())
+            paths.append(path)
+
+        samples, sr = engine.load_audio(paths[1])
+        assert sr == SR
+        assert len(samples) == 2 * SR
+
+        result = engine.score_recording(*paths)
+        assert result["score"] >= 95
+
+
+@pytest.mark.skipif(shutil.which("ffmpeg") is not None, reason="ffmpeg is installed")
+def test_compressed_audio_without_ffmpeg_is_reported():
+    """Test that decoding an mp3 without ffmpeg raises a clear ValueError."""
+    pytest.importorskip("pydub")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "instrumental.mp3")
+        with open(path, "wb") as f:
+            f.write(b"ID3" + bytes(64))
+
+        with pytest.raises(ValueError, match="ffmpeg"):
+            engine.load_audio(path)
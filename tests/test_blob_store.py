@@ -0,0 +1,71 @@
+"""Tests for the content-addressed audio blob store."""
+
+import hashlib
+import os
+import tempfile
+
+import pytest
+
+from store import blob_store
+
+
+@pytest.fixture
+def blobs(monkeypatch):
+    with tempfile.TemporaryDirectory() as temp_dir:
+        monkeypatch.setattr(blob_store, "BLOB_DIR", os.path.join(temp_dir, "blobs"))
+        monkeypatch.setattr(blob_store, "REFS_FILE", os.path.join(temp_dir, "blobs", "refs.json"))
+        yield temp_dir
+
+
+def write_file(directory, name, content):
+    path = os.path.join(directory, name)
+    with open(path, 'wb') as f:
+        f.write(content)
+    return path
+
+
+def test_identical_uploads_share_one_blob(blobs):
+    """Test that the same content is stored once and reference counted."""
+    content = os.urandom(3 * blob_store.HASH_CHUNK_SIZE + 17)
+    first = blob_store.put_file(write_file(blobs, "a.mp3", content))
+    second = blob_store.put_file(write_file(blobs, "b.mp3", content))
+
+    assert first["hash"] == hashlib.sha256(content).hexdigest()
+    assert first["path"] == second["path"]
+    assert second["method"] == "existing"
+    assert blob_store.get_ref_count(first["hash"]) == 2
+    with open(first["path"], 'rb') as f:
+        assert f.read() == content
+
+    usage = blob_store.disk_usage()
+    assert usage == {"blobs": 1, "bytes": len(content), "references": 2}
+
+
+def test_blob_is_a_copy_of_the_upload(blobs):
+    """Test that the blob survives the upload being rewritten and leaves no temporaries."""
+    source = write_file(blobs, "rec.wav", b"recording")
+    blob = blob_store.put_file(source)
+
+    assert blob["method"] in ("reflink", "copy_file_range", "copy")
+    assert not os.path.samefile(source, blob["path"])
+    write_file(blobs, "rec.wav", b"overwritten")
+    with open(blob["path"], 'rb') as f:
+        assert f.read() == b"recording"
+    assert os.listdir(os.path.dirname(blob["path"])) == [blob["hash"]]
+    assert sorted(os.listdir(blob_store.BLOB_DIR)) == [blob["hash"][:2], "refs.json"]
+
+
+def test_release_deletes_unreferenced_blob(blobs):
+    """Test that the blob and its features cache go away with the last reference."""
+    content = b"song"
+    blob = blob_store.put_file(write_file(blobs, "a.mp3", content))
+    blob_store.add_ref(blob["hash"])
+    os.makedirs(f"{blob['path']}.features")
+
+    assert blob_store.release(blob["hash"]) == 1
+    assert os.path.exists(blob["path"])
+
+    assert blob_store.release(blob["hash"]) == 0
+    assert not os.path.exists(blob["path"])
+    assert not os.path.exists(f"{blob['path']}.features")
+    assert blob_store.get_ref_count(blob["hash"]) == 0
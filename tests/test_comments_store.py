@@ -0,0 +1,63 @@
+"""Tests for the per-recording comment storage."""
+
+import os
+import tempfile
+
+import pytest
+
+from store import comments_store
+
+
+@pytest.fixture
+def comments_dir(monkeypatch):
+    with tempfile.TemporaryDirectory() as temp_dir:
+        monkeypatch.setattr(comments_store, "COMMENTS_DIR", os.path.join(temp_dir, "comments"))
+        yield temp_dir
+
+
+def test_comments_are_paged_in_order(comments_dir):
+    """Test that comments come back oldest first across cursor pages."""
+    for i in range(7):
+        comments_store.add_comment("rec_user/1", "alice", f"comment {i}")
+
+    texts = []
+    cursor = None
+    pages = 0
+    while True:
+        page = comments_store.get_comments("rec_user/1", cursor, 3)
+        texts.extend(c["comment"] for c in page["comments"])
+        pages += 1
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert texts == [f"comment {i}" for i in range(7)]
+    assert pages == 3
+    assert comments_store.count_comments("rec_user/1") == 7
+
+
+def test_cursor_is_stable_under_new_comments(comments_dir):
+    """Test that comments added after a page is read appear on later pages only."""
+    for i in range(3):
+        comments_store.add_comment("rec_1", "bob", f"c{i}")
+    first = comments_store.get_comments("rec_1", None, 2)
+    comments_store.add_comment("rec_1", "bob", "c3")
+
+    second = comments_store.get_comments("rec_1", first["next_cursor"], 2)
+    assert [c["comment"] for c in second["comments"]] == ["c2", "c3"]
+    assert second["next_cursor"] is None
+
+
+def test_missing_recording_and_torn_line(comments_dir):
+    """Test that an unknown recording is empty and a partial last line is skipped."""
+    assert comments_store.get_comments("nothing") == {"comments": [], "next_cursor": None}
+
+    comments_store.add_comment("rec_1", "carol", "ok")
+    with open(comments_store._comments_file("rec_1"), 'a') as f:
+        f.write('{"username": "carol", "comm')
+    page = comments_store.get_comments("rec_1")
+    assert [c["comment"] for c in page["comments"]] == ["ok"]
+    assert comments_store.count_comments("rec_1") == 1
+
+    with pytest.raises(ValueError):
+        comments_store.get_comments("rec_1", "bogus")
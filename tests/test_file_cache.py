@@ -0,0 +1,110 @@
+"""Tests for the shared read cache used by the store modules."""
+
+import json
+import os
+import tempfile
+import threading
+
+import pytest
+
+from store import scores_store, songs_store
+from store.file_cache import FileCache, cache
+
+
+@pytest.fixture
+def data_dir(monkeypatch):
+    """Point both store modules at a temporary directory."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        monkeypatch.setattr(songs_store, "SONGS_FILE", os.path.join(temp_dir, "songs.json"))
+        monkeypatch.setattr(scores_store, "SCORES_FILE", os.path.join(temp_dir, "scores.json"))
+        monkeypatch.setattr(scores_store, "SCORES_JOURNAL_FILE", os.path.join(temp_dir, "scores.jsonl"))
+        cache.invalidate()
+        yield temp_dir
+
+
+def test_repeated_reads_hit_cache(data_dir):
+    """Test that reads between writes are served from the cache."""
+    songs_store.add_song("vid1", "Song 1")
+    before = cache.stats()
+
+    for _ in range(5):
+        assert songs_store.get_song_by_id("missing") is None
+    assert len(songs_store.get_all_songs()) == 1
+
+    after = cache.stats()
+    assert after["hits"] - before["hits"] == 6
+    assert after["misses"] == before["misses"]
+
+
+def test_external_write_invalidates(data_dir):
+    """Test that a file rewritten by someone else is reloaded."""
+    songs_store.add_song("vid1", "Song 1")
+    assert len(songs_store.get_all_songs()) == 1
+
+    with open(songs_store.SONGS_FILE, "w", encoding="utf-8") as f:
+        json.dump([], f)
+    assert songs_store.get_all_songs() == []
+
+
+def test_callers_get_independent_lists(data_dir):
+    """Test that mutating a returned list does not leak into the cache."""
+    scores_store.add_score("song1", "Alice", 10)
+    scores = scores_store.get_all_scores()
+    scores.clear()
+    assert len(scores_store.get_all_scores()) == 1
+
+
+def test_callers_get_independent_records(data_dir):
+    """Test that mutating a returned song or score does not leak into later reads."""
+    song = songs_store.add_song("vid1", "Song 1")
+    song["titulo"] = "changed"
+    songs_store.get_song_by_id(song["id"])["titulo"] = "changed"
+    songs_store.get_song_by_youtube_id("vid1")["titulo"] = "changed"
+    songs_store.get_all_songs()[0]["titulo"] = "changed"
+    assert songs_store.get_song_by_youtube_id("vid1")["titulo"] == "Song 1"
+
+    scores_store.add_score("song1", "Alice", 10)["score"] = 0
+    scores_store.get_top_scores("song1")[0]["score"] = 0
+    scores_store.get_scores_by_song("song1")[0]["score"] = 0
+    assert scores_store.get_all_scores()[0]["score"] == 10
+
+
+def test_journal_writes_update_cache(data_dir, monkeypatch):
+    """Test that journal appends keep the cached scores current."""
+    monkeypatch.setattr(scores_store, "JOURNAL_ENABLED", True)
+    monkeypatch.setattr(scores_store, "JOURNAL_FSYNC", "never")
+    entry = scores_store.add_score("song1", "Alice", 10)
+    scores_store.add_score("song1", "Bob", 20)
+    scores_store.delete_score(entry["id"])
+
+    misses = cache.stats()["misses"]
+    assert [s["playerName"] for s in scores_store.get_all_scores()] == ["Bob"]
+    assert cache.stats()["misses"] == misses
+
+
+def test_concurrent_readers():
+    """Test that concurrent misses and hits keep consistent counters."""
+    file_cache = FileCache()
+    with tempfile.NamedTemporaryFile(mode="w", delete=False, suffix=".json") as f:
+        json.dump([1, 2, 3], f)
+        temp_file = f.name
+
+    def load():
+        with open(temp_file, encoding="utf-8") as fh:
+            return json.load(fh)
+
+    def reader():
+        for _ in range(100):
+            assert file_cache.get((temp_file,), load) == [1, 2, 3]
+
+    try:
+        threads = [threading.Thread(target=reader) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        stats = file_cache.stats()
+        assert stats["hits"] + stats["misses"] == 800
+        assert stats["entries"] == 1
+    finally:
+        os.unlink(temp_file)
@@ -0,0 +1,79 @@
+"""Tests for the incremental top-K leaderboard index."""
+
+import os
+import random
+import tempfile
+
+import pytest
+
+from store import scores_store
+from store.leaderboard import TopKIndex
+
+
+@pytest.fixture
+def store(monkeypatch):
+    """Point scores_store at a temporary directory."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        monkeypatch.setattr(scores_store, "SCORES_FILE", os.path.join(temp_dir, "scores.json"))
+        monkeypatch.setattr(scores_store, "SCORES_JOURNAL_FILE", os.path.join(temp_dir, "scores.jsonl"))
+        monkeypatch.setattr(scores_store, "LEADERBOARD_K", 3)
+        yield scores_store
+
+
+def _full_sort(scores, song_id=None, limit=3):
+    if song_id:
+        scores = [s for s in scores if s["songId"] == song_id]
+    return sorted(scores, key=lambda x: x["score"], reverse=True)[:limit]
+
+
+def test_top_scores_ordering(store):
+    """Test that the index returns the best scores, ties in insertion order."""
+    store.get_top_scores("song1", limit=3)
+    for name, score in [("Alice", 9000), ("Bob", 9500), ("Carol", 9000), ("Dave", 7000)]:
+        store.add_score("song1", name, score)
+
+    top = store.get_top_scores("song1", limit=3)
+    assert [s["playerName"] for s in top] == ["Bob", "Alice", "Carol"]
+
+
+def test_delete_refills_top(store):
+    """Test that deleting a top entry promotes the next best score."""
+    entries = [store.add_score("song1", f"P{i}", i * 100) for i in range(5)]
+    assert [s["score"] for s in store.get_top_scores("song1", limit=3)] == [400, 300, 200]
+
+    store.delete_score(entries[4]["id"])
+    assert [s["score"] for s in store.get_top_scores("song1", limit=3)] == [300, 200, 100]
+    assert [s["score"] for s in store.get_top_scores(limit=3)] == [300, 200, 100]
+
+
+def test_limit_above_k_falls_back(store):
+    """Test that limits larger than K are served by a full sort."""
+    for i in range(5):
+        store.add_score("song1", f"P{i}", i)
+    assert len(store.get_top_scores("song1", limit=10)) == 5
+
+
+def test_index_survives_restart(store):
+    """Test that a fresh index is rebuilt from disk."""
+    store.add_score("song1", "Alice", 10)
+    store.add_score("song2", "Bob", 20)
+    index = store.rebuild_leaderboard()
+    assert [s["playerName"] for s in index.top(None, 3)] == ["Bob", "Alice"]
+
+
+def test_matches_full_sort_under_random_workload():
+    """Test the index against a full sort after random adds and deletes."""
+    rng = random.Random(42)
+    scores = []
+    index = TopKIndex(5)
+    for i in range(500):
+        if scores and rng.random() < 0.3:
+            removed = scores.pop(rng.randrange(len(scores)))
+            index.remove(removed, scores)
+        else:
+            entry = {"id": str(i), "songId": f"song{rng.randrange(4)}", "score": rng.randrange(50)}
+            scores.append(entry)
+            index.add(entry)
+
+        for song_id in [None, "song0", "song3"]:
+            assert index.top(song_id, 5) == _full_sort(scores, song_id, 5)
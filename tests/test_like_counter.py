@@ -0,0 +1,129 @@
+"""Tests for the batched like counter."""
+
+import threading
+import time
+
+from store.like_counter import LikeCounter
+from store.rankings import RecordingRankings
+
+
+class FakeFile:
+    def __init__(self):
+        self.likes = {}
+        self.writes = 0
+
+    def flush(self, deltas):
+        self.writes += 1
+        for recording_id, delta in deltas.items():
+            self.likes[recording_id] = self.likes.get(recording_id, 0) + delta
+
+
+def test_likes_are_batched_until_flush():
+    """Test that many likes become one write and reads merge pending deltas."""
+    stored = FakeFile()
+    counter = LikeCounter(stored.flush, interval=60, batch=1000)
+    try:
+        for _ in range(50):
+            counter.add("rec_1")
+        counter.add("rec_2", 3)
+
+        assert stored.writes == 0
+        assert counter.pending("rec_1") == 50
+        assert counter.pending() == {"rec_1": 50, "rec_2": 3}
+
+        assert counter.flush() == 2
+        assert stored.writes == 1
+        assert stored.likes == {"rec_1": 50, "rec_2": 3}
+        assert counter.pending("rec_1") == 0
+        assert counter.flush() == 0
+    finally:
+        counter.close()
+
+
+def test_batch_size_and_interval_trigger_flush():
+    """Test that the background thread flushes on a full batch and after the interval."""
+    stored = FakeFile()
+    counter = LikeCounter(stored.flush, interval=0.05, batch=5)
+    try:
+        for _ in range(5):
+            counter.add("rec_1")
+        deadline = time.time() + 5
+        while stored.likes.get("rec_1") != 5 and time.time() < deadline:
+            time.sleep(0.01)
+        assert stored.likes["rec_1"] == 5
+
+        counter.add("rec_2")
+        deadline = time.time() + 5
+        while "rec_2" not in stored.likes and time.time() < deadline:
+            time.sleep(0.01)
+        assert stored.likes["rec_2"] == 1
+    finally:
+        counter.close()
+
+
+def test_close_flushes_and_failed_flush_keeps_deltas():
+    """Test that close writes pending likes and a failing write loses nothing."""
+    stored = FakeFile()
+    fail = [True]
+
+    def flaky(deltas):
+        if fail[0]:
+            raise OSError("disk full")
+        stored.flush(deltas)
+
+    counter = LikeCounter(flaky, interval=60, batch=1000)
+    counter.add("rec_1", 2)
+    try:
+        counter.flush()
+    except OSError:
+        pass
+    assert counter.pending("rec_1") == 2
+
+    fail[0] = False
+    counter.close()
+    assert stored.likes == {"rec_1": 2}
+
+
+def test_background_flush_failures_are_logged(caplog):
+    """Test that a failing flush in the background thread is logged, not swallowed."""
+    def failing(deltas):
+        raise OSError("disk full")
+
+    counter = LikeCounter(failing, interval=0.01, batch=1000)
+    counter.add("rec_1")
+    deadline = time.time() + 5
+    while "disk full" not in caplog.text and time.time() < deadline:
+        time.sleep(0.01)
+    counter._stopped = True
+    assert "disk full" in caplog.text
+    assert counter.pending("rec_1") == 1
+
+
+def test_concurrent_likes_are_not_lost():
+    """Test that likes from many threads all reach the file."""
+    stored = FakeFile()
+    counter = LikeCounter(stored.flush, interval=0.01, batch=7)
+
+    def click():
+        for _ in range(200):
+            counter.add("rec_1")
+
+    threads = [threading.Thread(target=click) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    counter.close()
+
+    assert stored.likes["rec_1"] == 1600
+
+
+def test_rankings_add_likes():
+    """Test that adding likes repositions the recording in the likes order."""
+    recordings = {f"r{i}": {"username": "u", "song_id": "s", "timestamp": "2024-01-01 00:00:00", "likes": i}
+                  for i in range(3)}
+    index = RecordingRankings.build(recordings, {})
+
+    assert index.add_likes("r0", 5) == 5
+    assert index.page("likes", limit=1)[0][4] == "r0"
+    assert index.add_likes("missing") is None
@@ -0,0 +1,86 @@
+"""Tests for the latency and I/O instrumentation."""
+
+import asyncio
+import os
+import tempfile
+
+import pytest
+
+from store import metrics
+
+
+@pytest.fixture
+def enabled(monkeypatch):
+    monkeypatch.setattr(metrics, "ENABLED", True)
+    metrics.registry.reset()
+    yield metrics.registry
+    metrics.registry.reset()
+
+
+def test_disabled_instrument_returns_the_function(monkeypatch):
+    """Test that disabled metrics leave functions untouched."""
+    monkeypatch.setattr(metrics, "ENABLED", False)
+
+    def fn():
+        return 1
+
+    assert metrics.instrument("io")(fn) is fn
+
+
+def test_instrument_counts_calls_errors_and_latency(enabled):
+    """Test call counts, errors and histograms for sync and async functions."""
+    @metrics.instrument("io", name="load")
+    def load(fail=False):
+        if fail:
+            raise ValueError("broken")
+        return "ok"
+
+    @metrics.instrument("handler")
+    async def handle(value):
+        return value * 2
+
+    assert load() == "ok"
+    with pytest.raises(ValueError):
+        load(fail=True)
+    assert asyncio.run(handle(21)) == 42
+    assert handle.__name__ == "handle"
+
+    calls, _ = enabled.snapshot()
+    by_name = {row[1]: row for row in calls}
+    assert by_name["load"][2:4] == [2, 1]
+    assert by_name[f"{__name__}.handle"][2:4] == [1, 0]
+
+    text = enabled.render()
+    assert 'jingletube_calls_total{kind="io",name="load"} 2' in text
+    assert 'jingletube_errors_total{kind="io",name="load"} 1' in text
+    assert 'jingletube_latency_seconds_bucket{kind="io",name="load",le="+Inf"} 2' in text
+    assert 'jingletube_latency_seconds_count{kind="io",name="load"} 2' in text
+
+
+def test_file_reads_and_writes(enabled):
+    """Test bytes read/written and file size per file."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "doc.json")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write('{"a": 1}')
+            metrics.record_write(path, f)
+        with open(path, "r", encoding="utf-8") as f:
+            f.read()
+            metrics.record_read(path, f)
+
+    _, files = enabled.snapshot()
+    assert files == [[path, 1, 8, 1, 8, 8]]
+    assert f'jingletube_file_size_bytes{{path="{path}"}} 8' in enabled.render()
+
+
+def test_histogram_buckets_are_cumulative(enabled):
+    """Test the Prometheus bucket counts and the label escaping."""
+    for seconds in (0.0005, 0.003, 0.003, 20.0):
+        enabled.observe("io", 'say "hi"', seconds)
+
+    text = enabled.render()
+    assert 'jingletube_latency_seconds_bucket{kind="io",name="say \\"hi\\"",le="0.001"} 1' in text
+    assert 'jingletube_latency_seconds_bucket{kind="io",name="say \\"hi\\"",le="0.005"} 3' in text
+    assert 'jingletube_latency_seconds_bucket{kind="io",name="say \\"hi\\"",le="10.0"} 3' in text
+    assert 'jingletube_latency_seconds_bucket{kind="io",name="say \\"hi\\"",le="+Inf"} 4' in text
+    assert enabled.latency[("io", 'say "hi"')].quantile(0.5) == 0.005
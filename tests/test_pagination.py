@@ -0,0 +1,77 @@
+"""Tests for cursor pagination of the song library and rankings."""
+
+import pytest
+
+from store.pagination import decode_cursor, encode_cursor, paginate
+from store.rankings import RecordingRankings
+from store.song_library import SongLibrary
+
+
+def walk(keys, limit):
+    pages = []
+    cursor = None
+    while True:
+        page = paginate(keys, cursor, limit)
+        pages.append(page["keys"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return pages
+
+
+def test_cursor_round_trip():
+    """Test that cursors are opaque strings that decode to the same key."""
+    cursor = encode_cursor("next", (-3, 7, "rec_1"))
+    assert isinstance(cursor, str)
+    assert decode_cursor(cursor) == ("next", (-3, 7, "rec_1"))
+
+    with pytest.raises(ValueError):
+        decode_cursor("not a cursor")
+
+
+def test_next_and_prev_cover_all_keys():
+    """Test that walking forward visits each key once and prev returns the previous page."""
+    keys = [(i, f"id{i}") for i in range(23)]
+    pages = walk(keys, 5)
+    assert [key for page in pages for key in page] == keys
+    assert len(pages) == 5
+
+    second = paginate(keys, paginate(keys, None, 5)["next_cursor"], 5)
+    assert second["start"] == 5
+    back = paginate(keys, second["prev_cursor"], 5)
+    assert back["keys"] == keys[:5]
+    assert back["prev_cursor"] is None
+
+
+def test_pages_are_stable_under_inserts():
+    """Test that rows inserted before the cursor do not shift the next page."""
+    library = SongLibrary.build({f"s{i}": {"title": f"T{i}", "artist": "A", "genre": "Pop"} for i in range(10)})
+    first = library.paginate("All", None, 4)
+    assert [row[3] for row in first["rows"]] == ["s0", "s1", "s2", "s3"]
+
+    library.add("new", {"title": "New", "artist": "B", "genre": "Pop"})
+    second = library.paginate("All", first["next_cursor"], 4)
+    assert [row[3] for row in second["rows"]] == ["s4", "s5", "s6", "s7"]
+    assert second["total"] == 11
+
+    recordings = {f"r{i}": {"username": "u", "song_id": "s0", "timestamp": f"2024-01-01 00:00:{i:02d}", "likes": 0}
+                  for i in range(10)}
+    rankings = RecordingRankings.build(recordings, {})
+    first = rankings.paginate("recent", None, 3)
+    assert [row[4] for row in first["rows"]] == ["r9", "r8", "r7"]
+
+    rankings.add("r10", {"username": "u", "song_id": "s0", "timestamp": "2024-01-01 00:00:10", "likes": 0}, "Unknown")
+    second = rankings.paginate("recent", first["next_cursor"], 3)
+    assert [row[4] for row in second["rows"]] == ["r6", "r5", "r4"]
+
+
+def test_genre_pages_and_counts():
+    """Test that genre filtering pages and counts only that genre."""
+    songs = {f"s{i}": {"title": f"T{i}", "artist": "A", "genre": "Rock" if i % 3 == 0 else "Pop"} for i in range(12)}
+    library = SongLibrary.build(songs)
+
+    assert library.count("Rock") == 4
+    assert library.count() == 12
+    page = library.paginate("Rock", None, 3)
+    assert [row[3] for row in page["rows"]] == ["s0", "s3", "s6"]
+    assert page["total"] == 4
+    assert library.paginate("Jazz")["rows"] == []
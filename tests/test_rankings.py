@@ -0,0 +1,101 @@
+"""Tests for the incremental recording rankings index."""
+
+import datetime
+import json
+import os
+import random
+import tempfile
+
+import pytest
+
+from store.rankings import RankingsCache, RecordingRankings
+
+
+def make_recordings(count, seed=0):
+    rng = random.Random(seed)
+    start = datetime.datetime(2024, 1, 1)
+    recordings = {}
+    for i in range(count):
+        timestamp = start + datetime.timedelta(minutes=rng.randint(0, 10000))
+        recordings[f"rec_{i}"] = {
+            "username": f"user{i % 7}",
+            "song_id": f"song_{i % 3}",
+            "timestamp": str(timestamp),
+            "likes": rng.randint(0, 5)
+        }
+    return recordings
+
+
+SONGS = {"song_0": {"title": "Zero"}, "song_1": {"title": "One"}}
+
+
+def naive(recordings, songs, sort_by):
+    rows = [
+        [r["username"], songs.get(r["song_id"], {}).get("title", "Unknown"), r["timestamp"], str(r["likes"]), rec_id]
+        for rec_id, r in recordings.items()
+    ]
+    if sort_by == "likes":
+        rows.sort(key=lambda row: int(row[3]), reverse=True)
+    else:
+        rows = [row for _, row in sorted(enumerate(rows), key=lambda item: (item[1][2], item[0]), reverse=True)]
+    return rows
+
+
+@pytest.mark.parametrize("sort_by", ["likes", "recent"])
+def test_build_matches_full_sort(sort_by):
+    """Test that the index orders rows like sorting every recording."""
+    recordings = make_recordings(200)
+    index = RecordingRankings.build(recordings, SONGS)
+
+    assert index.page(sort_by) == naive(recordings, SONGS, sort_by)
+    assert index.page(sort_by, limit=10, offset=5) == naive(recordings, SONGS, sort_by)[5:15]
+
+
+def test_incremental_updates_match_rebuild():
+    """Test that adds and likes keep the index equal to a fresh build."""
+    recordings = make_recordings(50)
+    index = RecordingRankings.build(recordings, SONGS)
+    rng = random.Random(1)
+
+    for i in range(50, 80):
+        timestamp = datetime.datetime(2025, 1, 1) + datetime.timedelta(minutes=i)
+        recording = {"username": "new", "song_id": "song_1", "timestamp": str(timestamp), "likes": 0}
+        recordings[f"rec_{i}"] = recording
+        index.add(f"rec_{i}", recording, "One")
+        liked = rng.choice(list(recordings))
+        recordings[liked]["likes"] += 1
+        index.set_likes(liked, recordings[liked]["likes"])
+
+    rebuilt = RecordingRankings.build(recordings, SONGS)
+    for sort_by in ("likes", "recent"):
+        assert index.page(sort_by) == rebuilt.page(sort_by)
+    assert index.page("recent", limit=1)[0][4] == "rec_79"
+
+
+def test_cache_follows_app_writes_and_external_changes():
+    """Test that committed writes are applied in place and other writes trigger a rebuild."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        recordings_path = os.path.join(temp_dir, "recordings.json")
+        songs_path = os.path.join(temp_dir, "songs.json")
+        recordings = make_recordings(5)
+        for path, data in ((recordings_path, recordings), (songs_path, SONGS)):
+            with open(path, 'w') as f:
+                json.dump(data, f)
+
+        cache = RankingsCache(recordings_path, songs_path)
+        assert cache.count() == 5
+
+        index = cache.begin()
+        assert index is not None
+        recordings["rec_0"]["likes"] = 100
+        with open(recordings_path, 'w') as f:
+            json.dump(recordings, f)
+        cache.commit(index, lambda i: i.set_likes("rec_0", 100))
+        assert cache.begin() is index
+        assert cache.page("likes", limit=1)[0][4] == "rec_0"
+
+        recordings["rec_1"]["likes"] = 200
+        with open(recordings_path, 'w') as f:
+            json.dump(recordings, f, indent=2)
+        assert cache.begin() is None
+        assert cache.page("likes", limit=1)[0][4] == "rec_1"
@@ -0,0 +1,111 @@
+"""Tests for the precomputed reference-track feature cache."""
+
+import os
+import tempfile
+import threading
+import wave
+
+import numpy as np
+import pytest
+
+from scoring import engine, features
+
+
+SR = 16000
+
+
+def write_wav(path, signal, sr=SR):
+    with wave.open(path, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sr)
+        wav.writeframes((np.clip(signal, -1, 1) * 32767).astype("<i2").tobytes())
+
+
+def beat_track(bpm=120.0, seconds=8.0, freq=330.0):
+    """Tone bursts on every beat."""
+    t = np.arange(int(seconds * SR)) / SR
+    envelope = np.exp(-((t % (60.0 / bpm)) * 12.0))
+    return 0.6 * envelope * np.sin(2 * np.pi * freq * t)
+
+
+@pytest.fixture
+def track():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "song.wav")
+        write_wav(path, beat_track())
+        yield path
+
+
+def test_compute_features(track):
+    """Test pitch, onsets and tempo of a synthetic beat track."""
+    result = features.compute_features(*engine.load_audio(track))
+
+    assert abs(result["tempo"] - 120.0) < 5.0
+    assert len(result["loudness"]) == len(result["pitch"])
+    assert 14 <= len(result["onsets"]) <= 17
+    assert np.all(np.abs(np.diff(result["onsets"]) - 0.5) < 0.05)
+    voiced = result["pitch"][result["pitch"] > 0]
+    assert abs(np.median(voiced) - 330.0) < 5.0
+
+
+def test_features_are_cached_and_memory_mapped(track):
+    """Test that features are written once and read back via memory-map."""
+    assert features.precompute_features(track) is True
+    assert features.precompute_features(track) is False
+
+    cached = features.get_reference_features(track)
+    assert isinstance(cached["pitch"], np.memmap)
+    assert sorted(os.listdir(features.features_dir(track))) == ["loudness.npy", "meta.json", "onsets.npy", "pitch.npy"]
+
+
+def test_concurrent_saves_of_one_track(track):
+    """Test that threads saving the same features never share a temp file."""
+    computed = features.compute_features(*engine.load_audio(track))
+    errors = []
+
+    def save():
+        try:
+            features.save_features(track, computed)
+        except Exception as error:
+            errors.append(error)
+
+    threads = [threading.Thread(target=save) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert sorted(os.listdir(features.features_dir(track))) == ["loudness.npy", "meta.json", "onsets.npy", "pitch.npy"]
+    assert np.array_equal(features.get_reference_features(track)["pitch"], computed["pitch"])
+
+
+def test_touching_track_keeps_cache(track):
+    """Test that a changed mtime with the same content does not recompute."""
+    features.precompute_features(track)
+    os.utime(track, ns=(0, 0))
+    assert features.load_features(track) is not None
+
+
+def test_replaced_track_invalidates_cache(track):
+    """Test that replacing the track content recomputes its features."""
+    features.precompute_features(track)
+    write_wav(track, beat_track(freq=440.0))
+
+    assert features.load_features(track) is None
+    pitch = features.get_reference_features(track)["pitch"]
+    assert abs(np.median(pitch[pitch > 0]) - 440.0) < 5.0
+
+
+def test_score_with_cached_reference(track):
+    """Test that scoring with cached features matches the offline engine."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        recording = os.path.join(temp_dir, "rec.wav")
+        write_wav(recording, beat_track() * 0.8)
+
+        expected = engine.score_recording(recording, track)
+        features.precompute_features(track)
+        result = features.score_recording(recording, track)
+        assert abs(result["score"] - expected["score"]) <= 1
+        assert abs(result["accuracy"] - expected["accuracy"]) <= 1.0
@@ -0,0 +1,90 @@
+"""Tests for the columnar score table used by the analytics queries."""
+
+import os
+import tempfile
+
+import numpy as np
+import pytest
+
+from store import scores_store
+from store.file_cache import cache
+from store.score_table import DAY_SECONDS, ScoreTable
+
+
+def _entry(song_id, player, score, day=1, accuracy=None):
+    return {"id": f"{song_id}-{player}-{score}-{day}", "songId": song_id, "playerName": player, "score": score,
+            "accuracy": accuracy, "criadoEm": f"2025-01-{day:02d}T12:00:00Z"}
+
+
+SCORES = [
+    _entry("s1", "alice", 90, 1, 95.0),
+    _entry("s1", "bob", 70, 1),
+    _entry("s1", "alice", 60, 2),
+    _entry("s1", "carol", 80, 2),
+    _entry("s2", "bob", 40, 3),
+]
+
+
+@pytest.fixture
+def store(monkeypatch):
+    """Point scores_store at a temporary directory."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        monkeypatch.setattr(scores_store, "SCORES_FILE", os.path.join(temp_dir, "scores.json"))
+        monkeypatch.setattr(scores_store, "SCORES_JOURNAL_FILE", os.path.join(temp_dir, "scores.jsonl"))
+        monkeypatch.setattr(scores_store, "STORE_BACKEND", "json")
+        monkeypatch.setattr(scores_store, "_listeners", [])
+        cache.invalidate()
+        yield scores_store
+        cache.invalidate()
+
+
+def test_percentiles_and_histogram_match_numpy():
+    """Test that per-song percentiles and histograms match a plain computation."""
+    table = ScoreTable.build(SCORES)
+    values = [s["score"] for s in SCORES if s["songId"] == "s1"]
+
+    assert len(table) == 5
+    assert table.percentiles("s1", (50, 90)) == pytest.approx({50: np.percentile(values, 50),
+                                                                90: np.percentile(values, 90)})
+    assert table.percentiles("unknown") == {}
+    histogram = table.histogram("s1", bins=4)
+    assert histogram["counts"] == [0, 0, 2, 2]
+    assert histogram["edges"] == [0, 25, 50, 75, 100]
+    assert sum(table.histogram()["counts"]) == 5
+
+
+def test_player_rank_uses_best_attempt():
+    """Test that a player's rank counts every attempt above their best."""
+    table = ScoreTable.build(SCORES)
+
+    assert table.player_rank("alice", "s1") == {"best": 90, "rank": 1, "total": 4, "percentile": 75.0}
+    assert table.player_rank("bob", "s1")["rank"] == 3
+    assert table.player_rank("bob")["best"] == 70
+    assert table.player_rank("carol", "s2") is None
+    assert table.player_rank("nobody") is None
+
+
+def test_distribution_over_time_buckets_by_day():
+    """Test that scores are summarized per day in chronological order."""
+    table = ScoreTable.build(SCORES + [{"songId": "s1", "playerName": "dan", "score": 10}])
+    days = table.distribution_over_time("s1", DAY_SECONDS)
+
+    assert [day["count"] for day in days] == [2, 2]
+    assert days[0]["mean"] == 80 and days[0]["median"] == 80
+    assert (days[1]["min"], days[1]["max"]) == (60, 80)
+    assert days[1]["start"] - days[0]["start"] == DAY_SECONDS
+    assert table.distribution_over_time("unknown") == []
+
+
+def test_store_table_follows_new_scores(store):
+    """Test that the cached table picks up add_score without rereading the file."""
+    store.add_score("s1", "alice", 50)
+    assert store.query_score_table(len) == 1
+
+    store.add_scores([{"song_id": "s1", "player_name": "bob", "score": 70},
+                      {"song_id": "s2", "player_name": "alice", "score": 30}])
+    assert store.query_score_table(lambda table: table.player_rank("alice", "s1")["rank"]) == 2
+    assert store.query_score_table(len) == 3
+
+    store.delete_score(store.get_all_scores()[0]["id"])
+    assert store.query_score_table(len) == 2
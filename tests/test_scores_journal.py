@@ -0,0 +1,135 @@
+"""Tests for the append-only score journal in scores_store."""
+
+import json
+import os
+import tempfile
+import threading
+
+import pytest
+
+from store import scores_store
+
+
+@pytest.fixture
+def journal_store(monkeypatch):
+    """Point scores_store at a temporary directory with journal mode on."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        monkeypatch.setattr(scores_store, "SCORES_FILE", os.path.join(temp_dir, "scores.json"))
+        monkeypatch.setattr(scores_store, "SCORES_JOURNAL_FILE", os.path.join(temp_dir, "scores.jsonl"))
+        monkeypatch.setattr(scores_store, "JOURNAL_ENABLED", True)
+        monkeypatch.setattr(scores_store, "JOURNAL_FSYNC", "never")
+        monkeypatch.setattr(scores_store, "JOURNAL_COMPACT_THRESHOLD", 0)
+        yield scores_store
+
+
+def test_add_score_appends_to_journal(journal_store):
+    """Test that add_score writes one line per score and leaves the snapshot alone."""
+    journal_store.add_score("song1", "Alice", 9000)
+    journal_store.add_score("song1", "Bob", 8500)
+
+    assert not os.path.exists(journal_store.SCORES_FILE)
+    with open(journal_store.SCORES_JOURNAL_FILE, encoding="utf-8") as f:
+        lines = f.readlines()
+    assert len(lines) == 2
+    assert json.loads(lines[0])["entry"]["playerName"] == "Alice"
+
+
+def test_reads_merge_journal(journal_store):
+    """Test that reads keep their return shapes in journal mode."""
+    journal_store.add_score("song1", "Alice", 9000)
+    journal_store.add_score("song1", "Bob", 9500)
+    journal_store.add_score("song2", "Charlie", 7000)
+
+    assert len(journal_store.get_all_scores()) == 3
+    assert [s["playerName"] for s in journal_store.get_scores_by_song("song1")] == ["Alice", "Bob"]
+    assert journal_store.get_top_scores("song1", limit=1)[0]["playerName"] == "Bob"
+
+
+def test_delete_score_in_journal(journal_store):
+    """Test that deletes are journaled and hidden from reads."""
+    entry = journal_store.add_score("song1", "Alice", 9000)
+    journal_store.add_score("song1", "Bob", 8500)
+
+    assert journal_store.delete_score(entry["id"]) is True
+    assert journal_store.delete_score(entry["id"]) is False
+    assert [s["playerName"] for s in journal_store.get_all_scores()] == ["Bob"]
+
+
+def test_compact_scores(journal_store):
+    """Test that compaction folds the journal into the snapshot."""
+    entry = journal_store.add_score("song1", "Alice", 9000)
+    journal_store.add_score("song1", "Bob", 8500)
+    journal_store.delete_score(entry["id"])
+
+    assert journal_store.compact_scores() == 1
+    assert not os.path.exists(journal_store.SCORES_JOURNAL_FILE)
+    with open(journal_store.SCORES_FILE, encoding="utf-8") as f:
+        assert [s["playerName"] for s in json.load(f)] == ["Bob"]
+
+
+def test_failed_compaction_keeps_snapshot_and_journal(journal_store, monkeypatch):
+    """Test that a crash while writing the snapshot loses no score."""
+    journal_store.add_score("song1", "Alice", 9000)
+    journal_store.compact_scores()
+    journal_store.add_score("song1", "Bob", 8500)
+
+    def crash(*args, **kwargs):
+        raise OSError("disk full")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(json, "dump", crash)
+        with pytest.raises(OSError):
+            journal_store.compact_scores()
+
+    assert sorted(os.listdir(os.path.dirname(journal_store.SCORES_FILE))) == ["scores.json", "scores.jsonl"]
+    journal_store.cache.invalidate()
+    assert sorted(s["playerName"] for s in journal_store.get_all_scores()) == ["Alice", "Bob"]
+
+
+def test_appends_update_the_cached_list_in_place(journal_store):
+    """Test that a journal append extends the cached scores instead of copying them."""
+    journal_store.add_score("song1", "Alice", 9000)
+    journal_store.get_all_scores()
+    cached = journal_store.cache.peek(journal_store._paths())
+    assert cached is not None
+    journal_store.add_score("song1", "Bob", 8500)
+
+    assert journal_store.cache.peek(journal_store._paths()) is cached
+    assert [s["playerName"] for s in cached] == ["Alice", "Bob"]
+
+
+def test_compaction_during_adds_loses_nothing(journal_store):
+    """Test that compact_scores holds the write lock against concurrent add_score calls."""
+    def add(player):
+        for i in range(50):
+            journal_store.add_score("song1", f"{player}{i}", i)
+
+    threads = [threading.Thread(target=add, args=(name,)) for name in "ABC"]
+    for thread in threads:
+        thread.start()
+    for _ in range(20):
+        journal_store.compact_scores()
+    for thread in threads:
+        thread.join()
+
+    journal_store.cache.invalidate()
+    assert len(journal_store.get_all_scores()) == 150
+
+
+def test_automatic_compaction(journal_store, monkeypatch):
+    """Test that the journal is compacted once the threshold is reached."""
+    monkeypatch.setattr(journal_store, "JOURNAL_COMPACT_THRESHOLD", 3)
+    for i in range(3):
+        journal_store.add_score("song1", f"Player{i}", i)
+
+    assert not os.path.exists(journal_store.SCORES_JOURNAL_FILE)
+    assert len(journal_store.get_all_scores()) == 3
+
+
+def test_torn_journal_line_is_ignored(journal_store):
+    """Test that a partially written last line does not break reads."""
+    journal_store.add_score("song1", "Alice", 9000)
+    with open(journal_store.SCORES_JOURNAL_FILE, "a", encoding="utf-8") as f:
+        f.write('{"op": "add", "entry": {"id": ')
+
+    assert len(journal_store.get_all_scores()) == 1
@@ -0,0 +1,79 @@
+"""Tests for the song search inverted index."""
+
+from store.search_index import SearchIndex, normalize, tokenize
+from store.song_library import SongLibrary
+
+
+SONGS = {
+    "s1": {"title": "Canção do Mar", "artist": "Dorival Caymmi", "genre": "Pop", "lyrics": "o mar quando quebra na praia"},
+    "s2": {"title": "Garota de Ipanema", "artist": "Tom Jobim", "genre": "Jazz", "lyrics": "olha que coisa mais linda"},
+    "s3": {"title": "Mar de Rosas", "artist": "Conceição", "genre": "Pop", "lyrics": "amor e canção"},
+    "s4": {"title": "Asa Branca", "artist": "Luiz Gonzaga", "genre": "Country", "lyrics": "quando olhei a terra ardendo"},
+}
+
+
+def test_normalize_and_tokenize():
+    """Test that tokens are lower-case and accent-free."""
+    assert normalize("Canção Ação") == "cancao acao"
+    assert tokenize("Olá, CORAÇÃO!") == ["ola", "coracao"]
+    assert tokenize(None) == []
+
+
+def test_accent_insensitive_and_field_weights():
+    """Test that accents are ignored and title matches outrank lyrics matches."""
+    index = SearchIndex.build(SONGS.items())
+
+    assert index.search("cancao") == ["s1", "s3"]
+    assert index.search("CANÇÃO") == ["s1", "s3"]
+    assert index.search("conceicao") == ["s3"]
+    assert index.search("mar") == ["s1", "s3"]
+
+
+def test_prefix_type_ahead_and_multiple_terms():
+    """Test that the last word matches as a prefix and all words are required."""
+    index = SearchIndex.build(SONGS.items())
+
+    assert index.search("ipa") == ["s2"]
+    assert index.search("qua") == ["s1", "s4"]
+    assert index.search("quando pr") == ["s1"]
+    assert index.search("garota lin") == ["s2"]
+    assert index.search("garota xyz") == []
+    assert index.search("naoexiste mar") == []
+    assert index.search("   ") == []
+
+
+def test_limit_keeps_the_best_combined_match():
+    """Test that the best total weight wins even when it is late in the rarest term's list."""
+    songs = {
+        "d1": {"title": "Zebra", "artist": "", "lyrics": "rock"},
+        "d2": {"title": "Rock", "artist": "Rock", "lyrics": "zebra rock"},
+        "d3": {"title": "Rock", "artist": "", "lyrics": ""},
+        "d4": {"title": "Rock", "artist": "", "lyrics": ""},
+    }
+    index = SearchIndex.build(songs.items())
+
+    assert index.search("zebra rock", limit=1) == ["d2"]
+    assert index.search("zebra rock") == ["d2", "d1"]
+
+
+def test_incremental_add_matches_build():
+    """Test that songs added one by one are found like a bulk build."""
+    index = SearchIndex()
+    for song_id, song in SONGS.items():
+        index.add(song_id, song)
+    built = SearchIndex.build(SONGS.items())
+
+    for query in ("mar", "qua", "cancao", "a", "tom jo"):
+        assert index.search(query) == built.search(query)
+    assert len(index) == 4
+
+
+def test_library_search_filters_by_genre():
+    """Test that the library search returns rows and honours the genre filter."""
+    library = SongLibrary.build(SONGS)
+    assert [row[3] for row in library.search("mar")] == ["s1", "s3"]
+    assert [row[3] for row in library.search("qua", "Country")] == ["s4"]
+
+    library.add("s5", {"title": "Marina", "artist": "Dorival Caymmi", "genre": "Pop", "lyrics": ""})
+    assert [row[3] for row in library.search("mari")] == ["s5"]
+    assert library.search("limit", limit=1) == []
@@ -0,0 +1,74 @@
+"""Tests for the streaming playlist import."""
+
+import json
+import os
+import tempfile
+
+from store import song_import, transactions
+
+
+LINES = [
+    "url,title,artist\n",
+    "# favourites\n",
+    "https://www.youtube.com/watch?v=dQw4w9WgXcQ,Never Gonna Give You Up,Rick Astley\n",
+    "https://youtu.be/9bZkp7q19f0 Gangnam Style\n",
+    "\n",
+    "https://m.youtube.com/watch?v=dQw4w9WgXcQ,Duplicate,Someone\n",
+    "https://www.youtube.com/shorts/kJQP7kiw5Fk\n",
+    "not a link\n",
+]
+
+
+def test_read_links_accepts_csv_and_plain_text():
+    """Test that CSV rows and "link title" lines are both understood."""
+    links = list(song_import.read_links(LINES))
+    assert links[1] == {"url": "https://www.youtube.com/watch?v=dQw4w9WgXcQ", "title": "Never Gonna Give You Up",
+                        "artist": "Rick Astley"}
+    assert links[2] == {"url": "https://youtu.be/9bZkp7q19f0", "title": "Gangnam Style", "artist": ""}
+    assert len(links) == 6
+
+
+def test_import_links_dedupes_and_batches():
+    """Test that known and repeated videos are skipped and batches stay bounded."""
+    batches = []
+    reports = []
+
+    def add_batch(batch):
+        batches.append(batch)
+        return len(batch)
+
+    stats = song_import.import_links(iter(LINES), add_batch, known_ids={"kJQP7kiw5Fk"}, batch_size=2,
+                                     progress=reports.append)
+
+    assert stats == {"read": 6, "imported": 2, "duplicates": 2, "invalid": 2}
+    assert [item["youtube_id"] for batch in batches for item in batch] == ["dQw4w9WgXcQ", "9bZkp7q19f0"]
+    assert all(len(batch) <= 2 for batch in batches)
+    assert len(reports) == 3 and reports[-1] == stats
+
+
+def test_import_file_writes_library_songs():
+    """Test that an imported file ends up in songs.json and a rerun adds nothing."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        songs_file = os.path.join(temp_dir, "songs.json")
+        playlist = os.path.join(temp_dir, "playlist.csv")
+        with open(playlist, "w", encoding="utf-8") as f:
+            f.writelines(LINES)
+
+        def add_batch(batch):
+            tx = transactions.Transaction(os.path.join(temp_dir, ".transaction.json"))
+            created = song_import.add_to_library(tx, songs_file, batch)
+            tx.commit()
+            return len(created)
+
+        fractions = []
+        stats = song_import.import_file(playlist, add_batch, progress=lambda s: fractions.append(s["fraction"]))
+        assert stats["imported"] == 3
+        assert fractions[-1] == 1.0
+
+        with open(songs_file) as f:
+            songs = json.load(f)
+        assert sorted(song["youtube_id"] for song in songs.values()) == ["9bZkp7q19f0", "dQw4w9WgXcQ", "kJQP7kiw5Fk"]
+        assert {song["title"] for song in songs.values()} >= {"Gangnam Style", "YouTube kJQP7kiw5Fk"}
+
+        known = song_import.library_youtube_ids(songs)
+        assert song_import.import_file(playlist, add_batch, known)["imported"] == 0
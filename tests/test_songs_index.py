@@ -0,0 +1,80 @@
+"""Tests for the id/youtubeId indexes in songs_store."""
+
+import json
+import os
+import tempfile
+
+import pytest
+
+from store import songs_store
+from store.file_cache import cache
+
+
+@pytest.fixture
+def store(monkeypatch):
+    """Point songs_store at a temporary JSON file."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        monkeypatch.setattr(songs_store, "SONGS_FILE", os.path.join(temp_dir, "songs.json"))
+        cache.invalidate()
+        yield songs_store
+
+
+def test_get_song_by_youtube_id(store):
+    """Test lookups by youtubeId after adds and deletes."""
+    song = store.add_song("vid1", "Song 1")
+    store.add_songs([{"youtube_id": "vid2"}, {"youtube_id": "vid3"}])
+
+    assert store.get_song_by_youtube_id("vid1") == song
+    assert store.get_song_by_youtube_id("vid3")["titulo"] == "Música 3"
+    assert store.get_song_by_youtube_id("missing") is None
+
+    store.delete_song(song["id"])
+    assert store.get_song_by_youtube_id("vid1") is None
+    assert store.get_song_by_id(song["id"]) is None
+
+
+def test_indexes_updated_incrementally(store):
+    """Test that own writes keep the indexes without rebuilding them."""
+    store.add_song("vid1")
+    by_id, by_youtube_id = store._get_indexes()
+
+    song = store.add_song("vid2")
+    assert store._get_indexes()[0] is by_id
+    assert by_youtube_id["vid2"] == song
+
+    store.delete_song(song["id"])
+    assert store._get_indexes()[1] is by_youtube_id
+    assert "vid2" not in by_youtube_id
+
+
+def test_delete_keeps_duplicate_youtube_ids_indexed(store):
+    """Test that deleting one of two songs with the same youtubeId keeps the other findable."""
+    with open(store.SONGS_FILE, "w", encoding="utf-8") as f:
+        json.dump([{"id": "a", "youtubeId": "dup", "titulo": "A", "criadoEm": ""},
+                   {"id": "b", "youtubeId": "dup", "titulo": "B", "criadoEm": ""}], f)
+    assert store.get_song_by_youtube_id("dup")["id"] == "a"
+
+    store.delete_song("b")
+    assert store.get_song_by_youtube_id("dup")["id"] == "a"
+    store.delete_song("a")
+    assert store.get_song_by_youtube_id("dup") is None
+
+    with open(store.SONGS_FILE, "w", encoding="utf-8") as f:
+        json.dump([{"id": "a", "youtubeId": "dup", "titulo": "A", "criadoEm": ""},
+                   {"id": "b", "youtubeId": "dup", "titulo": "B", "criadoEm": ""}], f)
+    assert store.get_song_by_youtube_id("dup")["id"] == "a"
+    store.delete_song("a")
+    assert store.get_song_by_youtube_id("dup")["id"] == "b"
+    assert store.add_song("dup")["id"] == "b"
+    assert len(store.get_all_songs()) == 1
+
+
+def test_indexes_follow_external_writes(store):
+    """Test that the indexes are rebuilt when the file changes on disk."""
+    store.add_song("vid1")
+    with open(store.SONGS_FILE, "w", encoding="utf-8") as f:
+        json.dump([{"id": "x", "youtubeId": "other", "titulo": "T", "criadoEm": ""}], f)
+
+    assert store.get_song_by_youtube_id("vid1") is None
+    assert store.get_song_by_id("x")["youtubeId"] == "other"
+    assert store.add_song("other")["id"] == "x"
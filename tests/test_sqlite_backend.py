@@ -0,0 +1,171 @@
+"""Tests for the store facade against the JSON and SQLite backends."""
+
+import json
+import os
+import sqlite3
+import tempfile
+
+import pytest
+
+from store import migrate, scores_store, songs_store, sqlite_backend
+from store.file_cache import cache
+
+
+@pytest.fixture(params=["json", "sqlite"])
+def backend(request, monkeypatch):
+    """Run the test against a temporary JSON or SQLite store."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        monkeypatch.setattr(songs_store, "SONGS_FILE", os.path.join(temp_dir, "songs.json"))
+        monkeypatch.setattr(scores_store, "SCORES_FILE", os.path.join(temp_dir, "scores.json"))
+        monkeypatch.setattr(scores_store, "SCORES_JOURNAL_FILE", os.path.join(temp_dir, "scores.jsonl"))
+        monkeypatch.setattr(sqlite_backend, "DB_FILE", os.path.join(temp_dir, "jingletube.db"))
+        monkeypatch.setattr(songs_store, "STORE_BACKEND", request.param)
+        monkeypatch.setattr(scores_store, "STORE_BACKEND", request.param)
+        cache.invalidate()
+        yield request.param
+        sqlite_backend.close()
+
+
+def test_songs_crud(backend):
+    """Test adding, deduplicating, finding and deleting songs."""
+    song = songs_store.add_song("vid1")
+    assert song["titulo"] == "Música 1"
+    assert songs_store.add_song("vid1", "Outro título")["id"] == song["id"]
+    songs_store.add_song("vid2", "Song 2")
+
+    assert [s["youtubeId"] for s in songs_store.get_all_songs()] == ["vid1", "vid2"]
+    assert songs_store.get_song_by_id(song["id"]) == song
+    assert songs_store.get_song_by_id("missing") is None
+
+    assert songs_store.delete_song(song["id"]) is True
+    assert songs_store.delete_song(song["id"]) is False
+    assert len(songs_store.get_all_songs()) == 1
+
+
+def test_scores_crud(backend):
+    """Test adding, filtering, ranking and deleting scores."""
+    alice = scores_store.add_score("song1", "Alice", 9000, 95.5)
+    scores_store.add_score("song1", "Bob", 9500)
+    scores_store.add_score("song2", "Carol", 7000)
+    scores_store.add_score("song1", "Dave", 9000)
+
+    assert len(scores_store.get_all_scores()) == 4
+    assert [s["playerName"] for s in scores_store.get_scores_by_song("song1")] == ["Alice", "Bob", "Dave"]
+    assert [s["playerName"] for s in scores_store.get_top_scores("song1", limit=3)] == ["Bob", "Alice", "Dave"]
+    assert scores_store.get_top_scores(limit=1)[0]["score"] == 9500
+    assert scores_store.get_all_scores()[0] == alice
+
+    assert scores_store.delete_score(alice["id"]) is True
+    assert scores_store.delete_score(alice["id"]) is False
+    assert len(scores_store.get_scores_by_song("song1")) == 2
+
+
+def test_sqlite_uses_wal_and_indexes(backend):
+    """Test that the SQLite database is in WAL mode with the lookup indexes."""
+    if backend != "sqlite":
+        pytest.skip("SQLite only")
+    songs_store.get_all_songs()
+
+    conn = sqlite3.connect(sqlite_backend.DB_FILE)
+    try:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        assert {"idx_songs_youtube_id", "idx_scores_song_id", "idx_scores_song_score"} <= indexes
+    finally:
+        conn.close()
+
+
+def test_migrate_json_to_sqlite(backend):
+    """Test the one-shot migration from the JSON files."""
+    if backend != "sqlite":
+        pytest.skip("SQLite only")
+    songs = [{"id": "s1", "youtubeId": "vid1", "titulo": "Song 1", "criadoEm": "2024-01-01T00:00:00Z"}]
+    scores = [{"id": "p1", "songId": "s1", "playerName": "Alice", "score": 10,
+               "accuracy": None, "criadoEm": "2024-01-01T00:00:00Z"}]
+    with open(songs_store.SONGS_FILE, "w", encoding="utf-8") as f:
+        json.dump(songs, f)
+    with open(scores_store.SCORES_FILE, "w", encoding="utf-8") as f:
+        json.dump(scores, f)
+
+    assert migrate.migrate_json_to_sqlite() == {"songs": 1, "scores": 1}
+    assert migrate.migrate_json_to_sqlite() is None
+    assert songs_store.get_all_songs() == songs
+    assert scores_store.get_all_scores() == scores
+
+
+def test_migrate_keeps_duplicate_youtube_ids(backend):
+    """Test that songs sharing a youtubeId are migrated like the JSON store keeps them."""
+    if backend != "sqlite":
+        pytest.skip("SQLite only")
+    songs = [{"id": f"s{i}", "youtubeId": "vid1", "titulo": f"Song {i}", "criadoEm": "2024-01-01T00:00:00Z"}
+             for i in range(2)]
+    with open(songs_store.SONGS_FILE, "w", encoding="utf-8") as f:
+        json.dump(songs, f)
+
+    assert migrate.migrate_json_to_sqlite()["songs"] == 2
+    assert songs_store.get_all_songs() == songs
+    assert songs_store.get_song_by_youtube_id("vid1")["id"] == "s0"
+    assert songs_store.add_song("vid1")["id"] == "s0"
+    assert len(songs_store.get_all_songs()) == 2
+
+
+def test_unique_youtube_index_is_dropped(backend):
+    """Test that databases created with a unique youtubeId index are upgraded."""
+    if backend != "sqlite":
+        pytest.skip("SQLite only")
+    conn = sqlite3.connect(sqlite_backend.DB_FILE)
+    conn.executescript(sqlite_backend.SCHEMA.replace("CREATE INDEX IF NOT EXISTS idx_songs_youtube_id",
+                                                     "CREATE UNIQUE INDEX IF NOT EXISTS idx_songs_youtube_id"))
+    conn.close()
+
+    sqlite_backend.insert_songs([{"id": "s1", "youtubeId": "vid1"}, {"id": "s2", "youtubeId": "vid1"}],
+                                keep_duplicates=True)
+    assert [s["id"] for s in songs_store.get_all_songs()] == ["s1", "s2"]
+
+
+def test_add_songs_batch(backend):
+    """Test bulk song ingestion with youtubeId deduplication."""
+    songs_store.add_song("vid1", "Existing")
+    items = ({"youtube_id": f"vid{i % 4}", "titulo": f"Song {i}"} for i in range(8))
+
+    created = songs_store.add_songs(items)
+    assert [s["youtubeId"] for s in created] == ["vid0", "vid2", "vid3"]
+    assert [s["titulo"] for s in created] == ["Song 0", "Song 2", "Song 3"]
+    assert len(songs_store.get_all_songs()) == 4
+    assert songs_store.add_songs([]) == []
+
+
+def test_add_scores_batch(backend, monkeypatch):
+    """Test bulk score ingestion from a generator with a single write."""
+    writes = []
+    original_save = scores_store._save_scores
+    monkeypatch.setattr(scores_store, "_save_scores", lambda scores: writes.append(1) or original_save(scores))
+
+    items = ({"song_id": "song1", "player_name": f"P{i}", "score": i} for i in range(100))
+    created = scores_store.add_scores(items)
+
+    assert len(created) == 100
+    assert len(scores_store.get_all_scores()) == 100
+    assert scores_store.get_top_scores("song1", limit=1)[0]["score"] == 99
+    assert len(writes) == (1 if backend == "json" else 0)
+
+
+def test_bulk_ingestion_streams_in_chunks(backend, monkeypatch):
+    """Test that bulk adds consume generators chunk by chunk and can skip collecting records."""
+    monkeypatch.setattr(scores_store, "BULK_CHUNK", 3)
+    monkeypatch.setattr(songs_store, "BULK_CHUNK", 3)
+    monkeypatch.setattr(scores_store, "JOURNAL_ENABLED", True)
+    monkeypatch.setattr(scores_store, "JOURNAL_COMPACT_THRESHOLD", 0)
+    inserted = []
+    original_insert = scores_store._insert_scores
+    monkeypatch.setattr(scores_store, "_insert_scores", lambda entries: inserted.append(len(entries)) or original_insert(entries))
+
+    items = ({"song_id": "song1", "player_name": f"P{i}", "score": i} for i in range(8))
+    assert scores_store.add_scores(items, return_records=False) == 8
+    assert inserted == [3, 3, 2]
+    assert len(scores_store.get_all_scores()) == 8
+
+    # vid1 repeats across chunks and must still be added once
+    songs = ({"youtube_id": f"vid{i}"} for i in (1, 2, 3, 1, 4))
+    assert songs_store.add_songs(songs, return_records=False) == 4
+    assert [s["youtubeId"] for s in songs_store.get_all_songs()] == ["vid1", "vid2", "vid3", "vid4"]
@@ -0,0 +1,72 @@
+"""Tests for incremental scoring of streamed microphone audio."""
+
+import numpy as np
+import pytest
+
+from scoring import engine
+from scoring.streaming import StreamingScorer
+
+
+SR = 44100
+
+
+def melody(seconds=6.0, sr=SR, base=220.0, seed=0):
+    """Generate a wandering tone with some silent gaps."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * sr)) / sr
+    signal = 0.5 * np.sin(2 * np.pi * base * t + 3 * np.sin(2 * np.pi * 0.3 * t))
+    signal[(t % 2.0) > 1.7] = 0.0
+    return signal + 0.01 * rng.standard_normal(len(t))
+
+
+def feed_in_chunks(scorer, samples, sr, seed=1):
+    rng = np.random.default_rng(seed)
+    position = 0
+    while position < len(samples):
+        size = int(rng.integers(1, 6000))
+        scorer.feed(samples[position:position + size], sr)
+        position += size
+    return scorer.result()
+
+
+def test_streaming_matches_offline():
+    """Test that the final streamed score equals the offline score."""
+    ref_f0, ref_hop = engine.pitch_contour(melody(), SR)
+    recording = (melody(base=233.0, seed=2) * 32767).astype(np.int16)
+
+    offline = engine.score_contours(*engine.pitch_contour(recording / 32768.0, SR), ref_f0, ref_hop)
+    scorer = StreamingScorer(ref_f0, ref_hop)
+    streamed = feed_in_chunks(scorer, recording, SR)
+
+    assert streamed == offline
+    assert scorer.frames_done == len(engine.pitch_contour(recording / 32768.0, SR)[0])
+
+
+def test_streaming_stereo_chunks():
+    """Test that (samples, channels) chunks are mixed down like offline audio."""
+    ref_f0, ref_hop = engine.pitch_contour(melody(), SR)
+    mono = melody(seed=3)
+    stereo = np.stack([mono, mono], axis=1)
+
+    offline = engine.score_contours(*engine.pitch_contour(mono, SR), ref_f0, ref_hop)
+    assert feed_in_chunks(StreamingScorer(ref_f0, ref_hop), stereo, SR) == offline
+
+
+def test_streaming_memory_is_bounded():
+    """Test that the buffer does not grow with the length of the performance."""
+    ref_f0, ref_hop = engine.pitch_contour(melody(), SR)
+    scorer = StreamingScorer(ref_f0, ref_hop)
+    chunk = melody(seconds=0.1)
+    for _ in range(100):
+        scorer.feed(chunk, SR)
+
+    assert len(scorer._buffer) <= scorer.frame_len + scorer.hop + len(chunk)
+    assert scorer._buffered < scorer.frame_len + scorer.hop
+
+
+def test_streaming_rejects_sample_rate_change():
+    """Test that changing the sample rate mid-stream is an error."""
+    scorer = StreamingScorer(np.zeros(10), engine.HOP_SECONDS)
+    scorer.feed(np.zeros(1000), SR)
+    with pytest.raises(ValueError):
+        scorer.feed(np.zeros(1000), 16000)
@@ -0,0 +1,147 @@
+"""Tests for the multi-file transactions and group commit."""
+
+import json
+import os
+import tempfile
+import threading
+
+import pytest
+
+from store import transactions
+
+
+@pytest.fixture
+def data_dir():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        yield temp_dir
+
+
+def read(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def test_transaction_writes_each_file_once(data_dir, monkeypatch):
+    """Test that a file saved several times in a transaction is written once."""
+    journal = os.path.join(data_dir, ".transaction.json")
+    a, b = os.path.join(data_dir, "a.json"), os.path.join(data_dir, "b.json")
+    writes = []
+    original = transactions._write_file
+    monkeypatch.setattr(transactions, "_write_file", lambda path, data: (writes.append(path), original(path, data)))
+
+    tx = transactions.Transaction(journal)
+    first = tx.load(a)
+    first["x"] = 1
+    tx.save(a, first)
+    assert tx.load(a) is first
+    first["y"] = 2
+    tx.save(a, first)
+    tx.save(b, {"z": 3})
+    called = []
+    tx.after_commit(lambda: called.append(True))
+
+    assert tx.commit() == 2
+    assert read(a) == {"x": 1, "y": 2} and read(b) == {"z": 3}
+    assert len([path for path in writes if path != journal]) == 2
+    assert called == [True]
+    assert sorted(os.listdir(data_dir)) == ["a.json", "b.json"]
+
+
+def test_recover_finishes_interrupted_swaps(data_dir):
+    """Test that recover completes the renames listed in the journal."""
+    journal = os.path.join(data_dir, ".transaction.json")
+    a, b = os.path.join(data_dir, "a.json"), os.path.join(data_dir, "b.json")
+    for path, value in ((a, "old"), (b, "old")):
+        with open(path, "w") as f:
+            json.dump({"v": value}, f)
+
+    # Crash after the first rename: a.json is new, b.json still old
+    with open(a, "w") as f:
+        json.dump({"v": "new"}, f)
+    with open(b + ".tmp-1-2", "w") as f:
+        json.dump({"v": "new"}, f)
+    with open(journal, "w") as f:
+        json.dump({"files": [[a + ".tmp-1-1", a], [b + ".tmp-1-2", b]]}, f)
+
+    assert transactions.recover(journal) == 1
+    assert read(a) == {"v": "new"} and read(b) == {"v": "new"}
+    assert not os.path.exists(journal)
+    assert transactions.recover(journal) == 0
+
+
+def test_group_commit_batches_concurrent_requests(data_dir):
+    """Test that concurrent requests share one transaction and keep every update."""
+    path = os.path.join(data_dir, "counter.json")
+    writer = transactions.GroupCommit(window_ms=20, journal_file=os.path.join(data_dir, ".transaction.json"))
+
+    def increment(tx):
+        doc = tx.load(path)
+        doc["count"] = doc.get("count", 0) + 1
+        tx.save(path, doc)
+        return doc["count"]
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(writer.run(increment))) for _ in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert read(path) == {"count": 20}
+    assert writer.requests == 20
+    assert writer.batches < 20
+    assert len(set(results)) == 20
+
+
+def test_failing_callback_does_not_fail_the_committed_batch(data_dir, caplog):
+    """Test that a raising after_commit callback is logged and the other callbacks still run."""
+    path = os.path.join(data_dir, "doc.json")
+    writer = transactions.GroupCommit(window_ms=20, journal_file=os.path.join(data_dir, ".transaction.json"))
+    called = []
+
+    def write(key, fail):
+        def apply(tx):
+            doc = tx.load(path)
+            doc[key] = True
+            tx.save(path, doc)
+            if fail:
+                tx.after_commit(lambda: 1 / 0)
+            tx.after_commit(lambda: called.append(key))
+            return key
+        return apply
+
+    results = []
+    threads = [threading.Thread(target=lambda k=k: results.append(writer.run(write(k, k == "a")))) for k in "ab"]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(results) == ["a", "b"]
+    assert read(path) == {"a": True, "b": True}
+    assert sorted(called) == ["a", "b"]
+    assert "ZeroDivisionError" in caplog.text
+
+
+def test_failed_request_does_not_affect_the_batch(data_dir):
+    """Test that an exception rolls back only the request that raised it."""
+    path = os.path.join(data_dir, "doc.json")
+    writer = transactions.GroupCommit(window_ms=0, journal_file=os.path.join(data_dir, ".transaction.json"))
+
+    def fail(tx):
+        doc = tx.load(path)
+        doc["bad"] = True
+        raise ValueError("invalid")
+
+    with pytest.raises(ValueError):
+        writer.run(fail)
+    assert not os.path.exists(path)
+
+    batch = [transactions._Request(lambda tx: tx.save(path, dict(tx.load(path), ok=1))),
+             transactions._Request(fail),
+             transactions._Request(lambda tx: tx.save(path, dict(tx.load(path), ok2=2)))]
+    writer._commit(batch)
+
+    assert read(path) == {"ok": 1, "ok2": 2}
+    assert isinstance(batch[1].error, ValueError)
+    assert batch[0].error is None and all(request.done.is_set() for request in batch)
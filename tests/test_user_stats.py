@@ -0,0 +1,97 @@
+"""Tests for the materialized per-user statistics."""
+
+import os
+import tempfile
+
+import pytest
+
+from store import scores_store, user_stats
+from store.file_cache import cache
+
+
+@pytest.fixture
+def stats_file(monkeypatch):
+    with tempfile.TemporaryDirectory() as temp_dir:
+        monkeypatch.setattr(user_stats, "STATS_FILE", os.path.join(temp_dir, "user_stats.json"))
+        monkeypatch.setattr(user_stats, "STATS_JOURNAL_FILE", os.path.join(temp_dir, "user_stats.jsonl"))
+        monkeypatch.setattr(scores_store, "SCORES_FILE", os.path.join(temp_dir, "scores.json"))
+        monkeypatch.setattr(scores_store, "SCORES_JOURNAL_FILE", os.path.join(temp_dir, "scores.jsonl"))
+        monkeypatch.setattr(scores_store, "STORE_BACKEND", "json")
+        monkeypatch.setattr(scores_store, "_listeners", [])
+        cache.invalidate()
+        yield temp_dir
+        cache.invalidate()
+
+
+USERS = {"alice": {"created_at": "2024-01-01 10:00:00", "favorites": ["s1"]}, "bob": {"created_at": "2024-01-02 10:00:00"}}
+
+
+def test_incremental_updates_match_rebuild(stats_file):
+    """Test that per-event updates give the same result as recomputing from scratch."""
+    scores_store.add_listener(user_stats.record_scores)
+    for username, user in USERS.items():
+        user_stats.record_user(username, user["created_at"], len(user.get("favorites", [])))
+
+    recordings = {}
+    for i, username in enumerate(["alice", "alice", "bob"]):
+        recordings[f"r{i}"] = {"username": username, "song_id": "s1", "timestamp": f"2024-02-0{i + 1} 12:00:00",
+                               "likes": 0}
+        user_stats.record_recording(username, "s1", recordings[f"r{i}"]["timestamp"])
+
+    recordings["r0"]["likes"] += 3
+    recordings["r2"]["likes"] += 1
+    user_stats.record_likes({"alice": 3, "bob": 1})
+
+    scores_store.add_score("s1", "alice", 70)
+    scores_store.add_score("s1", "alice", 90)
+    scores_store.add_scores([{"song_id": "s1", "player_name": "alice", "score": 80},
+                             {"song_id": "s2", "player_name": "bob", "score": 50}])
+
+    alice = user_stats.get_user_stats("alice")
+    assert alice["registered"] and alice["favorites"] == 1
+    assert alice["recordings"] == 2
+    assert alice["likes"] == 3
+    assert alice["best_scores"] == {"s1": 90}
+    assert user_stats.get_user_stats("bob")["best_scores"] == {"s2": 50}
+    assert user_stats.get_user_stats("nobody") is None
+
+    assert user_stats.check(USERS, recordings, scores_store.get_all_scores()) == []
+
+
+def test_check_reports_divergence_and_rebuild_fixes_it(stats_file):
+    """Test that check finds stale users and rebuild rewrites them."""
+    recordings = {"r0": {"username": "bob", "song_id": "s1", "timestamp": "2024-02-01 12:00:00", "likes": 2}}
+    user_stats.record_user("bob", USERS["bob"]["created_at"])
+
+    assert user_stats.check(USERS, recordings, []) == ["alice", "bob"]
+    user_stats.rebuild(USERS, recordings, [])
+    assert user_stats.check(USERS, recordings, []) == []
+    assert user_stats.get_user_stats("bob")["likes"] == 2
+
+
+def test_last_activity_mixes_local_and_utc_timestamps(stats_file):
+    """Test that recording and score timestamps are compared as instants."""
+    user_stats.record_recording("carol", "s1", "2024-03-01 12:00:00")
+    user_stats.record_scores([{"playerName": "carol", "songId": "s1", "score": 10,
+                               "criadoEm": "2020-01-01T00:00:00Z"}])
+    stats = user_stats.get_user_stats("carol")
+    assert stats["last_activity"] == user_stats._epoch("2024-03-01 12:00:00")
+
+
+def test_updates_append_to_the_journal_until_compaction(stats_file, monkeypatch):
+    """Test that events only append to the journal and compaction folds it into the snapshot."""
+    monkeypatch.setattr(user_stats, "COMPACT_THRESHOLD", 3)
+    user_stats.record_user("alice", "2024-01-01 10:00:00")
+    user_stats.record_likes({"alice": 2})
+
+    assert not os.path.exists(user_stats.STATS_FILE)
+    with open(user_stats.STATS_JOURNAL_FILE, encoding="utf-8") as f:
+        assert len(f.readlines()) == 2
+    cache.invalidate()
+    assert user_stats.get_user_stats("alice")["likes"] == 2
+
+    user_stats.record_likes({"alice": 1})
+    assert not os.path.exists(user_stats.STATS_JOURNAL_FILE)
+    assert sorted(os.listdir(stats_file)) == ["user_stats.json"]
+    cache.invalidate()
+    assert user_stats.get_user_stats("alice")["likes"] == 3
@@ -1,6 +1,6 @@
 """Tests for YouTube URL parser module."""
 
-from youtube.parser import extract_video_id, is_valid_youtube_url
+from youtube.parser import extract_video_id, extract_video_ids, is_valid_youtube_url
 
 
 def test_extract_video_id_standard():
@@ -68,3 +68,43 @@ def test_is_valid_youtube_url_invalid():
     ]
     for url in invalid_urls:
         assert is_valid_youtube_url(url) is False
+
+
+def test_extract_video_id_new_formats():
+    """Test extraction from shorts, live and music.youtube.com URLs."""
+    urls = [
+        "https://www.youtube.com/shorts/dQw4w9WgXcQ",
+        "https://youtube.com/live/dQw4w9WgXcQ?feature=share",
+        "https://music.youtube.com/watch?v=dQw4w9WgXcQ&list=RDAMVM",
+        "https://m.youtube.com/watch?feature=share&v=dQw4w9WgXcQ",
+        "https://www.youtube.com/watch?v=dQw4w9WgXcQ&v=other",
+    ]
+    for url in urls:
+        assert extract_video_id(url) == "dQw4w9WgXcQ"
+
+
+def test_extract_video_id_query_fallback():
+    """Test that v= is read from the query string of other youtube.com pages."""
+    urls = [
+        "https://www.youtube.com/?v=dQw4w9WgXcQ",
+        "https://youtube.com/attribution_link?feature=share&v=dQw4w9WgXcQ",
+        "https://m.youtube.com/?app=desktop&v=dQw4w9WgXcQ#t=30",
+    ]
+    for url in urls:
+        assert extract_video_id(url) == "dQw4w9WgXcQ"
+    assert extract_video_ids(urls) == ["dQw4w9WgXcQ"] * 3
+    assert extract_video_id("https://www.example.com/?v=dQw4w9WgXcQ") is None
+    assert extract_video_id("https://notyoutube.com/?v=dQw4w9WgXcQ") is None
+
+
+def test_extract_video_ids_batch():
+    """Test that the batch API keeps order and returns None for invalid URLs."""
+    urls = [
+        "https://youtu.be/dQw4w9WgXcQ",
+        "https://vimeo.com/123456",
+        None,
+        "https://youtu.be/dQw4w9WgXcQ",
+        "https://www.youtube.com/embed/abc_DEF-123",
+    ]
+    assert extract_video_ids(urls) == ["dQw4w9WgXcQ", None, None, "dQw4w9WgXcQ", "abc_DEF-123"]
+    assert extract_video_ids(iter([])) == []